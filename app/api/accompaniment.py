@@ -1,7 +1,10 @@
-from fastapi import APIRouter, UploadFile, File, HTTPException
-from fastapi.responses import FileResponse
+from fastapi import APIRouter, UploadFile, File, HTTPException, Request
 from celery.result import AsyncResult
 from app.celery_app import celery_app
+from starlette.concurrency import run_in_threadpool
+
+from app.services import artifact_store, profiling
+from app.services.artifact_serving import serve_artifact, serve_job_artifact
 
 import uuid
 import shutil
@@ -16,17 +19,22 @@ TMP_DIR = "/tmp"
 # Generate  (enqueue celery job)
 # =====================================================
 @router.post("/generate")
-async def generate_accompaniment(file: UploadFile = File(...)):
+async def generate_accompaniment(request: Request, file: UploadFile = File(...)):
     job_id = str(uuid.uuid4())
-    path = f"{TMP_DIR}/{job_id}.wav"
+    path = f"{TMP_DIR}/{job_id}_in.wav"
 
     with open(path, "wb") as f:
         shutil.copyfileobj(file.file, f)
 
+    # gpu worker may be on another node → upload through the shared store
+    await run_in_threadpool(artifact_store.publish, job_id, "_in.wav", path)
+
     task = celery_app.send_task(
         "accompaniment.generate",
         args=[path],
         queue="gpu",
+        task_id=job_id,
+        headers=profiling.task_headers(request),
     )
 
     return {"job_id": task.id}
@@ -45,7 +53,7 @@ def status(job_id: str):
 # Download (REAL FILE STREAM)
 # =====================================================
 @router.get("/download/{job_id}")
-def download(job_id: str):
+def download(job_id: str, request: Request):
     job = AsyncResult(job_id, app=celery_app)
 
     # still processing
@@ -55,12 +63,12 @@ def download(job_id: str):
     # celery task returns: "final_video.mp4"
     output_path = job.result
 
-    if not output_path or not os.path.exists(output_path):
-        return {"error": "file_not_found"}
+    if output_path and os.path.exists(output_path):
+        return serve_artifact(request, output_path, "video/mp4", "indianode_accompaniment.mp4")
 
-    return FileResponse(
-        path=output_path,
-        filename="indianode_accompaniment.mp4",
-        media_type="video/mp4"
-    )
+    # rendered on another node
+    response = serve_job_artifact(request, job_id, ".mp4", TMP_DIR, "video/mp4", "indianode_accompaniment.mp4")
+    if response is None:
+        return {"error": "file_not_found"}
+    return response
 
@@ -4,10 +4,12 @@ import os
 import uuid
 import shutil
 
-from fastapi import APIRouter, UploadFile, File, Form
-from fastapi.responses import FileResponse
+from fastapi import APIRouter, UploadFile, File, Form, HTTPException, Request
+from starlette.concurrency import run_in_threadpool
 
 from app.bgm.bgm_tasks import generate_bgm_task
+from app.services import artifact_store, profiling
+from app.services.artifact_serving import serve_job_artifact
 
 router = APIRouter(prefix="/api/bgm", tags=["bgm"])
 
@@ -20,6 +22,7 @@ os.makedirs(UPLOAD_DIR, exist_ok=True)
 # =====================================================
 @router.post("/process")
 async def process_video(
+    request: Request,
     file: UploadFile = File(...),
     prompt: str = Form("")
 ):
@@ -30,10 +33,18 @@ async def process_video(
 
     with open(in_path, "wb") as f:
         shutil.copyfileobj(file.file, f)
+
+    # cpu worker may be on another node → upload through the shared store
+    await run_in_threadpool(artifact_store.publish, job_id, "_in.mp4", in_path)
     print("TYPE:", type(generate_bgm_task))
     print("HAS DELAY:", hasattr(generate_bgm_task, "delay"))
     print("CALLING DELAY NOW")
-    generate_bgm_task.delay(in_path, out_path, prompt)
+    # task id = job id → profiles / traces line up with what the user sees
+    generate_bgm_task.apply_async(
+        (in_path, out_path, prompt),
+        task_id=job_id,
+        headers=profiling.task_headers(request),
+    )
 
     return {"job_id": job_id}
 
@@ -43,9 +54,7 @@ async def process_video(
 # =====================================================
 @router.get("/status/{job_id}")
 def status(job_id: str):
-    out_path = f"{UPLOAD_DIR}/{job_id}_out.mp4"
-
-    if os.path.exists(out_path):
+    if artifact_store.exists(job_id, "_out.mp4", UPLOAD_DIR):
         return {"status": "done"}
 
     return {"status": "processing"}
@@ -55,7 +64,9 @@ def status(job_id: str):
 # GET /api/bgm/download/{job}
 # =====================================================
 @router.get("/download/{job_id}")
-def download(job_id: str):
-    path = f"{UPLOAD_DIR}/{job_id}_out.mp4"
-    return FileResponse(path, media_type="video/mp4", filename="bgm_video.mp4")
+def download(job_id: str, request: Request):
+    response = serve_job_artifact(request, job_id, "_out.mp4", UPLOAD_DIR, "video/mp4", "bgm_video.mp4")
+    if response is None:
+        raise HTTPException(404, "Video not ready")
+    return response
 
@@ -1,10 +1,9 @@
 # app/api/download-mp4_image.py
 
-import os
-from fastapi import APIRouter, HTTPException
-from fastapi.responses import FileResponse
+from fastapi import APIRouter, HTTPException, Request
 
-OUTPUT_DIR = "outputs"
+from app.services.artifact_serving import serve_job_artifact
+from app.services.artifact_store import OUTPUT_DIR
 
 router = APIRouter(
     prefix="/api/music",
@@ -13,25 +12,16 @@ router = APIRouter(
 
 
 @router.get("/download-mp4-image/{job_id}")
-def download_mp4_image(job_id: str):
+def download_mp4_image(job_id: str, request: Request):
     """
     Download MP4 with user image overlaid (Flow-2).
     """
 
-    mp4_path = os.path.join(OUTPUT_DIR, f"{job_id}.mp4")
+    # ranges + ETag + immutable caching (or handoff to the shared store)
+    response = serve_job_artifact(request, job_id, ".mp4", OUTPUT_DIR, "video/mp4", f"{job_id}.mp4")
 
-    if not os.path.exists(mp4_path):
+    if response is None:
         # IMPORTANT: this is the error you are seeing now
         raise HTTPException(status_code=404, detail="MP4 not ready")
 
-    return FileResponse(
-        mp4_path,
-        media_type="video/mp4",
-        filename=f"{job_id}.mp4",
-        headers={
-            "Content-Disposition": f'attachment; filename="{job_id}.mp4"',
-            "Cache-Control": "no-store",
-            "Accept-Ranges": "bytes",
-        },
-    )
-
+    return response
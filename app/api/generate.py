@@ -1,11 +1,10 @@
 # app/api/generate.py
 
 import uuid
-import os
 from typing import List, Optional
 
-from fastapi import APIRouter, HTTPException
-from fastapi.responses import FileResponse
+from fastapi import APIRouter, HTTPException, Query, Request
+from fastapi.responses import JSONResponse
 from pydantic import BaseModel
 
 from celery.result import AsyncResult
@@ -17,10 +16,14 @@ from app.intelligence.prompt_enhancer import enhance_prompt
 # ✅ QUALITY GUARDRAILS
 from app.music_prompt.quality_guardrails import apply_quality_guardrails
 from app.intelligence.prompt_enhancer import enhance_prompt
-from app.intelligence.intent_expander import expand_prompt
+from app.intelligence.intent_expander import expand_prompt, local_brief
+from app.intelligence import lexicon
+from app.services import artifact_store, audio_delivery, preset_pool, profiling, prompt_index, waveform_peaks
+from app.services.artifact_serving import CACHE_CONTROL, serve_artifact, serve_job_artifact
+from app.services.tracing import span
 router = APIRouter(prefix="/api/music", tags=["music"])
 
-OUTPUT_DIR = "outputs"
+OUTPUT_DIR = artifact_store.OUTPUT_DIR      # same directory as the musicgen task
 MIN_WORDS_FOR_DIRECT_PROMPT = 6
 
 
@@ -38,12 +41,15 @@ class GenerateRequest(BaseModel):
     # receives frontend checkbox value
     mode: str = "cinematic"
 
+    # opt-in: accept an earlier render of a near-identical prompt
+    quick: bool = False
+
 
 # -----------------------------
 # Generate music
 # -----------------------------
 @router.post("/generate")
-def generate_music(req: GenerateRequest):
+def generate_music(req: GenerateRequest, request: Request):
     job_id = str(uuid.uuid4())
 
     print("\n🎯 /api/music/generate")
@@ -72,6 +78,12 @@ def generate_music(req: GenerateRequest):
     if not final_prompt:
         raise HTTPException(400, "No musical description provided")
 
+    # 🎁 preset only → serve a pre-generated variant if the pool has one
+    if req.preset and not (req.prompt or req.description or req.instruments):
+        key = preset_pool.pool_key(req.preset, req.mode, req.duration)
+        if key and preset_pool.take(key, job_id, OUTPUT_DIR):
+            return {"job_id": job_id, "status": "done", "pooled": True}
+
     word_count = len(final_prompt.split())
 
     #if word_count < MIN_WORDS_FOR_DIRECT_PROMPT:
@@ -83,12 +95,26 @@ def generate_music(req: GenerateRequest):
     print("🟡 USER INPUT:")
     print(final_prompt)
     print(f"🔥 MODE RAW VALUE -> [{req.mode}] (type={type(req.mode)})")
-    expanded = expand_prompt(
-    final_prompt,
-    instruments=req.instruments,
-    preset=req.preset,
-    mode=req.mode
-    )
+    # short prompt the lexicon fully explains → no LLM round trip
+    match = lexicon.analyze(final_prompt)
+    local = lexicon.is_confident(match, MIN_WORDS_FOR_DIRECT_PROMPT)
+
+    with span("llm_expand", job_id, local=local):
+        if local:
+            print(f"⚡ LOCAL BRIEF (confidence {match['confidence']}, {match['words']} words)")
+            expanded = local_brief(
+                match,
+                instruments=req.instruments,
+                preset=req.preset,
+                mode=req.mode
+            )
+        else:
+            expanded = expand_prompt(
+            final_prompt,
+            instruments=req.instruments,
+            preset=req.preset,
+            mode=req.mode
+            )
     music_prompt = expanded
     #expanded = expand_prompt(final_prompt)     # NEW layer
     #music_prompt = enhance_prompt(expanded)   # existing layer
@@ -109,6 +135,16 @@ def generate_music(req: GenerateRequest):
     print("\n🎼 FINAL PROMPT SENT TO MUSICGEN:")
     print(guarded_prompt)
 
+    # ♻️ quick → reuse a semantically near-duplicate earlier job
+    if req.quick:
+        hit = prompt_index.lookup(guarded_prompt, req.duration, req.mode, OUTPUT_DIR)
+        if hit:
+            meta, similarity = hit
+            prompt_index.reuse(meta["job_id"], job_id, OUTPUT_DIR)
+            print(f"♻️ reused {meta['job_id']} (similarity {similarity:.3f})")
+            return {"job_id": job_id, "status": "done",
+                    "reused": meta["job_id"], "similarity": round(similarity, 3)}
+
     payload = {
         "prompt": guarded_prompt,
         "duration": req.duration,
@@ -117,7 +153,9 @@ def generate_music(req: GenerateRequest):
         "mode": req.mode
     }
 
-    generate_music_task.delay(job_id, payload)
+    generate_music_task.apply_async(
+        (job_id, payload), headers=profiling.task_headers(request)
+    )
 
     return {"job_id": job_id, "status": "queued"}
 
@@ -127,10 +165,9 @@ def generate_music(req: GenerateRequest):
 # -----------------------------
 @router.get("/status/{job_id}")
 def job_status(job_id: str):
-    wav_path = os.path.join(OUTPUT_DIR, f"{job_id}.wav")
     result = AsyncResult(job_id, app=celery_app)
 
-    if os.path.exists(wav_path):
+    if artifact_store.exists(job_id, ".wav", OUTPUT_DIR):
         return {"status": "done"}
 
     if result.state in ("PENDING", "STARTED"):
@@ -143,25 +180,65 @@ def job_status(job_id: str):
 
 
 # -----------------------------
-# Download WAV
+# Preset pool metrics
+# -----------------------------
+@router.get("/pool/stats")
+def pool_stats():
+    return preset_pool.stats()
+
+
+# -----------------------------
+# Download audio (?format=wav|m4a|opus|mp3)
 # -----------------------------
 @router.get("/download/{job_id}")
-def download_audio(job_id: str):
-    path = os.path.join(OUTPUT_DIR, f"{job_id}.wav")
-    if not os.path.exists(path):
+def download_audio(job_id: str, request: Request, fmt: str = Query("wav", alias="format")):
+    if fmt not in audio_delivery.FORMATS:
+        raise HTTPException(400, f"format must be one of: {', '.join(audio_delivery.FORMATS)}")
+
+    spec = audio_delivery.FORMATS[fmt]
+    filename = f"{job_id}{spec['ext']}"
+    with span("download", job_id, kind=fmt):
+        response = serve_job_artifact(request, job_id, spec["ext"], OUTPUT_DIR, spec["media_type"], filename)
+        if response is not None:
+            return response
+
+        # not encoded yet (anywhere) → encode here
+        path = audio_delivery.ensure(job_id, fmt, OUTPUT_DIR)
+        if path is None:
+            raise HTTPException(404, "Audio not ready")
+        return serve_artifact(request, path, spec["media_type"], filename)
+
+
+# -----------------------------
+# Waveform peaks (?width=px → one level as JSON, ?format=bin → sidecar)
+# -----------------------------
+@router.get("/peaks/{job_id}")
+def waveform(job_id: str, request: Request, width: Optional[int] = None, fmt: str = Query("json", alias="format")):
+    if fmt not in ("json", "bin"):
+        raise HTTPException(400, "format must be one of: json, bin")
+
+    path = waveform_peaks.ensure(job_id, OUTPUT_DIR)
+    if path is None:
         raise HTTPException(404, "Audio not ready")
-    return FileResponse(path, media_type="audio/wav", filename=f"{job_id}.wav")
+
+    if fmt == "bin":
+        return serve_artifact(request, path, "application/octet-stream")
+    return JSONResponse(
+        waveform_peaks.to_json(waveform_peaks.read(path), width),
+        headers={"Cache-Control": CACHE_CONTROL},
+    )
 
 
 # -----------------------------
 # Download MP4
 # -----------------------------
 @router.get("/download-mp4/{job_id}")
-def download_video(job_id: str):
-    path = os.path.join(OUTPUT_DIR, f"{job_id}.mp4")
-    if not os.path.exists(path):
-        raise HTTPException(404, "Video not ready")
-    return FileResponse(path, media_type="video/mp4", filename=f"{job_id}.mp4")
+def download_video(job_id: str, request: Request):
+    with span("download", job_id, kind="mp4"):
+        response = serve_job_artifact(request, job_id, ".mp4", OUTPUT_DIR, "video/mp4", f"{job_id}.mp4")
+        if response is None:
+            raise HTTPException(404, "Video not ready")
+        return response
 
 
 # -----------------------------
@@ -4,9 +4,11 @@ import uuid
 import os
 from fastapi import APIRouter, UploadFile, File, Form
 
-from app.tasks.musicgen_task import generate_music_task
+from starlette.concurrency import run_in_threadpool
 
-OUTPUT_DIR = "outputs"
+from app.services import artifact_store
+from app.services.artifact_store import OUTPUT_DIR
+from app.tasks.musicgen_task import generate_music_task
 
 router = APIRouter(
     prefix="/api/music",
@@ -32,6 +34,9 @@ async def generate_from_image(
     with open(image_path, "wb") as f:
         f.write(await image.read())
 
+    # gpu worker may be on another node → upload through the shared store
+    await run_in_threadpool(artifact_store.publish, job_id, ".jpg", image_path)
+
     payload = {
         "prompt": prompt,
         "duration": duration,
@@ -53,13 +58,10 @@ async def generate_from_image(
 # -------------------------------------------------
 @router.get("/status-image/{job_id}")
 def image_job_status(job_id: str):
-    wav_path = os.path.join(OUTPUT_DIR, f"{job_id}.wav")
-    mp4_path = os.path.join(OUTPUT_DIR, f"{job_id}.mp4")
-
-    if os.path.exists(mp4_path):
+    if artifact_store.exists(job_id, ".mp4", OUTPUT_DIR):
         return {"status": "done"}
 
-    if os.path.exists(wav_path):
+    if artifact_store.exists(job_id, ".wav", OUTPUT_DIR):
         return {"status": "rendering_video"}
 
     return {"status": "queued"}
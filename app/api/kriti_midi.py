@@ -1,11 +1,14 @@
 # app/api/kriti_midi.py
 
+import threading
+
 from fastapi import APIRouter
-from fastapi.responses import FileResponse
+from fastapi.responses import FileResponse, Response
 from pydantic import BaseModel
 
 from app.services.kriti_midi_service import KritiMidiService
 from app.services.kriti_render_service import KritiRenderService
+from app.services.kriti_sample_service import KritiSampleService
 
 
 router = APIRouter(prefix="/api/kriti", tags=["kriti"])
@@ -19,11 +22,28 @@ class KritiRequest(BaseModel):
 
 midi_service = KritiMidiService()
 render_service = KritiRenderService()
+sample_service = KritiSampleService()
+
+# ⚡ precompute swara samples in the background (startup stays fast)
+threading.Thread(target=sample_service.warmup, daemon=True).start()
 
 
 @router.post("/midi")
 def create_kriti(req: KritiRequest):
 
+    # ⚡ fast path: overlap-add precomputed swara samples
+    if sample_service.supports(req.instrument):
+        wav_bytes = sample_service.render_wav_bytes(
+            notes=req.notes,
+            instrument=req.instrument
+        )
+        return Response(
+            wav_bytes,
+            media_type="audio/wav",
+            headers={"Content-Disposition": 'attachment; filename="kriti.wav"'}
+        )
+
+    # 🐢 fallback: unusual instrument → full MIDI + FluidSynth
     midi_path = midi_service.create_midi(
         notes=req.notes,
         instrument=req.instrument
@@ -35,4 +55,3 @@ def create_kriti(req: KritiRequest):
         media_type="audio/wav",
         filename="kriti.wav"
     )
-
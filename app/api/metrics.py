@@ -0,0 +1,16 @@
+# app/api/metrics.py
+
+from fastapi import APIRouter, Request, Response
+
+from app.services.tracing import metrics_payload
+
+router = APIRouter(tags=["metrics"])
+
+
+# -----------------------------
+# Prometheus scrape endpoint
+# -----------------------------
+@router.get("/metrics", include_in_schema=False)
+def metrics(request: Request):
+    body, content_type = metrics_payload(request.headers.get("accept", ""))
+    return Response(body, media_type=content_type)
@@ -0,0 +1,59 @@
+# app/api/profiles.py
+
+import json
+from typing import Optional
+
+from fastapi import APIRouter, Depends, Header, HTTPException
+from fastapi.responses import FileResponse
+
+from app.services import profiling
+
+
+def require_admin(x_admin_token: Optional[str] = Header(None)):
+    if not profiling.is_admin(x_admin_token):
+        raise HTTPException(403, "Admin token required")
+
+
+router = APIRouter(
+    prefix="/api/admin/profiles",
+    tags=["admin"],
+    dependencies=[Depends(require_admin)],
+)
+
+
+# -----------------------------
+# List captures (newest first)
+# -----------------------------
+@router.get("")
+def list_profiles(task: Optional[str] = None, limit: int = 50):
+    captures = profiling.list_captures()
+    if task:
+        captures = [c for c in captures if c["task"] == task]
+    return {"captures": captures[:limit]}
+
+
+# -----------------------------
+# One capture: metadata + hotspot summary
+# -----------------------------
+@router.get("/{job_id}")
+def get_profile(job_id: str):
+    meta = profiling.capture_file(job_id, "meta.json")
+    summary = profiling.capture_file(job_id, "summary.txt")
+    if meta is None:
+        raise HTTPException(404, "No capture for this job")
+
+    return {
+        "meta": json.loads(meta.read_text()),
+        "summary": summary.read_text() if summary else None,
+    }
+
+
+# -----------------------------
+# Download an artifact (profile.prof / stacks.folded / ...)
+# -----------------------------
+@router.get("/{job_id}/{name}")
+def download_profile(job_id: str, name: str):
+    path = profiling.capture_file(job_id, name)
+    if path is None:
+        raise HTTPException(404, "Artifact not found")
+    return FileResponse(path, filename=f"{job_id}_{name}")
@@ -4,10 +4,12 @@
 
 import os
 import subprocess
-import time
 import uuid
 from app.celery_app import celery
-from app.tasks.musicgen_task import generate_music_task
+from app.bgm.segmented_bgm import generate_scored_bgm
+from app.bgm.video_analysis import scene_cuts
+from app.services import artifact_store
+from app.services.tracing import span
 
 FFMPEG = "/usr/bin/ffmpeg"
 OUTPUT_DIR = "outputs"
@@ -22,26 +24,6 @@ def run(cmd):
     subprocess.run(cmd, check=True)
 
 
-def duration(path):
-    print(f"\n📏 Getting duration for: {path}", flush=True)
-
-    r = subprocess.run(
-        [
-            "ffprobe",
-            "-v", "error",
-            "-show_entries", "format=duration",
-            "-of", "default=noprint_wrappers=1:nokey=1",
-            path
-        ],
-        capture_output=True,
-        text=True
-    )
-
-    sec = int(float(r.stdout.strip()))
-    print(f"⏱ Duration = {sec}s", flush=True)
-    return sec
-
-
 # =====================================================
 # TASK
 # =====================================================
@@ -60,10 +42,17 @@ def generate_bgm_task(video_path: str, out_path: str, user_prompt: str = ""):
         job_id = uuid.uuid4().hex[:8]
         print(f"🆔 job_id = {job_id}", flush=True)
 
+        # API job id (= task id) keys the upload / result in the shared store
+        api_job_id = generate_bgm_task.request.id
+        if not os.path.exists(video_path):
+            video_path = artifact_store.fetch(api_job_id, "_in.mp4", os.path.dirname(video_path)) or video_path
+
         # -------------------------------------------------
-        # duration
+        # duration + scene cuts (one decode pass)
         # -------------------------------------------------
-        sec = duration(video_path)
+        with span("analysis", api_job_id):
+            sec, cut_times = scene_cuts(video_path)
+        print(f"⏱ Duration = {sec:.1f}s, {len(cut_times)} cuts", flush=True)
 
         prompt = (
             "Professional cinematic background score, real instruments. "
@@ -71,32 +60,13 @@ def generate_bgm_task(video_path: str, out_path: str, user_prompt: str = ""):
         )
 
         # -------------------------------------------------
-        # call musicgen
+        # call musicgen (one job per scene segment, parallel)
         # -------------------------------------------------
-        print("🎵 Sending task → musicgen.generate", flush=True)
-
-        generate_music_task.delay(job_id, {
-            "prompt": prompt,
-            "duration": sec,
-            "mode": "cinematic"
-        })
+        print("🎵 Sending segments → musicgen.generate", flush=True)
 
         wav_path = os.path.join(OUTPUT_DIR, f"{job_id}.wav")
-        print(f"⌛ Waiting for wav: {wav_path}", flush=True)
-
-        # -------------------------------------------------
-        # wait for wav
-        # -------------------------------------------------
-        wait_sec = 0
-        while not os.path.exists(wav_path):
-            time.sleep(1)
-            wait_sec += 1
-
-            if wait_sec % 5 == 0:
-                print(f"⏳ still waiting... {wait_sec}s", flush=True)
-
-            if wait_sec > 600:
-                raise RuntimeError("❌ TIMEOUT waiting for wav!")
+        with span("bgm_generate", api_job_id, duration=round(sec, 1)):
+            generate_scored_bgm(prompt, sec, cut_times, wav_path, mode="cinematic")
 
         if os.path.getsize(wav_path) < 10_000:
             raise RuntimeError("❌ Generated WAV is empty or invalid")
@@ -108,22 +78,28 @@ def generate_bgm_task(video_path: str, out_path: str, user_prompt: str = ""):
         # -------------------------------------------------
         print("🎬 Muxing video + audio...", flush=True)
 
-        run([
-            FFMPEG, "-y",
-            "-i", video_path,
-            "-i", wav_path,
-            "-map", "0:v:0",
-            "-map", "1:a:0",
-            "-shortest",
-            "-c:v", "copy",
-            "-c:a", "aac",
-            "-ar", "44100",
-            "-ac", "2",
-            "-b:a", "192k",
-            out_path
-        ])
+        os.makedirs(os.path.dirname(out_path) or ".", exist_ok=True)
+
+        with span("video_encode", api_job_id):
+            run([
+                FFMPEG, "-y",
+                "-i", video_path,
+                "-i", wav_path,
+                "-map", "0:v:0",
+                "-map", "1:a:0",
+                "-shortest",
+                "-c:v", "copy",
+                "-c:a", "aac",
+                "-ar", "44100",
+                "-ac", "2",
+                "-b:a", "192k",
+                out_path
+            ])
 
         print("✅ FINAL VIDEO CREATED:", out_path, flush=True)
+
+        with span("publish", api_job_id):
+            artifact_store.publish(api_job_id, "_out.mp4", out_path)
         print("🎉🎉🎉 BGM TASK DONE 🎉🎉🎉\n", flush=True)
 
         return out_path
@@ -9,14 +9,16 @@ import uuid
 import shutil
 import subprocess
 import torch
-import time
-from pydub import AudioSegment
-from faster_whisper import WhisperModel
+import numpy as np
+import soundfile as sf
 
-# ✅ ONLY CHANGE → reuse existing shared celery musicgen worker
-from app.tasks.musicgen_task import generate_music_task
+from app.services.karaoke_ai import dsp
+from app.services import model_preload
 
 from scene_analyzer import detect_scene
+from video_analysis import analyze_video
+# reuse existing shared celery musicgen worker (fanned out per scene)
+from segmented_bgm import generate_scored_bgm
 
 
 # =========================================================
@@ -30,6 +32,16 @@ TARGET_MASTER = -14
 VOICE_PRIORITY_DB = 14
 MAX_RETRIES = 5
 
+# transcript: only VAD speech inside an early window, stop once we have enough
+WHISPER_SIZE = os.getenv("BGM_WHISPER_MODEL", "small")     # tiny / base / small / medium
+TRANSCRIPT_WINDOW = 120    # seconds of video considered
+TRANSCRIPT_BUDGET = 45     # seconds of speech actually decoded
+TRANSCRIPT_CHARS = 300     # build_prompt uses the first 200
+
+# time-varying ducking around VAD speech segments
+DUCK_DB = 6            # bgm dip while someone talks
+DUCK_RAMP = 0.25       # seconds to fade down before / up after speech
+
 VIDEO_IN  = sys.argv[1]
 VIDEO_OUT = sys.argv[2]
 USER_PROMPT = sys.argv[3] if len(sys.argv) > 3 else ""
@@ -37,9 +49,12 @@ USER_PROMPT = sys.argv[3] if len(sys.argv) > 3 else ""
 JOB = uuid.uuid4().hex[:8]
 
 VOICE_WAV = f"voice_{JOB}.wav"
+VOICE_MIX = f"voice_{JOB}_{SR}.wav"
+BGM_MIX   = f"bgm_{JOB}_{SR}.wav"
 BGM_WAV   = f"bgm_{JOB}.wav"
 MIX_WAV   = f"mix_{JOB}.wav"
 TEMP_MP4  = f"temp_{JOB}.mp4"
+WORK_DIR  = f"frames_{JOB}"
 
 
 # =========================================================
@@ -50,10 +65,14 @@ device = "cuda" if torch.cuda.is_available() else "cpu"
 print("🚀 Device:", device)
 
 # ❌ IMPORTANT: MusicGen REMOVED (no second GPU model)
-WHISPER = WhisperModel("medium", device=device)
+# Whisper / silero VAD load on first use, not at import. This script
+# runs as a fresh interpreter per video (app/tasks/bgm_task.py), so
+# "resident" means for this run only: each job pays one load, and a
+# silent video never loads Whisper at all.
+def load_whisper():
+    compute = os.getenv("BGM_WHISPER_COMPUTE", "int8" if device == "cpu" else "float16")
+    return model_preload.get_whisper(WHISPER_SIZE, device, compute)
 
-vad_model, utils = torch.hub.load('snakers4/silero-vad', 'silero_vad')
-(get_speech_timestamps, _, read_audio, _, _) = utils
 
 
 # =========================================================
@@ -64,73 +83,29 @@ def run(cmd):
     subprocess.run(cmd, check=True)
 
 
-def duration(path):
-    r = subprocess.run(
-        ["ffprobe","-v","error","-show_entries","format=duration",
-         "-of","default=noprint_wrappers=1:nokey=1",path],
-        capture_output=True,text=True)
-    return float(r.stdout.strip())
-
-
-def mean_db(path):
-    r = subprocess.run(
-        [FFMPEG,"-i",path,"-af","volumedetect","-f","null","-"],
-        stderr=subprocess.PIPE,text=True)
-
-    for line in r.stderr.splitlines():
-        if "mean_volume" in line:
-            return float(line.split(":")[1].replace(" dB",""))
-
-    return -40
-
-
-def has_audio_stream(path):
-    r = subprocess.run(
-        ["ffprobe","-v","error","-select_streams","a",
-         "-show_entries","stream=index",
-         "-of","csv=p=0",path],
-        capture_output=True,text=True)
-    return bool(r.stdout.strip())
-
-
-# =========================================================
-# FRAME EXTRACTION (UNCHANGED)
-# =========================================================
-
-def extract_frames():
-    os.makedirs("frames", exist_ok=True)
-
-    run([
-        FFMPEG,
-        "-y",
-        "-i", VIDEO_IN,
-        "-vf", "fps=0.33",
-        "frames/frame_%03d.jpg"
-    ])
-
-
 # =========================================================
-# AUDIO EXTRACT (UNCHANGED)
+# ANALYSIS (one probe + one decode pass → video_analysis.py)
 # =========================================================
 
-def extract_audio():
-
-    if not has_audio_stream(VIDEO_IN):
-        print("🔇 no audio stream detected → silent video")
-        return
-
-    run([FFMPEG,"-y","-i",VIDEO_IN,"-vn","-ac","1","-ar","16000",VOICE_WAV])
+def analyze():
+    return analyze_video(VIDEO_IN, VOICE_WAV, WORK_DIR)
 
 
 # =========================================================
-# AUDIO TYPE (UNCHANGED)
+# AUDIO TYPE
 # =========================================================
 
-def detect_audio_type():
+def detect_audio_type(mean_volume_db):
+    """
+    Returns (audio_type, speech segments in seconds).
+    The segments drive the ducking in mix().
+    mean_volume_db comes from the analysis pass.
+    """
 
     if not os.path.exists(VOICE_WAV):
-        return "silent"
+        return "silent", []
 
+    vad_model, (get_speech_timestamps, _, read_audio, _, _) = model_preload.get_silero_vad()
     wav = read_audio(VOICE_WAV, sampling_rate=16000)
     speech = get_speech_timestamps(wav, vad_model, sampling_rate=16000)
 
@@ -141,43 +116,67 @@ def detect_audio_type():
 
     print("🧠 speech ratio:", round(ratio,3))
 
+    segments = [(s["start"]/16000, s["end"]/16000) for s in speech]
+
     if ratio > 0.15:
-        return "speech"
-    if mean_db(VOICE_WAV) < -38:
-        return "silent"
-    return "ambient"
+        return "speech", segments
+    if mean_volume_db < -38:
+        return "silent", segments
+    return "ambient", segments
 
 
 # =========================================================
-# TRANSCRIPT (UNCHANGED)
+# TRANSCRIPT
 # =========================================================
 
-def transcript_if_needed(audio_type):
+def speech_windows(speech):
+    """
+    VAD segments inside TRANSCRIPT_WINDOW, cut to TRANSCRIPT_BUDGET seconds.
+    """
+    out, total = [], 0.0
+
+    for start, end in speech:
+        if start >= TRANSCRIPT_WINDOW or total >= TRANSCRIPT_BUDGET:
+            break
+        end = min(end, TRANSCRIPT_WINDOW, start + TRANSCRIPT_BUDGET - total)
+        out.append((start, end))
+        total += end - start
+
+    return out
+
+
+def transcript_if_needed(audio_type, speech=()):
 
     if audio_type != "speech":
         return ""
 
-    segs,_ = WHISPER.transcribe(VOICE_WAV)
-    return " ".join(s.text for s in segs)[:1200]
+    windows = speech_windows(speech)
+    if not windows:
+        return ""
 
+    # read only the speech windows (cost independent of video length)
+    with sf.SoundFile(VOICE_WAV) as f:
+        parts = []
+        for start, end in windows:
+            f.seek(int(start * f.samplerate))
+            parts.append(f.read(int((end - start) * f.samplerate), dtype="float32"))
 
-# =========================================================
-# VIDEO ENERGY (UNCHANGED)
-# =========================================================
-
-def analyze_video_energy():
+    audio = np.concatenate(parts)
 
-    r = subprocess.run(
-        [FFMPEG,"-i",VIDEO_IN,"-vf","signalstats","-f","null","-"],
-        stderr=subprocess.PIPE,text=True)
+    segs, _ = load_whisper().transcribe(
+        audio,
+        beam_size=1,
+        condition_on_previous_text=False,
+    )
 
-    changes = r.stderr.count("Parsed_signalstats")
+    # generator → breaking out stops decoding early
+    text = ""
+    for s in segs:
+        text += s.text
+        if len(text) >= TRANSCRIPT_CHARS:
+            break
 
-    if changes < 40:
-        return "calm"
-    if changes < 120:
-        return "medium"
-    return "energetic"
+    return text.strip()[:TRANSCRIPT_CHARS]
 
 
 # =========================================================
@@ -221,54 +220,107 @@ def build_prompt(audio_type, transcript, energy, scene):
 # ✅ ONLY CHANGE — delegate to shared MusicGen worker
 # =========================================================
 
-def generate_music(prompt, total_sec):
-
-    job_id = uuid.uuid4().hex[:8]
+def generate_music(prompt, total_sec, cut_times=()):
+    """
+    Short videos → one job. Long videos → one job per scene
+    segment on the shared gpu workers, crossfaded back together.
+    """
 
-    generate_music_task.delay(job_id, {
-        "prompt": prompt,
-        "duration": int(total_sec),
-        "mode": "cinematic"
-    })
+    print("⏳ waiting for shared MusicGen worker(s)...")
 
-    wav_path = os.path.join("outputs", f"{job_id}.wav")
+    generate_scored_bgm(prompt, total_sec, cut_times, BGM_WAV, mode="cinematic")
 
-    print("⏳ waiting for shared MusicGen worker...")
 
-    while not os.path.exists(wav_path):
-        time.sleep(1)
+# =========================================================
+# MIX / MERGE
+# =========================================================
 
-    shutil.copy(wav_path, BGM_WAV)
+def to_mix_rate(src, dst):
+    """
+    ffmpeg → SR stereo float WAV, so the mixer can stream it in blocks.
+    """
+    run([FFMPEG,"-y","-loglevel","error","-i",src,"-ac","2","-ar",str(SR),"-c:a","pcm_f32le",dst])
+    return dst
+
+
+def rms_db(path):
+    """
+    Whole-file dBFS in one streaming pass (pydub .dBFS equivalent).
+    """
+    sumsq, count = 0.0, 0
+    for b in dsp.read_blocks(path, SR, mono=False):
+        sumsq += float(np.sum(np.square(b, dtype=np.float64)))
+        count += b.size
+    return 10 * np.log10(sumsq / count) if sumsq else -np.inf
+
+
+def master(writer):
+    """
+    Final gain to TARGET_MASTER dBFS (RMS), second streaming pass.
+    """
+    if np.isfinite(writer.rms_db):
+        writer.close(gain=dsp.db_to_gain(TARGET_MASTER - writer.rms_db))
+    else:
+        writer.close(gain=1.0)
 
 
-# =========================================================
-# MIX / MERGE (UNCHANGED)
-# =========================================================
+def mix(audio_type, gain_db, speech=()):
+    """
+    Block-by-block NumPy mix, written once.
 
-def mix(audio_type, gain_db):
+    speech  → bgm sits VOICE_PRIORITY_DB under the voice while people talk,
+              swells DUCK_DB back up in the pauses
+    ambient → bgm +4 dB, dips DUCK_DB under the occasional speech
+    silent  → bgm only
+    """
 
-    bgm = AudioSegment.from_wav(BGM_WAV).set_frame_rate(SR).set_channels(2)
+    bgm_path = to_mix_rate(BGM_WAV, BGM_MIX)
+    writer = dsp.PeakWriter(MIX_WAV, SR, channels=2)
 
     if audio_type == "silent" or not os.path.exists(VOICE_WAV):
-        out = bgm.apply_gain(TARGET_MASTER - bgm.dBFS)
-        out.export(MIX_WAV, "wav")
+        for b in dsp.read_blocks(bgm_path, SR, mono=False):
+            writer.write(b)
+        master(writer)
+        os.remove(bgm_path)
         return
 
-    voice = AudioSegment.from_wav(VOICE_WAV).set_frame_rate(SR).set_channels(2)
+    voice_path = to_mix_rate(VOICE_WAV, VOICE_MIX)
 
-    voice_db = voice.dBFS
-    bgm_db   = bgm.dBFS
+    voice_db = rms_db(voice_path)
+    bgm_db   = rms_db(bgm_path)
 
     if audio_type == "speech":
         target = max(voice_db - VOICE_PRIORITY_DB, -32)
-        diff = target - bgm_db
-        bgm = bgm.apply_gain(diff + gain_db)
+        open_db = target - bgm_db + gain_db + DUCK_DB
     else:
-        bgm = bgm + 4 + gain_db
+        open_db = 4 + gain_db
+
+    bgm_gain = dsp.db_to_gain(open_db)
+
+    # output follows the voice length (pydub overlay semantics)
+    total = sf.info(voice_path).frames
+    pos = 0
+
+    pairs = dsp.paired_blocks(
+        dsp.read_blocks(voice_path, SR, mono=False),
+        dsp.read_blocks(bgm_path, SR, mono=False),
+        pad_to_longest=True
+    )
+
+    for voice, bgm in pairs:
+        if pos >= total:
+            break
+
+        n = min(len(voice), total - pos)
+        duck = dsp.segment_duck_curve(pos, n, SR, speech, DUCK_DB, DUCK_RAMP)
+
+        writer.write(voice[:n] + bgm[:n] * bgm_gain * duck[:, None])
+        pos += n
+
+    master(writer)
 
-    out = voice.overlay(bgm)
-    out = out.apply_gain(TARGET_MASTER - out.dBFS)
-    out.export(MIX_WAV, "wav")
+    os.remove(voice_path)
+    os.remove(bgm_path)
 
 
 def merge():
@@ -294,23 +346,21 @@ def merge():
 
 def process():
 
-    extract_audio()
-    audio_type = detect_audio_type()
-    transcript = transcript_if_needed(audio_type)
+    info = analyze()
 
-    extract_frames()
-    scene = detect_scene()
+    audio_type, speech = detect_audio_type(info["mean_db"])
+    transcript = transcript_if_needed(audio_type, speech)
 
-    energy = analyze_video_energy()
+    scene = detect_scene(info["frames"])
 
-    prompt = build_prompt(audio_type, transcript, energy, scene)
+    prompt = build_prompt(audio_type, transcript, info["energy"], scene)
 
-    generate_music(prompt, duration(VIDEO_IN)+1)
+    generate_music(prompt, info["duration"]+1, info["cut_times"])
 
-    mix(audio_type, 0)
+    mix(audio_type, 0, speech)
     merge()
 
-    shutil.rmtree("frames", ignore_errors=True)
+    shutil.rmtree(WORK_DIR, ignore_errors=True)
     print("🎉 DONE →", VIDEO_OUT)
 
 
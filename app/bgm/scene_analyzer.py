@@ -1,42 +1,132 @@
+"""
+Scene captioning (BLIP)
+
+✓ model loads lazily on first use, once per process
+✓ frames come in as arrays (no JPEG round-trip)
+✓ near-duplicate frames dropped via 64-bit dHash
+✓ remaining frames captioned in batched generate() calls
+
+Only caller today is bgm_video_pipeline.py, which runs as a fresh
+interpreter per video (app/tasks/bgm_task.py), so BLIP is loaded once
+per job, not kept between jobs; the batching / dedup are the savings.
+"""
+
 import glob
+import threading
+
+import numpy as np
 import torch
 from PIL import Image
-from transformers import BlipProcessor, BlipForConditionalGeneration
+
+from app.services import model_store
+
+
+MODEL_KEY = "blip-caption-base"     # app.services.model_store
+
+MAX_NEW_TOKENS = 25
+BATCH_SIZE = 16
+DUP_BITS = 10          # dHash Hamming distance ≤ this → same shot
 
 device = "cuda" if torch.cuda.is_available() else "cpu"
 
-processor = BlipProcessor.from_pretrained(
-    "Salesforce/blip-image-captioning-base"
-)
+_MODEL = None
+_LOCK = threading.Lock()
+
+
+def load_blip():
+    global _MODEL
 
-model = BlipForConditionalGeneration.from_pretrained(
-    "Salesforce/blip-image-captioning-base"
-).to(device)
+    with _LOCK:
+        if _MODEL is None:
+            from transformers import BlipProcessor, BlipForConditionalGeneration
 
+            print(f"🖼 Loading BLIP on {device}")
+            processor = model_store.load_hf(MODEL_KEY, BlipProcessor)
+            model = model_store.load_hf(MODEL_KEY, BlipForConditionalGeneration).to(device)
+            model.eval()
+            _MODEL = (processor, model)
 
-def detect_scene(frames_path="frames/*.jpg", max_frames=25):
+    return _MODEL
+
+
+# -------------------------------------------------
+# perceptual dedup
+# -------------------------------------------------
+def dhash(frame, size=8) -> int:
     """
-    Returns AI-generated natural language description of the video.
-    No labels. No hardcoding. Pure captioning.
+    Difference hash: gray (size+1)×size thumbnail, compare neighbours.
     """
+    img = Image.fromarray(np.asarray(frame, dtype=np.uint8)).convert("L")
+    px = np.asarray(img.resize((size + 1, size), Image.BILINEAR), dtype=np.int16)
+    bits = (px[:, 1:] > px[:, :-1]).ravel()
+    return int.from_bytes(np.packbits(bits).tobytes(), "big")
 
-    files = sorted(glob.glob(frames_path))[:max_frames]
 
+def dedupe_frames(frames, max_bits=DUP_BITS):
+    """
+    Keep frames whose hash differs from every kept frame by > max_bits.
+    Returns kept indices (in order).
+    """
+    kept, hashes = [], []
+
+    for i, f in enumerate(frames):
+        h = dhash(f)
+        if all(bin(h ^ k).count("1") > max_bits for k in hashes):
+            kept.append(i)
+            hashes.append(h)
+
+    return kept
+
+
+# -------------------------------------------------
+# captioning
+# -------------------------------------------------
+def caption_frames(frames, batch_size=BATCH_SIZE):
+    processor, model = load_blip()
     captions = []
 
-    for f in files:
-        img = Image.open(f).convert("RGB")
+    for i in range(0, len(frames), batch_size):
+        images = [Image.fromarray(np.asarray(f, dtype=np.uint8)).convert("RGB") for f in frames[i:i + batch_size]]
+        inputs = processor(images=images, return_tensors="pt").to(device)
+
+        with torch.inference_mode():
+            output = model.generate(**inputs, max_new_tokens=MAX_NEW_TOKENS)
+
+        captions += processor.batch_decode(output, skip_special_tokens=True)
+
+    return captions
+
+
+def _load_frames(frames_path, max_frames):
+    files = sorted(glob.glob(frames_path))[:max_frames]
+    return [np.asarray(Image.open(f).convert("RGB")) for f in files]
+
 
-        inputs = processor(img, return_tensors="pt").to(device)
+def detect_scene(frames=None, frames_path="frames/*.jpg", max_frames=25):
+    """
+    Returns AI-generated natural language description of the video.
+    No labels. No hardcoding. Pure captioning.
+
+    frames: (N, H, W, 3) uint8 array / list from the analysis pass;
+            falls back to reading JPEGs from frames_path.
+    """
 
-        with torch.no_grad():
-            output = model.generate(**inputs, max_new_tokens=25)
+    if frames is None:
+        frames = _load_frames(frames_path, max_frames)
 
-        caption = processor.decode(output[0], skip_special_tokens=True)
-        captions.append(caption)
+    frames = list(frames)[:max_frames]
+    if not frames:
+        return ""
+
+    kept = dedupe_frames(frames)
+    print(f"🖼 captioning {len(kept)}/{len(frames)} frames (near-duplicates dropped)")
+
+    captions = caption_frames([frames[i] for i in kept])
+
+    # identical captions add nothing to the prompt
+    captions = list(dict.fromkeys(c.strip() for c in captions if c.strip()))
 
     # combine all captions
     final_caption = ". ".join(captions)
 
     return final_caption
-
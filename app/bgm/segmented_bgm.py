@@ -0,0 +1,192 @@
+# =========================================================
+# INDIANODE SMART BGM — SCENE-SEGMENTED GENERATION
+# =========================================================
+
+"""
+Long videos → one MusicGen job per scene segment, in parallel.
+
+✓ segments follow scene cuts from the analysis pass
+✓ short scenes merged, long scenes split (MusicGen context ~30 s)
+✓ every segment goes to the gpu queue at once → spread over workers
+✓ results joined with equal-power crossfades at scene boundaries
+
+Wall-clock ≈ ceil(segments / gpu workers) × one segment,
+instead of growing with the full video length.
+"""
+
+import time
+import uuid
+
+import numpy as np
+import soundfile as sf
+
+from app.services import artifact_store
+from app.services.artifact_store import OUTPUT_DIR
+
+
+MIN_SEGMENT = 8.0       # shorter scenes are merged into a neighbour
+MAX_SEGMENT = 30.0      # MusicGen context window (incl. the crossfade tail)
+CROSSFADE = 1.5         # seconds of overlap at each boundary
+WAIT_TIMEOUT = 900      # per batch
+
+
+# -------------------------------------------------
+# segment plan
+# -------------------------------------------------
+def plan_segments(duration, cut_times=(), min_len=MIN_SEGMENT, max_len=MAX_SEGMENT):
+    """
+    Returns [(start, end), ...] covering [0, duration].
+    """
+    if duration <= max_len:
+        return [(0.0, float(duration))]
+
+    bounds = [0.0] + sorted(t for t in cut_times if 0 < t < duration) + [float(duration)]
+
+    # merge: drop inner boundaries that would leave a piece < min_len
+    merged = [bounds[0]]
+    for b in bounds[1:-1]:
+        if b - merged[-1] >= min_len and duration - b >= min_len:
+            merged.append(b)
+    merged.append(bounds[-1])
+
+    # split: long pieces into equal parts ≤ max_len
+    segments = []
+    for start, end in zip(merged[:-1], merged[1:]):
+        parts = int(np.ceil((end - start) / max_len))
+        edges = np.linspace(start, end, parts + 1)
+        segments += [(float(a), float(b)) for a, b in zip(edges[:-1], edges[1:])]
+
+    return segments
+
+
+# -------------------------------------------------
+# fan-out
+# -------------------------------------------------
+def _check_failed(job_id, result):
+    """
+    A segment that will never produce a wav → fail the whole job now
+    instead of waiting out the timeout.
+    """
+    if result.state == "FAILURE":
+        raise RuntimeError(f"❌ segment {job_id} failed: {result.info}")
+
+    # QA gave up → the task returns None without writing a wav
+    if result.state == "SUCCESS" and not result.result:
+        raise RuntimeError(f"❌ segment {job_id} failed QA, no wav")
+
+
+def _wait_for(tasks, timeout=WAIT_TIMEOUT):
+    """
+    tasks: {job_id: AsyncResult}, in segment order.
+    Local wav path per job, in order. Segments rendered on another gpu
+    node are pulled from the shared artifact store.
+    """
+    paths = {}
+    waited = 0
+
+    while True:
+        for job_id, result in tasks.items():
+            if job_id in paths:
+                continue
+            path = artifact_store.fetch(job_id, ".wav", OUTPUT_DIR)
+            if path:
+                paths[job_id] = path
+            else:
+                _check_failed(job_id, result)
+
+        if len(paths) == len(tasks):
+            return [paths[j] for j in tasks]
+
+        time.sleep(1)
+        waited += 1
+
+        if waited % 10 == 0:
+            print(f"⏳ segments ready {len(paths)}/{len(tasks)} ({waited}s)", flush=True)
+
+        if waited > timeout:
+            raise RuntimeError("❌ TIMEOUT waiting for segment wavs")
+
+
+def generate_segments(prompt, segments, mode="cinematic", fade=CROSSFADE):
+    """
+    One musicgen.generate task per segment, all queued at once.
+    Each non-final segment is generated `fade` seconds longer so
+    it can overlap the next one (plan with max_len=MAX_SEGMENT - fade:
+    anything over MAX_SEGMENT takes musicgen's extend path, ~2× GPU).
+    """
+    from app.tasks.musicgen_task import generate_music_task
+
+    tasks = {}
+
+    for i, (start, end) in enumerate(segments):
+        job_id = uuid.uuid4().hex[:8]
+        extra = fade if i < len(segments) - 1 else 0.0
+
+        tasks[job_id] = generate_music_task.delay(job_id, {
+            "prompt": prompt,
+            "duration": min(int(np.ceil(end - start + extra)), int(MAX_SEGMENT)),
+            "mode": mode,
+            "audio_only": True,
+        })
+
+    print(f"🎼 {len(segments)} segments queued on gpu workers", flush=True)
+    return _wait_for(tasks)
+
+
+# -------------------------------------------------
+# join
+# -------------------------------------------------
+def _load(path, sr, channels):
+    audio, file_sr = sf.read(path, dtype="float32", always_2d=True)
+
+    if file_sr != sr:
+        import librosa
+        audio = librosa.resample(audio.T, orig_sr=file_sr, target_sr=sr).T
+
+    if audio.shape[1] < channels:
+        audio = np.repeat(audio[:, :1], channels, axis=1)
+
+    return audio[:, :channels]
+
+
+def crossfade_join(paths, segments, out_path, fade=CROSSFADE):
+    """
+    Place segment i at its scene start; equal-power crossfade
+    over the `fade` seconds following each boundary.
+    """
+    info = [sf.info(p) for p in paths]
+    sr = info[0].samplerate
+    channels = max(i.channels for i in info)
+
+    total = int(segments[-1][1] * sr)
+    out = np.zeros((total, channels), dtype=np.float32)
+
+    n_fade = int(fade * sr)
+    ramp = np.linspace(0.0, np.pi / 2, n_fade, dtype=np.float32)
+    fade_in, fade_out = np.sin(ramp)[:, None], np.cos(ramp)[:, None]
+
+    for i, (path, (start, _)) in enumerate(zip(paths, segments)):
+        audio = _load(path, sr, channels)
+        pos = int(start * sr)
+        audio = audio[:max(0, total - pos)]
+
+        if i > 0 and n_fade:
+            n = min(n_fade, len(audio))
+            audio[:n] *= fade_in[:n]
+            out[pos:pos + n] *= fade_out[:n]
+            # ceil()-rounded durations can overhang past the fade → drop it
+            out[pos + n:] = 0.0
+
+        out[pos:pos + len(audio)] += audio
+
+    sf.write(out_path, out, sr, subtype="PCM_16")
+    return out_path
+
+
+def generate_scored_bgm(prompt, duration, cut_times, out_path, mode="cinematic"):
+    segments = plan_segments(duration, cut_times, max_len=MAX_SEGMENT - CROSSFADE)
+    print(f"🎬 {len(segments)} scene segments: "
+          + ", ".join(f"{a:.0f}-{b:.0f}s" for a, b in segments), flush=True)
+
+    paths = generate_segments(prompt, segments, mode)
+    return crossfade_join(paths, segments, out_path)
@@ -0,0 +1,185 @@
+# =========================================================
+# INDIANODE SMART BGM — SINGLE-PASS VIDEO ANALYSIS
+# =========================================================
+
+"""
+One ffprobe (header only) + ONE ffmpeg decode gives everything
+the BGM pipeline used to collect in five-plus passes:
+
+✓ 16 kHz mono voice WAV          (VAD / Whisper input)
+✓ caption frames in memory       (RGB, ≤ MAX_FRAMES spread over the video)
+✓ per-frame luma + motion        (tiny gray frames piped to NumPy)
+✓ mean loudness                  (volumedetect on the voice branch)
+
+Replaces: duration / has_audio_stream / extract_audio /
+extract_frames / analyze_video_energy / mean_db.
+"""
+
+import json
+import os
+import re
+import subprocess
+
+import numpy as np
+
+
+FFMPEG = "/usr/bin/ffmpeg"
+FFPROBE = "ffprobe"
+
+VOICE_SR = 16000
+FRAME_FPS = 0.33          # captioning frames (same rate as before) ...
+MAX_FRAMES = 25           # ... but never more than this, spread evenly
+FRAME_SIZE = 384          # BLIP input size (it resizes to 384x384 anyway)
+
+STATS_FPS = 4             # luma / motion sampling
+STATS_W, STATS_H = 64, 36
+
+CUT_DIFF = 40             # mean |Δluma| above this → hard cut
+CALM_MOTION = 3.0
+MEDIUM_MOTION = 8.0
+
+SILENT_DB = -91.0         # volumedetect floor (digital silence)
+UNKNOWN_DB = -40.0        # no volumedetect line (old mean_db fallback)
+
+
+# -------------------------------------------------
+# probe (container header only, no decode)
+# -------------------------------------------------
+def probe(path):
+    r = subprocess.run(
+        [FFPROBE, "-v", "error",
+         "-show_entries", "format=duration:stream=codec_type",
+         "-of", "json", path],
+        capture_output=True, text=True, check=True)
+
+    info = json.loads(r.stdout)
+    kinds = {s.get("codec_type") for s in info.get("streams", [])}
+
+    return {
+        "duration": float(info.get("format", {}).get("duration", 0.0)),
+        "has_audio": "audio" in kinds,
+        "has_video": "video" in kinds,
+    }
+
+
+# -------------------------------------------------
+# frame statistics
+# -------------------------------------------------
+def _energy(motion, cuts_per_min):
+    if motion < CALM_MOTION and cuts_per_min < 4:
+        return "calm"
+    if motion < MEDIUM_MOTION and cuts_per_min < 12:
+        return "medium"
+    return "energetic"
+
+
+def frame_stats(raw: bytes, duration: float):
+    frames = np.frombuffer(raw, dtype=np.uint8)
+    frames = frames[:len(frames) // (STATS_W * STATS_H) * STATS_W * STATS_H]
+    frames = frames.reshape(-1, STATS_H, STATS_W).astype(np.float32)
+
+    if len(frames) < 2:
+        return {"luma": np.zeros(len(frames), np.float32), "motion": 0.0,
+                "cuts": 0, "cut_times": [], "energy": "calm"}
+
+    luma = frames.mean(axis=(1, 2))
+    diff = np.abs(np.diff(frames, axis=0)).mean(axis=(1, 2))
+
+    cut_idx = np.flatnonzero(diff > CUT_DIFF)
+    cuts = len(cut_idx)
+    motion = float(np.mean(diff[diff <= CUT_DIFF])) if np.any(diff <= CUT_DIFF) else float(np.mean(diff))
+    cuts_per_min = cuts / max(duration / 60, 1e-6)
+
+    return {
+        "luma": luma,
+        "motion": motion,
+        "cuts": cuts,
+        "cut_times": [float((i + 1) / STATS_FPS) for i in cut_idx],
+        "energy": _energy(motion, cuts_per_min),
+    }
+
+
+# -------------------------------------------------
+# single decode pass
+# -------------------------------------------------
+def caption_fps(duration):
+    if duration <= 0:
+        return FRAME_FPS
+    return min(FRAME_FPS, MAX_FRAMES / duration)
+
+
+def analyze_video(video, voice_wav, work_dir="frames"):
+    """
+    Returns dict:
+        duration, has_audio, mean_db,
+        frames (N, FRAME_SIZE, FRAME_SIZE, 3) uint8 for captioning,
+        luma (per stats frame), motion, cuts, cut_times (s), energy
+    Writes voice_wav (if audio). work_dir only holds the raw stats stream.
+    """
+    meta = probe(video)
+    os.makedirs(work_dir, exist_ok=True)
+    stats_path = os.path.join(work_dir, "stats.gray")
+
+    graph = (
+        f"[0:v:0]split=2[v1][v2];"
+        f"[v1]fps={caption_fps(meta['duration']):.6f},scale={FRAME_SIZE}:{FRAME_SIZE},format=rgb24[frames];"
+        f"[v2]fps={STATS_FPS},scale={STATS_W}:{STATS_H},format=gray[stats]"
+    )
+
+    if meta["has_audio"]:
+        graph += (
+            f";[0:a:0]aresample={VOICE_SR},aformat=channel_layouts=mono,asplit=2[voice][loud];"
+            f"[loud]volumedetect,anullsink"
+        )
+
+    cmd = [FFMPEG, "-y", "-nostats", "-hide_banner", "-i", video,
+           "-filter_complex", graph,
+           "-map", "[stats]", "-f", "rawvideo", "-pix_fmt", "gray", stats_path,
+           "-map", "[frames]", "-f", "rawvideo", "-pix_fmt", "rgb24", "pipe:1"]
+
+    if meta["has_audio"]:
+        cmd += ["-map", "[voice]", "-c:a", "pcm_s16le", voice_wav]
+    else:
+        print("🔇 no audio stream detected → silent video")
+
+    r = subprocess.run(cmd, capture_output=True, check=True)
+
+    stderr = r.stderr.decode(errors="ignore")
+    m = re.search(r"mean_volume:\s*(-?[\d.]+|-inf) dB", stderr)
+    if m is None:
+        mean_db = UNKNOWN_DB
+    else:
+        mean_db = SILENT_DB if m.group(1) == "-inf" else float(m.group(1))
+
+    frames = np.frombuffer(r.stdout, dtype=np.uint8).reshape(-1, FRAME_SIZE, FRAME_SIZE, 3)
+
+    with open(stats_path, "rb") as f:
+        stats = frame_stats(f.read(), meta["duration"])
+    os.remove(stats_path)
+
+    print(f"🎞 analysis: {meta['duration']:.1f}s, motion {stats['motion']:.2f}, "
+          f"{stats['cuts']} cuts, mean {mean_db:.1f} dB → {stats['energy']}")
+
+    return {
+        "duration": meta["duration"],
+        "has_audio": meta["has_audio"],
+        "mean_db": mean_db if meta["has_audio"] else SILENT_DB,
+        "frames": frames,
+        **stats,
+    }
+
+
+def scene_cuts(video):
+    """
+    Stats branch only (callers that need nothing else).
+    Returns (duration, cut_times).
+    """
+    meta = probe(video)
+
+    r = subprocess.run(
+        [FFMPEG, "-nostats", "-hide_banner", "-i", video, "-an",
+         "-vf", f"fps={STATS_FPS},scale={STATS_W}:{STATS_H},format=gray",
+         "-f", "rawvideo", "-pix_fmt", "gray", "pipe:1"],
+        capture_output=True, check=True)
+
+    return meta["duration"], frame_stats(r.stdout, meta["duration"])["cut_times"]
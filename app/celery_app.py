@@ -1,4 +1,5 @@
 from celery import Celery
+from celery.signals import worker_init
 
 celery = Celery(
     "indianode",
@@ -14,12 +15,52 @@ celery.conf.update(
     enable_utc=True,
     worker_prefetch_multiplier=1,
     task_acks_late=True,
+
+    # priorities 0 (user jobs, default) … 9 (preset pool fills);
+    # the redis transport pops lower numbers first
+    broker_transport_options={
+        "priority_steps": list(range(10)),
+        "sep": ":",
+        "queue_order_strategy": "priority",
+    },
 )
 
 # ✅ EXPLICIT imports (guaranteed registration)
 import app.tasks.musicgen_task
 import app.tasks.accompaniment_task
 import app.bgm.bgm_tasks
+import app.tasks.preset_pool_task
 # compatibility alias
 celery_app = celery
 
+
+# ✅ preset pool refill (celery -A app.celery_app beat)
+from app.services.preset_pool import POOL_REFILL_EVERY
+
+celery.conf.beat_schedule = {
+    "preset-pool-refill": {
+        "task": "preset_pool.refill",
+        "schedule": POOL_REFILL_EVERY,
+    },
+}
+
+
+# ✅ queue wait + task runtime metrics (app.services.tracing)
+from app.services.tracing import install_celery_signals
+
+install_celery_signals()
+
+
+# ✅ per-job profiling (flagged jobs + PROFILE_SAMPLE_RATE)
+from app.services import profiling
+
+profiling.install_celery_signals()
+
+
+# ✅ PRELOAD_MODELS=... → load CPU models in the parent before the pool
+# forks, so prefork children share the weights copy-on-write
+@worker_init.connect
+def _preload_models(**_):
+    from app.services.model_preload import preload
+    preload()
+
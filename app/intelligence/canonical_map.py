@@ -19,6 +19,13 @@ EMOTION_MAP = {
     "spiritual": "devotional",
     "devotion": "devotional",
 
+    "romantic": "romantic",
+    "romance": "romantic",
+    "love": "romantic",
+    "loving": "romantic",
+    "tender": "romantic",
+    "passionate": "romantic",
+
     "angry": "angry",
     "tired": "tired",
 }
@@ -89,3 +96,64 @@ AMBIENCE_MAP = {
     "market": "crowd"
 }
 
+
+# -------------------------------------------------
+# cue lists (shared by intent_analyzer, tempo / singer
+# inference and quality_guardrails through lexicon.py)
+# -------------------------------------------------
+
+# detect_emotion_rules — checked in this order, first hit wins
+RULE_EMOTION_CUES = {
+    "sad": ["sad", "down", "depressed", "unhappy", "low"],
+    "stressed": ["stressed", "stress", "anxious", "tired"],
+    "angry": ["angry", "frustrated", "mad"],
+    "happy": ["happy", "excited", "joyful"],
+}
+
+# TempoInferenceService — priority very_slow > fast > slow, else medium
+TEMPO_CUES = {
+    "very_slow": [
+        "meditative", "chant", "aarti", "deep devotion",
+        "mantra", "temple", "spiritual", "peaceful silence"
+    ],
+    "fast": [
+        "fast", "energetic", "dance", "celebration",
+        "folk", "festival", "upbeat", "rock"
+    ],
+    "slow": [
+        "devotional", "calm", "peaceful", "romantic",
+        "soft", "emotional", "bhajan", "slow"
+    ],
+}
+
+# SingerInferenceService — one point per distinct cue
+SINGER_CUES = {
+    "female": [
+        "love", "romantic", "lullaby", "mother", "goddess",
+        "soft", "gentle", "cradle", "devotional"
+    ],
+    "male": [
+        "shiva", "mahadev", "warrior", "power",
+        "strength", "chant", "mantra"
+    ],
+    "duet": [
+        "conversation", "dialogue", "together",
+        "union", "marriage", "wedding", "duet"
+    ],
+}
+
+# quality_guardrails mix style
+CINEMATIC_CUES = ["cinematic", "epic", "film", "bgm"]
+
+INSTRUMENTS = [
+    "veena", "sitar", "bansuri", "flute", "tabla", "mridangam", "tanpura",
+    "ghatam", "nadaswaram", "shehnai", "santoor", "sarangi", "harmonium",
+    "violin", "cello", "piano", "guitar", "acoustic guitar", "electric guitar",
+    "bass", "drums", "strings", "pads", "synth", "brass", "choir", "percussion",
+]
+
+GENRES = [
+    "lofi", "lo-fi", "edm", "rock", "jazz", "blues", "pop", "hip hop", "trap",
+    "ambient", "orchestral", "cinematic", "classical", "carnatic", "hindustani",
+    "folk", "bhajan", "devotional", "qawwali", "sufi", "ghazal", "trance", "house",
+]
@@ -1,6 +1,7 @@
 # app/intelligence/intent_analyzer.py
 
 from app.intelligence.llm_client import run_llm
+from app.intelligence import lexicon
 import json
 import re
 
@@ -9,18 +10,8 @@ import re
 # 1️⃣ FAST RULE-BASED EMOTION DETECTION (GUARANTEED)
 # -------------------------------------------------
 def detect_emotion_rules(text: str) -> str | None:
-    t = text.lower()
-
-    if any(w in t for w in ["sad", "down", "depressed", "unhappy", "low"]):
-        return "sad"
-    if any(w in t for w in ["stressed", "stress", "anxious", "tired"]):
-        return "stressed"
-    if any(w in t for w in ["angry", "frustrated", "mad"]):
-        return "angry"
-    if any(w in t for w in ["happy", "excited", "joyful"]):
-        return "happy"
-
-    return None
+    # sad > stressed > angry > happy, whole words only
+    return lexicon.analyze(text)["rule_emotion"]
 
 
 # -------------------------------------------------
@@ -64,7 +55,8 @@ User input:
 {text}
 """
 
-    raw = run_llm(prompt)
+    # batched with concurrent requests, stops at the closing brace
+    raw = run_llm(prompt, json_mode=True)
 
     try:
         llm_intent = json.loads(extract_json(raw))
@@ -142,6 +142,54 @@ def _join(items: List[str]) -> str:
     return ", ".join(items) if items else ""
 
 
+# =====================================================
+# Local brief (short prompts the lexicon fully explains)
+# =====================================================
+
+DEFAULT_INSTRUMENTS = {
+    "classical": ["veena", "bansuri", "tabla", "tanpura"],
+    "cinematic": ["piano", "strings", "pads", "percussion"],
+}
+
+TEMPO_BPM = {"very_slow": 60, "slow": 75, "medium": 100, "fast": 128}
+
+ENERGY_CURVE = {
+    "low": "low → low → fade",
+    "medium": "low → medium → low",
+    "high": "medium → high → high",
+}
+
+
+def local_brief(
+    match: dict,
+    instruments: Optional[List[str]] = None,
+    preset: Optional[str] = None,
+    mode: str = "cinematic",
+) -> str:
+    """
+    Same FORMAT STYLE as the LLM brief, filled from a lexicon match.
+    """
+    instruments = list(instruments or [])
+    instruments += [i for i in match["instruments"] if i not in instruments]
+    instruments = instruments or DEFAULT_INSTRUMENTS.get(mode, DEFAULT_INSTRUMENTS["cinematic"])
+
+    genre = preset or next(iter(match["genres"]), None) or mode
+    mood = match["emotion"] or match["intent"] or "neutral"
+    tempo = match["tempo"]
+    energy = match["energy"] or {"very_slow": "low", "slow": "low", "fast": "high"}.get(tempo, "medium")
+
+    lines = [f"Create a {mood} {genre} instrumental at {TEMPO_BPM[tempo]} bpm."]
+    lines.append(f"Start with {instruments[0]}.")
+    if len(instruments) > 1:
+        lines.append(f"Gradually introduce {_join(instruments[1:])}.")
+    if match["ambience"]:
+        lines.append(f"Add soft {match['ambience']} ambience underneath.")
+    lines.append(f"Finish with {instruments[0]} alone.")
+    lines.append(f"Mood: {mood}\nEnergy curve: {ENERGY_CURVE[energy]}")
+
+    return "\n\n".join(lines)
+
+
 # =====================================================
 # Main Expander
 # =====================================================
@@ -0,0 +1,202 @@
+# app/intelligence/lexicon.py
+
+"""
+Compiled lexicon matcher (local intent detection, no LLM)
+
+One pass over the prompt gives everything the rule layers used
+to collect with their own scans:
+
+✓ emotion / intent / energy / ambience   (canonical_map dicts)
+✓ rule emotion                            (detect_emotion_rules)
+✓ tempo class                             (TempoInferenceService)
+✓ singer cues + scores                    (SingerInferenceService)
+✓ mix mode                                (quality_guardrails)
+✓ genres / instruments
+✓ confidence = share of content words the lexicon explains
+
+All terms live in ONE word-boundary alternation regex, longest
+term first → "deep devotion" wins over "devotion" at the same
+position. Phrases also carry the cues of the words inside them,
+so nothing is lost by taking the longest match.
+
+    from app.intelligence import lexicon
+    lexicon.analyze("sad piano in the rain")
+    lexicon.analyze_batch(prompts)
+"""
+
+import re
+from collections import defaultdict
+from functools import lru_cache
+
+from app.intelligence.canonical_map import (
+    EMOTION_MAP,
+    INTENT_MAP,
+    ENERGY_MAP,
+    AMBIENCE_MAP,
+    RULE_EMOTION_CUES,
+    TEMPO_CUES,
+    SINGER_CUES,
+    CINEMATIC_CUES,
+    INSTRUMENTS,
+    GENRES,
+)
+
+
+# words that carry no musical meaning → ignored for confidence
+STOPWORDS = {
+    "a", "an", "the", "and", "or", "with", "of", "for", "in", "on", "at", "to",
+    "some", "me", "my", "i", "want", "need", "make", "give", "please", "like",
+    "music", "song", "track", "tune", "beat", "beats", "style", "vibe", "vibes",
+    "featuring", "feel", "feeling", "mood", "very", "bit", "little", "really",
+}
+
+# priority orders of the old rule code (first hit wins)
+RULE_EMOTION_ORDER = list(RULE_EMOTION_CUES)
+TEMPO_ORDER = ["very_slow", "fast", "slow"]
+
+CONFIDENT = 0.75
+
+_TOKEN = re.compile(r"[a-z0-9][a-z0-9'-]*")
+
+
+# -------------------------------------------------
+# build (once, at import)
+# -------------------------------------------------
+def _build():
+    entries = defaultdict(set)
+
+    for field, table in (
+        ("emotion", EMOTION_MAP),
+        ("intent", INTENT_MAP),
+        ("energy", ENERGY_MAP),
+        ("ambience", AMBIENCE_MAP),
+    ):
+        for term, value in table.items():
+            entries[term].add((field, value))
+
+    for field, groups in (
+        ("rule_emotion", RULE_EMOTION_CUES),
+        ("tempo", TEMPO_CUES),
+        ("singer", SINGER_CUES),
+    ):
+        for value, terms in groups.items():
+            for term in terms:
+                entries[term].add((field, value))
+
+    for term in CINEMATIC_CUES:
+        entries[term].add(("mode", "cinematic"))
+    for term in INSTRUMENTS:
+        entries[term].add(("instrument", term))
+    for term in GENRES:
+        entries[term].add(("genre", term))
+
+    # phrases inherit the cues of whole words inside them
+    for phrase in [t for t in entries if " " in t]:
+        for word in phrase.split():
+            entries[phrase] |= entries.get(word, set())
+
+    terms = sorted(entries, key=len, reverse=True)
+    pattern = re.compile(r"\b(?:" + "|".join(map(re.escape, terms)) + r")\b")
+
+    return pattern, {t: frozenset(e) for t, e in entries.items()}
+
+
+_PATTERN, _ENTRIES = _build()
+
+
+# -------------------------------------------------
+# resolve hits → fields
+# -------------------------------------------------
+def _first(hits, field):
+    """
+    Value of the earliest matched term for `field` (dict-map fields).
+    """
+    for _, cues in hits:
+        for f, value in cues:
+            if f == field:
+                return value
+    return None
+
+
+def _resolve(hits, covered, content):
+    found = defaultdict(set)
+    for _, cues in hits:
+        for field, value in cues:
+            found[field].add(value)
+
+    rule_emotion = next((e for e in RULE_EMOTION_ORDER if e in found["rule_emotion"]), None)
+    tempo = next((t for t in TEMPO_ORDER if t in found["tempo"]), "medium")
+
+    # one point per distinct cue term (same as SingerInferenceService._score)
+    singer_scores = {"male": 0.0, "female": 0.0, "duet": 0.0}
+    for term in {term for term, _ in hits}:
+        for field, value in _ENTRIES[term]:
+            if field == "singer":
+                singer_scores[value] += 1.0
+
+    ordered = [term for term, _ in hits]
+
+    return {
+        "emotion": _first(hits, "emotion") or rule_emotion,
+        "rule_emotion": rule_emotion,
+        "intent": _first(hits, "intent"),
+        "energy": _first(hits, "energy"),
+        "ambience": _first(hits, "ambience"),
+        "tempo": tempo,
+        "singer_scores": singer_scores,
+        "mode": "cinematic" if found["mode"] else "classical",
+        "genres": [t for t in dict.fromkeys(ordered) if ("genre", t) in _ENTRIES[t]],
+        "instruments": [t for t in dict.fromkeys(ordered) if ("instrument", t) in _ENTRIES[t]],
+        "matched": ordered,
+        "words": content,
+        "confidence": round(covered / content, 3) if content else 0.0,
+    }
+
+
+# -------------------------------------------------
+# public API
+# -------------------------------------------------
+@lru_cache(maxsize=4096)
+def _analyze(text: str) -> dict:
+    hits, spans = [], []
+    for m in _PATTERN.finditer(text):
+        hits.append((m.group(0), _ENTRIES[m.group(0)]))
+        spans.append(m.span())
+
+    covered = content = 0
+    i = 0
+    for tok in _TOKEN.finditer(text):
+        if tok.group(0) in STOPWORDS:
+            continue
+        content += 1
+        while i < len(spans) and spans[i][1] <= tok.start():
+            i += 1
+        if i < len(spans) and spans[i][0] <= tok.start() < spans[i][1]:
+            covered += 1
+
+    return _resolve(hits, covered, content)
+
+
+def analyze(text: str) -> dict:
+    """
+    Everything the rule layers know about `text`, in one scan.
+    Returned dict is shared through the cache → treat as read-only.
+    """
+    return _analyze((text or "").lower())
+
+
+def analyze_batch(texts) -> list:
+    """
+    analyze() for many prompts; duplicates are scanned once.
+    """
+    return [analyze(t) for t in texts]
+
+
+def is_confident(result: dict, max_words: int, min_confidence: float = CONFIDENT) -> bool:
+    """
+    Short prompt the lexicon explains almost entirely → no LLM needed.
+    """
+    return (
+        0 < result["words"] < max_words
+        and result["confidence"] >= min_confidence
+    )
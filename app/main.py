@@ -1,6 +1,8 @@
 # app/main.py
 
-from fastapi import FastAPI
+import time
+
+from fastapi import FastAPI, Request
 from starlette.middleware.sessions import SessionMiddleware
 
 # ✅ DB
@@ -23,6 +25,9 @@ from app.api.logout import router as logout_router
 from app.routes import billing, razorpay_webhook
 #from app.routes import billing
 from app.api.abstract_api import router as abstract_router
+from app.api.metrics import router as metrics_router
+from app.api.profiles import router as profiles_router
+from app.services.tracing import HTTP_SECONDS, record
 import app.bgm.bgm_tasks   # ✅ REGISTER CELERY TASKS
 
 # =====================================================
@@ -38,6 +43,29 @@ app.add_middleware(
     SessionMiddleware,
     secret_key="indianode-super-secret-123"
 )
+
+
+# =====================================================
+# ⏱ API handling span (route template → low cardinality)
+# =====================================================
+
+@app.middleware("http")
+async def time_requests(request: Request, call_next):
+    t0 = time.perf_counter()
+    status = 500
+    try:
+        response = await call_next(request)
+        status = response.status_code
+        return response
+    finally:
+        route = request.scope.get("route")
+        path = route.path if route is not None else "unmatched"
+        seconds = time.perf_counter() - t0
+
+        if path != "/metrics":
+            HTTP_SECONDS.labels(request.method, path, str(status)).observe(seconds)
+            record("api", seconds, "ok" if status < 500 else "error", route=path)
+
 app.include_router(me_router)
 app.include_router(logout_router)
 app.include_router(billing.router)
@@ -64,6 +92,8 @@ app.include_router(vision_router)
 app.include_router(generate_image_router)
 app.include_router(download_image_router)
 app.include_router(queue_test_router)
+app.include_router(metrics_router)
+app.include_router(profiles_router)
 
 
 # =====================================================
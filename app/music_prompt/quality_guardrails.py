@@ -2,6 +2,8 @@
 
 from typing import List
 
+from app.intelligence import lexicon
+
 """
 QUALITY GUARDRAILS — TIMBRE ONLY (SAFE FOR MULTI-INSTRUMENT)
 
@@ -49,10 +51,7 @@ VIOLIN_TIMBRE = (
 # =================================================
 
 def _detect_mode(prompt: str) -> str:
-    p = prompt.lower()
-    if any(x in p for x in ["cinematic", "epic", "film", "bgm"]):
-        return "cinematic"
-    return "classical"
+    return lexicon.analyze(prompt)["mode"]
 
 
 # =================================================
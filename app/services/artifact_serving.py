@@ -0,0 +1,186 @@
+# app/services/artifact_serving.py
+
+"""
+Artifact serving (downloads of finished wav / m4a / mp3 / mp4 files)
+
+    return serve_artifact(request, path, "video/mp4", f"{job_id}.mp4")
+
+✓ byte ranges: Range / If-Range → 206 (seek in a 50 MB MP4 without
+  re-downloading it), handled by Starlette's FileResponse
+✓ strong ETag = content hash (cached per path + inode + size + mtime,
+  so a file is hashed once per process)
+✓ If-None-Match → 304, no body
+✓ finished artifacts are immutable under their job URL →
+  Cache-Control: public, max-age=1y, immutable (ARTIFACT_CACHE_CONTROL);
+  files modified in the last SETTLE_SECONDS get no-cache (maybe still
+  being written)
+
+Handoff to the front proxy (ARTIFACT_SENDFILE), Python only sends headers:
+
+    accel     nginx X-Accel-Redirect: ARTIFACT_ACCEL_PREFIX + path below
+              ARTIFACT_ACCEL_ROOT, e.g.
+                  location /_artifacts/ { internal; alias /srv/indianode/; }
+              (nginx then does ranges + its own ETag)
+    sendfile  X-Sendfile: <absolute path> (Apache mod_xsendfile, lighttpd)
+
+Files outside ARTIFACT_ACCEL_ROOT are always served by Python.
+
+Jobs finished on another node (app.services.artifact_store), through
+serve_job_artifact():
+
+    local store   served like any file (ranges, ETag, accel / sendfile)
+    s3 store      ARTIFACT_HANDOFF=redirect (default): 307 → presigned GET,
+                  S3 does ranges / ETag / 304 and the bytes skip the API
+                  ARTIFACT_HANDOFF=stream: proxied in chunks (bucket not
+                  reachable by clients; no ranges)
+"""
+
+import hashlib
+import os
+import threading
+import time
+from collections import OrderedDict
+from pathlib import Path
+
+from fastapi import Request
+from fastapi.responses import FileResponse, RedirectResponse, Response, StreamingResponse
+
+from app.services import artifact_store
+
+
+BASE_DIR = Path(__file__).resolve().parents[2]
+
+CACHE_CONTROL = os.getenv("ARTIFACT_CACHE_CONTROL", "public, max-age=31536000, immutable")
+SETTLE_SECONDS = 5
+
+SENDFILE = os.getenv("ARTIFACT_SENDFILE", "")                 # "" | accel | sendfile
+ACCEL_ROOT = Path(os.getenv("ARTIFACT_ACCEL_ROOT", BASE_DIR)).resolve()
+ACCEL_PREFIX = os.getenv("ARTIFACT_ACCEL_PREFIX", "/_artifacts/")
+
+HANDOFF = os.getenv("ARTIFACT_HANDOFF", "redirect")           # redirect | stream
+
+HASH_CHUNK = 1 << 20
+HASH_CACHE_SIZE = 4096
+
+_hashes = OrderedDict()          # (path, ino, size, mtime_ns) → hex, LRU
+_hashes_lock = threading.Lock()
+
+
+# -------------------------------------------------
+# ETag
+# -------------------------------------------------
+def content_hash(path: str, st: os.stat_result | None = None) -> str:
+    st = st or os.stat(path)
+    key = (os.path.abspath(path), st.st_ino, st.st_size, st.st_mtime_ns)
+
+    with _hashes_lock:
+        if key in _hashes:
+            _hashes.move_to_end(key)
+            return _hashes[key]
+
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        while chunk := f.read(HASH_CHUNK):
+            h.update(chunk)
+    digest = h.hexdigest()[:32]
+
+    with _hashes_lock:
+        _hashes[key] = digest
+        while len(_hashes) > HASH_CACHE_SIZE:
+            _hashes.popitem(last=False)
+
+    return digest
+
+
+def _not_modified(request: Request, etag: str) -> bool:
+    header = request.headers.get("if-none-match")
+    if not header:
+        return False
+
+    tags = [t.strip() for t in header.split(",")]
+    # weak comparison (RFC 9110 13.1.2)
+    return "*" in tags or etag in (t[2:] if t.startswith("W/") else t for t in tags)
+
+
+# -------------------------------------------------
+# serve
+# -------------------------------------------------
+def _accel_path(path: str) -> str | None:
+    try:
+        rel = Path(path).resolve().relative_to(ACCEL_ROOT)
+    except ValueError:
+        return None
+    return ACCEL_PREFIX.rstrip("/") + "/" + rel.as_posix()
+
+
+def serve_artifact(request: Request, path: str, media_type: str, filename: str | None = None) -> Response:
+    """
+    Caller has checked that `path` exists.
+    """
+    st = os.stat(path)
+    etag = f'"{content_hash(path, st)}"'
+    settled = time.time() - st.st_mtime > SETTLE_SECONDS
+
+    headers = {
+        "ETag": etag,
+        "Cache-Control": CACHE_CONTROL if settled else "no-cache",
+        "Accept-Ranges": "bytes",
+    }
+
+    if _not_modified(request, etag):
+        return Response(status_code=304, headers=headers)
+
+    if filename:
+        headers["Content-Disposition"] = f'attachment; filename="{filename}"'
+
+    if SENDFILE == "accel" and (target := _accel_path(path)):
+        return Response(status_code=200, media_type=media_type,
+                        headers={**headers, "X-Accel-Redirect": target})
+
+    if SENDFILE == "sendfile":
+        return Response(status_code=200, media_type=media_type,
+                        headers={**headers, "X-Sendfile": os.path.abspath(path)})
+
+    return FileResponse(path, media_type=media_type, headers=headers, stat_result=st)
+
+
+def serve_job_artifact(request: Request, job_id: str, ext: str, output_dir: str,
+                       media_type: str, filename: str | None = None) -> Response | None:
+    """
+    This node's copy when it has one, else the shared artifact store.
+    None → the artifact exists nowhere (caller answers 404).
+    """
+    path = os.path.join(output_dir, f"{job_id}{ext}")
+    if os.path.exists(path):
+        return serve_artifact(request, path, media_type, filename)
+
+    store = artifact_store.get_store()
+    if store is None:
+        return None
+
+    if local := store.local_path(job_id, ext):
+        return serve_artifact(request, local, media_type, filename)
+
+    if HANDOFF == "redirect":
+        if not store.exists(job_id, ext):
+            return None
+        url = store.url(job_id, ext, filename=filename, media_type=media_type, cache_control=CACHE_CONTROL)
+        # the URL expires → the redirect itself must not be cached
+        return RedirectResponse(url, status_code=307, headers={"Cache-Control": "no-store"})
+
+    obj = store.open(job_id, ext)
+    if obj is None:
+        return None
+
+    headers = {"Cache-Control": CACHE_CONTROL}
+    if obj["etag"]:
+        headers["ETag"] = obj["etag"]
+        if _not_modified(request, obj["etag"]):
+            obj["close"]()
+            return Response(status_code=304, headers=headers)
+
+    headers["Content-Length"] = str(obj["size"])
+    if filename:
+        headers["Content-Disposition"] = f'attachment; filename="{filename}"'
+
+    return StreamingResponse(obj["chunks"], media_type=media_type, headers=headers)
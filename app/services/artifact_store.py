@@ -0,0 +1,518 @@
+# app/services/artifact_store.py
+
+"""
+Shared artifact store (job results visible to every API / worker node)
+
+Workers keep writing job files to OUTPUT_DIR (their local work area) and
+publish the finished ones to the store; an API node serves its own copy
+when it has one and the store's otherwise. API and worker nodes no
+longer need one filesystem or one working directory.
+
+    ARTIFACT_STORE=          no store: single box / shared disk (default)
+    ARTIFACT_STORE=local     directory on a shared mount (NFS, EFS, ...)
+                             ARTIFACT_ROOT=/mnt/indianode-artifacts
+    ARTIFACT_STORE=s3        any S3-compatible service (AWS, MinIO, R2, Ceph)
+                             ARTIFACT_S3_BUCKET, ARTIFACT_S3_PREFIX,
+                             ARTIFACT_S3_ENDPOINT (e.g. http://minio:9000),
+                             credentials from the usual AWS_* env / profile
+
+✓ sharded keys: <sha1(job)[:2]>/<sha1(job)[2:4]>/<job id><ext>
+  → 65536 even buckets whatever the job id looks like ("pool-…", 8-hex
+  bgm ids, uuids); small directories, spread-out S3 prefixes
+✓ streaming both ways: files move in CHUNK pieces (S3: multipart above
+  MULTIPART_SIZE), never whole in memory
+✓ atomic publish: tmp name + rename (local), single PUT / completed
+  multipart upload (S3) → readers never see half a file
+✓ handoff: url() gives a presigned GET (ARTIFACT_URL_TTL seconds), so
+  downloads can go client → S3 without passing through the API
+
+Local stand-in for S3 (no cloud account needed):
+
+    docker run -p 9000:9000 minio/minio server /data      (or: moto_server -p 9000)
+    ARTIFACT_STORE=s3 ARTIFACT_S3_ENDPOINT=http://localhost:9000 \\
+    AWS_ACCESS_KEY_ID=minioadmin AWS_SECRET_ACCESS_KEY=minioadmin \\
+        python -m app.services.artifact_store selftest
+
+    python -m app.services.artifact_store publish <job id> ...     (backfill)
+
+The s3 backend needs boto3 (pip install boto3).
+"""
+
+import argparse
+import hashlib
+import mimetypes
+import os
+import shutil
+import tempfile
+import threading
+import time
+import uuid
+from pathlib import Path
+
+
+BASE_DIR = Path(__file__).resolve().parents[2]
+OUTPUT_DIR = os.getenv("OUTPUT_DIR", str(BASE_DIR / "outputs"))
+
+ARTIFACT_STORE = os.getenv("ARTIFACT_STORE", "")                 # "" | local | s3
+ARTIFACT_ROOT = os.getenv("ARTIFACT_ROOT", str(BASE_DIR / "artifacts"))
+
+S3_BUCKET = os.getenv("ARTIFACT_S3_BUCKET", "indianode-artifacts")
+S3_PREFIX = os.getenv("ARTIFACT_S3_PREFIX", "")
+S3_ENDPOINT = os.getenv("ARTIFACT_S3_ENDPOINT") or None
+S3_REGION = os.getenv("ARTIFACT_S3_REGION") or None
+URL_TTL = int(os.getenv("ARTIFACT_URL_TTL", "3600"))
+
+CHUNK = 1 << 20
+MULTIPART_SIZE = 8 << 20
+
+# what a finished music job publishes (wav last: status flips to done on it)
+JOB_EXTENSIONS = (".peaks", ".m4a", ".mp4", ".wav")
+
+MEDIA_TYPES = {
+    ".wav": "audio/wav",
+    ".m4a": "audio/mp4",
+    ".opus": "audio/ogg",
+    ".mp3": "audio/mpeg",
+    ".peaks": "application/octet-stream",
+}
+
+
+def media_type(ext: str) -> str:
+    return MEDIA_TYPES.get(ext) or mimetypes.guess_type(f"x{ext}")[0] or "application/octet-stream"
+
+
+def _tmp_name(path) -> str:
+    return f"{path}.{uuid.uuid4().hex[:8]}.part"
+
+
+# =================================================
+# INTERFACE
+# =================================================
+class ArtifactStore:
+    """
+    One artifact = (job id, ext), e.g. ("3f2c…", ".mp4") or ("ab12cd34", "_out.mp4").
+    """
+
+    name = "?"
+
+    def key(self, job_id: str, ext: str) -> str:
+        h = hashlib.sha1(job_id.encode()).hexdigest()
+        return f"{h[:2]}/{h[2:4]}/{job_id}{ext}"
+
+    def put(self, job_id: str, ext: str, path: str):
+        """Upload a local file (streamed)."""
+        raise NotImplementedError
+
+    def get(self, job_id: str, ext: str, path: str) -> bool:
+        """Download to a local file (streamed, atomic). False → not in the store."""
+        raise NotImplementedError
+
+    def open(self, job_id: str, ext: str) -> dict | None:
+        """{"size", "etag", "chunks" (iterator of bytes), "close"}, None → missing."""
+        raise NotImplementedError
+
+    def exists(self, job_id: str, ext: str) -> bool:
+        raise NotImplementedError
+
+    def copy(self, src_id: str, dst_id: str, ext: str):
+        raise NotImplementedError
+
+    def delete(self, job_id: str, ext: str):
+        raise NotImplementedError
+
+    def url(self, job_id: str, ext: str, filename: str | None = None,
+            media_type: str | None = None, cache_control: str | None = None) -> str | None:
+        """Time-limited direct download URL, None → backend has none."""
+        return None
+
+    def local_path(self, job_id: str, ext: str) -> str | None:
+        """Path on this node's filesystem, None → remote backend / missing."""
+        return None
+
+
+def _stream_file(path):
+    f = open(path, "rb")
+
+    def chunks():
+        with f:
+            while chunk := f.read(CHUNK):
+                yield chunk
+
+    return {"size": os.fstat(f.fileno()).st_size, "etag": None, "chunks": chunks(), "close": f.close}
+
+
+# -------------------------------------------------
+# local / shared mount
+# -------------------------------------------------
+class LocalStore(ArtifactStore):
+
+    name = "local"
+
+    def __init__(self, root: str = ARTIFACT_ROOT):
+        self.root = Path(root)
+
+    def _path(self, job_id, ext) -> Path:
+        return self.root / self.key(job_id, ext)
+
+    def put(self, job_id, ext, path):
+        dst = self._path(job_id, ext)
+        dst.parent.mkdir(parents=True, exist_ok=True)
+        tmp = _tmp_name(dst)
+        shutil.copyfile(path, tmp)          # sendfile() on Linux
+        os.replace(tmp, dst)
+
+    def get(self, job_id, ext, path):
+        src = self._path(job_id, ext)
+        if not src.is_file():
+            return False
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        tmp = _tmp_name(path)
+        shutil.copyfile(src, tmp)
+        os.replace(tmp, path)
+        return True
+
+    def open(self, job_id, ext):
+        path = self._path(job_id, ext)
+        return _stream_file(path) if path.is_file() else None
+
+    def exists(self, job_id, ext):
+        return self._path(job_id, ext).is_file()
+
+    def copy(self, src_id, dst_id, ext):
+        src, dst = self._path(src_id, ext), self._path(dst_id, ext)
+        dst.parent.mkdir(parents=True, exist_ok=True)
+        tmp = _tmp_name(dst)
+        try:
+            os.link(src, tmp)               # store files are never written in place
+        except OSError:
+            shutil.copyfile(src, tmp)
+        os.replace(tmp, dst)
+
+    def delete(self, job_id, ext):
+        self._path(job_id, ext).unlink(missing_ok=True)
+
+    def local_path(self, job_id, ext):
+        path = self._path(job_id, ext)
+        return str(path) if path.is_file() else None
+
+
+# -------------------------------------------------
+# S3-compatible
+# -------------------------------------------------
+class S3Store(ArtifactStore):
+
+    name = "s3"
+
+    def __init__(self, bucket: str = S3_BUCKET, prefix: str = S3_PREFIX,
+                 endpoint_url: str | None = S3_ENDPOINT, region: str | None = S3_REGION):
+        try:
+            import boto3
+            from boto3.s3.transfer import TransferConfig
+            from botocore.config import Config
+            from botocore.exceptions import ClientError
+        except ImportError as e:
+            raise RuntimeError("ARTIFACT_STORE=s3 needs boto3 (pip install boto3)") from e
+
+        self.bucket = bucket
+        self.prefix = prefix.strip("/") + "/" if prefix.strip("/") else ""
+        self.ClientError = ClientError
+
+        self.client = boto3.client(
+            "s3",
+            endpoint_url=endpoint_url,
+            region_name=region,
+            config=Config(
+                signature_version="s3v4",
+                # MinIO / moto / Ceph behind a plain host name → path style
+                s3={"addressing_style": "path" if endpoint_url else "auto"},
+                retries={"max_attempts": 5, "mode": "standard"},
+                max_pool_connections=32,
+            ),
+        )
+        self.transfer = TransferConfig(
+            multipart_threshold=MULTIPART_SIZE,
+            multipart_chunksize=MULTIPART_SIZE,
+            io_chunksize=CHUNK,
+            max_concurrency=4,
+        )
+
+    def key(self, job_id, ext):
+        return self.prefix + super().key(job_id, ext)
+
+    def _missing(self, e) -> bool:
+        return e.response.get("Error", {}).get("Code") in ("404", "NoSuchKey", "NotFound")
+
+    def put(self, job_id, ext, path):
+        self.client.upload_file(
+            path, self.bucket, self.key(job_id, ext),
+            ExtraArgs={"ContentType": media_type(ext)},
+            Config=self.transfer,
+        )
+
+    def get(self, job_id, ext, path):
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        tmp = _tmp_name(path)
+        try:
+            self.client.download_file(self.bucket, self.key(job_id, ext), tmp, Config=self.transfer)
+        except self.ClientError as e:
+            if self._missing(e):
+                return False
+            raise
+        os.replace(tmp, path)
+        return True
+
+    def open(self, job_id, ext):
+        try:
+            obj = self.client.get_object(Bucket=self.bucket, Key=self.key(job_id, ext))
+        except self.ClientError as e:
+            if self._missing(e):
+                return None
+            raise
+
+        body = obj["Body"]
+
+        def chunks():
+            try:
+                yield from body.iter_chunks(CHUNK)
+            finally:
+                body.close()
+
+        return {"size": obj["ContentLength"], "etag": obj.get("ETag"),
+                "chunks": chunks(), "close": body.close}
+
+    def exists(self, job_id, ext):
+        try:
+            self.client.head_object(Bucket=self.bucket, Key=self.key(job_id, ext))
+        except self.ClientError as e:
+            if self._missing(e):
+                return False
+            raise
+        return True
+
+    def copy(self, src_id, dst_id, ext):
+        # server side, the bytes never come back to this node
+        self.client.copy(
+            {"Bucket": self.bucket, "Key": self.key(src_id, ext)},
+            self.bucket, self.key(dst_id, ext),
+            Config=self.transfer,
+        )
+
+    def delete(self, job_id, ext):
+        self.client.delete_object(Bucket=self.bucket, Key=self.key(job_id, ext))
+
+    def url(self, job_id, ext, filename=None, media_type=None, cache_control=None):
+        params = {"Bucket": self.bucket, "Key": self.key(job_id, ext)}
+        if filename:
+            params["ResponseContentDisposition"] = f'attachment; filename="{filename}"'
+        if media_type:
+            params["ResponseContentType"] = media_type
+        if cache_control:
+            params["ResponseCacheControl"] = cache_control
+        return self.client.generate_presigned_url("get_object", Params=params, ExpiresIn=URL_TTL)
+
+
+# =================================================
+# PROCESS-WIDE STORE
+# =================================================
+BACKENDS = {"local": LocalStore, "s3": S3Store}
+
+_store = None
+_store_lock = threading.Lock()
+
+
+def get_store() -> ArtifactStore | None:
+    """
+    Configured store, created on first use (after Celery's fork).
+    None → ARTIFACT_STORE unset, everything stays in OUTPUT_DIR.
+    """
+    global _store
+    if not ARTIFACT_STORE:
+        return None
+
+    with _store_lock:
+        if _store is None:
+            if ARTIFACT_STORE not in BACKENDS:
+                raise ValueError(f"Unknown ARTIFACT_STORE: {ARTIFACT_STORE} (local | s3)")
+            _store = BACKENDS[ARTIFACT_STORE]()
+            print(f"🗄 artifact store: {ARTIFACT_STORE}")
+    return _store
+
+
+# -------------------------------------------------
+# OUTPUT_DIR ↔ store
+# -------------------------------------------------
+_locks = {}
+_locks_lock = threading.Lock()
+
+
+def _lock(key) -> threading.Lock:
+    with _locks_lock:
+        return _locks.setdefault(key, threading.Lock())
+
+
+def _local(job_id, ext, output_dir):
+    return os.path.join(output_dir, f"{job_id}{ext}")
+
+
+def publish(job_id: str, ext: str, path: str | None = None, output_dir: str = OUTPUT_DIR) -> bool:
+    """
+    Upload one finished file (default: output_dir/<job id><ext>).
+    False → no store configured, or no such local file.
+    """
+    store = get_store()
+    path = path or _local(job_id, ext, output_dir)
+    if store is None or not os.path.exists(path):
+        return False
+
+    store.put(job_id, ext, path)
+    return True
+
+
+def exists(job_id: str, ext: str, output_dir: str = OUTPUT_DIR) -> bool:
+    if os.path.exists(_local(job_id, ext, output_dir)):
+        return True
+    store = get_store()
+    return store is not None and store.exists(job_id, ext)
+
+
+def fetch(job_id: str, ext: str, output_dir: str = OUTPUT_DIR) -> str | None:
+    """
+    Local path of the artifact, downloaded into output_dir on first use
+    (the local file then serves as this node's cache).
+    None → neither here nor in the store.
+    """
+    path = _local(job_id, ext, output_dir)
+    if os.path.exists(path):
+        return path
+
+    store = get_store()
+    if store is None:
+        return None
+
+    with _lock((job_id, ext)):
+        found = os.path.exists(path) or store.get(job_id, ext, path)
+
+    with _locks_lock:
+        _locks.pop((job_id, ext), None)
+
+    return path if found else None
+
+
+def _relocate(src_id, dst_id, ext, output_dir, keep) -> bool:
+    src, dst = _local(src_id, ext, output_dir), _local(dst_id, ext, output_dir)
+    found = False
+
+    if os.path.exists(src):
+        if keep:
+            try:
+                os.link(src, dst)
+            except OSError:
+                shutil.copyfile(src, dst)
+        else:
+            os.replace(src, dst)
+        found = True
+
+    store = get_store()
+    if store is not None and store.exists(src_id, ext):
+        store.copy(src_id, dst_id, ext)
+        if not keep:
+            store.delete(src_id, ext)
+        found = True
+
+    return found
+
+
+def move(src_id: str, dst_id: str, ext: str, output_dir: str = OUTPUT_DIR) -> bool:
+    """
+    Rename an artifact to another job id, here and in the store.
+    False → src exists nowhere.
+    """
+    return _relocate(src_id, dst_id, ext, output_dir, keep=False)
+
+
+def link(src_id: str, dst_id: str, ext: str, output_dir: str = OUTPUT_DIR) -> bool:
+    """
+    Same artifact under a second job id (hard link / server-side copy).
+    """
+    return _relocate(src_id, dst_id, ext, output_dir, keep=True)
+
+
+# =================================================
+# CLI
+# =================================================
+def selftest(store: ArtifactStore, size: int = MULTIPART_SIZE + CHUNK):
+    """
+    Round trip through the configured backend (multipart-sized file).
+    """
+    job_id = f"selftest-{uuid.uuid4().hex[:8]}"
+    copy_id = f"{job_id}-copy"
+    data = os.urandom(size)
+    digest = hashlib.sha256(data).hexdigest()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        src = os.path.join(tmp, "src.bin")
+        with open(src, "wb") as f:
+            f.write(data)
+
+        t0 = time.perf_counter()
+        store.put(job_id, ".bin", src)
+        print(f"✓ put   {store.key(job_id, '.bin')} ({size / 2 ** 20:.1f} MB, {time.perf_counter() - t0:.2f}s)")
+
+        assert store.exists(job_id, ".bin") and not store.exists(job_id, ".nope")
+        print("✓ exists")
+
+        dst = os.path.join(tmp, "dst.bin")
+        t0 = time.perf_counter()
+        assert store.get(job_id, ".bin", dst) and not store.get(job_id, ".nope", dst + "2")
+        with open(dst, "rb") as f:
+            assert hashlib.sha256(f.read()).hexdigest() == digest
+        print(f"✓ get   ({time.perf_counter() - t0:.2f}s)")
+
+        obj = store.open(job_id, ".bin")
+        h = hashlib.sha256()
+        for chunk in obj["chunks"]:
+            h.update(chunk)
+        assert obj["size"] == size and h.hexdigest() == digest
+        print("✓ open  (streamed)")
+
+        store.copy(job_id, copy_id, ".bin")
+        assert store.exists(copy_id, ".bin")
+        print("✓ copy")
+
+        url = store.url(job_id, ".bin", filename="selftest.bin")
+        if url:
+            import urllib.request
+            with urllib.request.urlopen(url) as res:
+                assert hashlib.sha256(res.read()).hexdigest() == digest
+            print("✓ url   (presigned GET)")
+
+        store.delete(job_id, ".bin")
+        store.delete(copy_id, ".bin")
+        assert not store.exists(job_id, ".bin") and not store.exists(copy_id, ".bin")
+        print("✓ delete")
+
+
+def main():
+    ap = argparse.ArgumentParser(prog="python -m app.services.artifact_store")
+    sub = ap.add_subparsers(dest="cmd", required=True)
+    sub.add_parser("selftest")
+    p = sub.add_parser("publish")
+    p.add_argument("job_ids", nargs="+")
+    p.add_argument("--ext", action="append", help=f"default: {' '.join(JOB_EXTENSIONS)}")
+    args = ap.parse_args()
+
+    store = get_store()
+    if store is None:
+        ap.error("ARTIFACT_STORE is not set")
+
+    if args.cmd == "selftest":
+        selftest(store)
+        return
+
+    for job_id in args.job_ids:
+        done = [ext for ext in args.ext or JOB_EXTENSIONS if publish(job_id, ext)]
+        print(f"{job_id}: {' '.join(done) or 'nothing in ' + OUTPUT_DIR}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,142 @@
+# app/services/audio_delivery.py
+
+"""
+Compressed delivery formats (encode once, cache next to the WAV)
+
+    GET /api/music/download/{job_id}?format=wav|m4a|opus|mp3
+
+    wav    mastered PCM (≈1411 kbps, the original download)
+    m4a    AAC 192k — encoded ONCE by the musicgen task, the MP4 muxes the
+           same AAC stream (no second encode)
+    opus   Opus 96k (ffmpeg libopus), on first request
+    mp3    MP3 128k (lameenc, in-process), on first request
+
+✓ every variant is written to outputs/<job id>.<ext> and reused after
+✓ atomic publish (tmp file + os.replace): a download racing the worker
+  never sees half a file
+✓ one encode per (job, format) per process, concurrent requests wait
+✓ with a shared artifact store the wav is pulled from it and the new
+  variant pushed back → encoded once for all API nodes
+
+Older jobs without an .m4a get one on the first m4a request.
+"""
+
+import os
+import subprocess
+import threading
+import uuid
+
+import numpy as np
+import soundfile as sf
+
+from app.services import artifact_store
+from app.utils.mp4_generator import AAC_FLAGS, FFMPEG
+
+
+MP3_BITRATE = int(os.getenv("MP3_BITRATE", "128"))         # kbps
+OPUS_BITRATE = os.getenv("OPUS_BITRATE", "96k")
+
+FORMATS = {
+    "wav": {"ext": ".wav", "media_type": "audio/wav"},
+    "m4a": {"ext": ".m4a", "media_type": "audio/mp4"},
+    "opus": {"ext": ".opus", "media_type": "audio/ogg"},
+    "mp3": {"ext": ".mp3", "media_type": "audio/mpeg"},
+}
+
+# derived from the wav → move / link together with it (pool, prompt reuse)
+DERIVED_EXTENSIONS = (".m4a", ".opus", ".mp3", ".peaks")
+
+_locks = {}
+_locks_lock = threading.Lock()
+
+
+# -------------------------------------------------
+# encoders (wav → out, atomic)
+# -------------------------------------------------
+def _part(out_path: str) -> str:
+    # unique per call: the worker and an API process may encode the same
+    # file at once; keeps the extension → ffmpeg picks the muxer
+    base, ext = os.path.splitext(out_path)
+    return f"{base}.{uuid.uuid4().hex[:8]}.part{ext}"
+
+
+def encode_aac(wav_path: str, m4a_path: str) -> str:
+    tmp = _part(m4a_path)
+    subprocess.run(
+        [FFMPEG, "-y", "-i", wav_path, "-vn", *AAC_FLAGS, "-movflags", "+faststart", tmp],
+        check=True,
+    )
+    os.replace(tmp, m4a_path)
+    return m4a_path
+
+
+def encode_opus(wav_path: str, opus_path: str) -> str:
+    tmp = _part(opus_path)
+    subprocess.run(
+        [FFMPEG, "-y", "-i", wav_path, "-vn",
+         "-c:a", "libopus", "-b:a", OPUS_BITRATE, "-vbr", "on", "-application", "audio",
+         tmp],
+        check=True,
+    )
+    os.replace(tmp, opus_path)
+    return opus_path
+
+
+def encode_mp3(wav_path: str, mp3_path: str) -> str:
+    import lameenc
+
+    pcm, sr = sf.read(wav_path, dtype="int16", always_2d=True)
+    pcm = pcm[:, :2]
+
+    encoder = lameenc.Encoder()
+    encoder.set_bit_rate(MP3_BITRATE)
+    encoder.set_in_sample_rate(sr)
+    encoder.set_channels(pcm.shape[1])
+    encoder.set_quality(2)          # 2 = high quality, 7 = fastest
+
+    data = encoder.encode(np.ascontiguousarray(pcm).tobytes()) + encoder.flush()
+
+    tmp = _part(mp3_path)
+    with open(tmp, "wb") as f:
+        f.write(data)
+    os.replace(tmp, mp3_path)
+    return mp3_path
+
+
+ENCODERS = {"m4a": encode_aac, "opus": encode_opus, "mp3": encode_mp3}
+
+
+# -------------------------------------------------
+# serve
+# -------------------------------------------------
+def _lock(key) -> threading.Lock:
+    with _locks_lock:
+        return _locks.setdefault(key, threading.Lock())
+
+
+def ensure(job_id: str, fmt: str, output_dir: str) -> str | None:
+    """
+    Path of the job's audio in `fmt`, encoding it on first use.
+    None → the job has no wav (not ready / unknown).
+    """
+    ext = FORMATS[fmt]["ext"]
+    path = os.path.join(output_dir, f"{job_id}{ext}")
+
+    # here, or already encoded by another node
+    if artifact_store.fetch(job_id, ext, output_dir):
+        return path
+
+    wav_path = artifact_store.fetch(job_id, ".wav", output_dir)
+    if wav_path is None:
+        return None
+
+    with _lock((job_id, fmt)):
+        if not os.path.exists(path):        # another request may have won
+            print(f"🎚 encoding {fmt} for {job_id}")
+            ENCODERS[fmt](wav_path, path)
+            artifact_store.publish(job_id, ext, path)
+
+    with _locks_lock:
+        _locks.pop((job_id, fmt), None)
+
+    return path
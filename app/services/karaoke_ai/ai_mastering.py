@@ -1,8 +1,5 @@
-import os
-import subprocess
-import soundfile as sf
-import numpy as np
-from scipy.signal import fftconvolve
+from app.services.karaoke_ai import dsp
+from app.services.source_separation_service import separate
 
 
 class AIMastering:
@@ -17,58 +14,10 @@ class AIMastering:
     - Loudness normalize
 
     This removes karaoke feeling completely.
-    """
-
-    def db_to_gain(self, db):
-        return 10 ** (db / 20)
-
-    # -------------------------
-    # simple compressor
-    # -------------------------
-    def compress(self, x, threshold=0.25, ratio=3):
-        out = np.copy(x)
-        mask = np.abs(out) > threshold
-        out[mask] = np.sign(out[mask]) * (
-            threshold + (np.abs(out[mask]) - threshold) / ratio
-        )
-        return out
 
-    # -------------------------
-    # tiny room reverb (MAGIC step)
-    # -------------------------
-    def add_room_reverb(self, x, sr, amount=0.12):
-        length = int(0.04 * sr)  # 40ms room
-        impulse = np.exp(-np.linspace(0, 4, length))
-
-        if x.ndim == 1:
-            wet = fftconvolve(x, impulse, mode="full")[:len(x)]
-        else:
-            wet = np.vstack([
-                fftconvolve(x[:,0], impulse, mode="full")[:len(x)],
-                fftconvolve(x[:,1], impulse, mode="full")[:len(x)]
-            ]).T
-
-        return (1 - amount) * x + amount * wet
-
-    # -------------------------
-    # stereo widen
-    # -------------------------
-    def widen(self, stereo, amount=1.4):
-        mid = (stereo[:,0] + stereo[:,1]) / 2
-        side = (stereo[:,0] - stereo[:,1]) / 2
-        side *= amount
-        left = mid + side
-        right = mid - side
-        return np.stack([left, right], axis=1)
-
-    # -------------------------
-    # normalize
-    # -------------------------
-    def normalize(self, x, target=0.98):
-        peak = np.max(np.abs(x))
-        if peak > 0:
-            x = x / peak * target
-        return x
+    DSP runs block-by-block over the in-memory stems (karaoke_ai.dsp),
+    so no full-length intermediate copies are made.
+    """
 
     # -------------------------
     # MAIN
@@ -76,41 +25,41 @@ class AIMastering:
     def mix(self, input_wav, out_path):
         print("🎧 Separating with Demucs...")
 
-        subprocess.run(["demucs", "-n", "htdemucs", input_wav], check=True)
+        # resident model, stems stay in memory (no separated/ round-trip)
+        stems, sr = separate(input_wav)
 
-        base = os.path.splitext(os.path.basename(input_wav))[0]
-        stem_dir = f"separated/htdemucs/{base}"
-
-        vocals, sr = sf.read(f"{stem_dir}/vocals.wav")
-        drums, _ = sf.read(f"{stem_dir}/drums.wav")
-        bass, _ = sf.read(f"{stem_dir}/bass.wav")
-        other, _ = sf.read(f"{stem_dir}/other.wav")
+        vocals = stems["vocals"]
+        drums = stems["drums"]
+        bass = stems["bass"]
+        other = stems["other"]
 
         min_len = min(len(vocals), len(drums), len(bass), len(other))
 
-        vocals = vocals[:min_len]
-        music = (drums + bass + other)[:min_len]
-
         print("🎛 Mixing musically...")
 
-        # soften vocal
-        vocals = self.compress(vocals)
-        vocals *= self.db_to_gain(-3)
+        vocal_gain = dsp.db_to_gain(-3)
+        music_gain = dsp.db_to_gain(+3)
+
+        # 🔥 40 ms room reverb on the vocal (key step)
+        room = dsp.Convolver(dsp.room_ir(sr, 0.04), dry=0.90, wet=0.10)
 
-        # 🔥 ADD ROOM REVERB (key step)
-        vocals = self.add_room_reverb(vocals, sr, amount=0.10)
+        writer = dsp.PeakWriter(out_path, sr, channels=2)
 
-        # stronger + wider bgm
-        music = self.widen(music, 1.5)
-        music *= self.db_to_gain(+3)
+        for i in range(0, min_len, dsp.BLOCK):
+            j = min(i + dsp.BLOCK, min_len)
 
-        mix = vocals + music
+            # soften vocal
+            v = dsp.compress(vocals[i:j], threshold=0.25, ratio=3) * vocal_gain
+            v = room.process(v)
 
-        mix = self.normalize(mix)
+            # stronger + wider bgm
+            m = drums[i:j] + bass[i:j] + other[i:j]
+            m = dsp.widen(m, 1.5) * music_gain
+
+            writer.write(v + m)
 
         print("💾 Exporting final master...")
 
-        sf.write(out_path, mix, sr)
+        writer.close(target=0.98)
 
         print("✅ Done:", out_path)
-
@@ -1,7 +1,4 @@
-import numpy as np
-import librosa
-import soundfile as sf
-from scipy.signal import fftconvolve
+from app.services.karaoke_ai import dsp
 
 
 class AudioMixer:
@@ -18,6 +15,9 @@ class AudioMixer:
 
     Result:
     Vocal sits INSIDE music, not on top
+
+    Streams both inputs block-by-block through karaoke_ai.dsp
+    (memory stays flat no matter how long the song is).
     """
 
     def __init__(
@@ -26,57 +26,15 @@ class AudioMixer:
         music_gain_db=5,
         vocal_gain_db=-5,      # softer vocal
         music_duck_db=5,
-        frame_ms=40
+        frame_ms=40,
+        duck_threshold=0.02
     ):
         self.sr = sr
         self.music_gain_db = music_gain_db
         self.vocal_gain_db = vocal_gain_db
         self.music_duck_db = music_duck_db
-        self.frame = int(sr * frame_ms / 1000)
-
-    # -------------------------
-
-    def db(self, x):
-        return 10 ** (x / 20)
-
-    def rms(self, x):
-        return np.sqrt(np.mean(x**2) + 1e-9)
-
-    # -------------------------
-    # tiny room reverb
-    # -------------------------
-
-    def room_reverb(self, x):
-        ir_len = int(self.sr * 0.08)  # 80 ms tiny room
-        ir = np.exp(-np.linspace(0, 4, ir_len))
-        wet = fftconvolve(x, ir)[:len(x)]
-        return x * 0.85 + wet * 0.15  # subtle only
-
-    # -------------------------
-    # soft compressor
-    # -------------------------
-
-    def compress(self, x, thresh=0.2, ratio=3):
-
-        out = np.copy(x)
-
-        for i in range(len(x)):
-            s = x[i]
-            if abs(s) > thresh:
-                excess = abs(s) - thresh
-                s = np.sign(s) * (thresh + excess / ratio)
-            out[i] = s
-
-        return out
-
-    # -------------------------
-    # stereo widen
-    # -------------------------
-
-    def widen(self, mono, width=0.35):
-        left = mono * (1 + width)
-        right = mono * (1 - width)
-        return np.vstack([left, right])
+        self.frame_ms = frame_ms
+        self.duck_threshold = duck_threshold
 
     # -------------------------
     # main mix
@@ -86,42 +44,38 @@ class AudioMixer:
 
         print("Loading audio...")
 
-        vocal, _ = librosa.load(vocal_path, sr=self.sr, mono=True)
-        music, _ = librosa.load(music_path, sr=self.sr, mono=True)
-
-        L = min(len(vocal), len(music))
-        vocal = vocal[:L]
-        music = music[:L]
+        vocal_gain = dsp.db_to_gain(self.vocal_gain_db)
+        music_gain = dsp.db_to_gain(self.music_gain_db)
 
-        # gains
-        vocal *= self.db(self.vocal_gain_db)
-        music *= self.db(self.music_gain_db)
+        # tiny room: 80 ms, subtle only
+        room = dsp.Convolver(dsp.room_ir(self.sr, 0.08), dry=0.85, wet=0.15)
 
-        # soften vocal
-        vocal = self.compress(vocal)
-        vocal = self.room_reverb(vocal)
+        ducker = dsp.Ducker(
+            self.sr,
+            threshold=self.duck_threshold,
+            depth_db=self.music_duck_db,
+            window_ms=self.frame_ms
+        )
 
-        out = np.zeros(L)
+        writer = dsp.PeakWriter(out_path, self.sr, channels=2)
 
-        threshold = 0.02
+        # shortest input wins (same as before)
+        pairs = dsp.paired_blocks(
+            dsp.read_blocks(vocal_path, self.sr),
+            dsp.read_blocks(music_path, self.sr)
+        )
 
-        for i in range(0, L, self.frame):
+        for vocal, music in pairs:
 
-            v = vocal[i:i+self.frame]
-            m = music[i:i+self.frame]
+            # soften vocal
+            vocal = dsp.compress(vocal * vocal_gain, threshold=0.2, ratio=3)
+            vocal = room.process(vocal)
 
-            if self.rms(v) > threshold:
-                m *= self.db(-self.music_duck_db)
+            music = ducker.process(music * music_gain, vocal)
 
-            out[i:i+self.frame] = v + m
+            writer.write(dsp.mono_to_stereo(vocal + music, width=0.35))
 
-        stereo = self.widen(out)
-
-        peak = np.max(np.abs(stereo))
-        if peak > 0.95:
-            stereo = stereo / peak * 0.95
-
-        sf.write(out_path, stereo.T, self.sr)
+        # only pull down when it would clip
+        writer.close(target=0.95, only_above=0.95)
 
         print("✅ Final studio blend ready:", out_path)
-
@@ -0,0 +1,339 @@
+# app/services/karaoke_ai/dsp.py
+
+"""
+Karaoke DSP (shared by AudioMixer, StudioMixer, AIMastering, BGM video mixer)
+
+float32, vectorized, block-by-block:
+
+✓ soft-knee compressor        (memoryless curve, pure NumPy)
+✓ envelope-follower ducking   (lfilter one-poles, state kept across blocks)
+✓ timestamp ducking           (gain curve from known speech segments)
+✓ room reverb / echo          (FFT overlap-add convolution, tail carried)
+✓ mid/side widening
+✓ streaming file helpers      (read blocks, 2-pass peak / RMS normalize)
+
+Every stateful stage has .process(block) so a whole song can be mixed
+with constant memory. Feed blocks in order, call .flush() at the end.
+"""
+
+import os
+
+import numpy as np
+import soundfile as sf
+from scipy.signal import lfilter, oaconvolve
+
+
+BLOCK = 65536
+
+
+# =========================================================
+# gain helpers
+# =========================================================
+
+def db_to_gain(db):
+    return np.float32(10 ** (db / 20))
+
+
+def peak(x) -> float:
+    return float(np.max(np.abs(x))) if len(x) else 0.0
+
+
+# =========================================================
+# soft-knee compressor (static curve)
+# =========================================================
+
+def compress(x, threshold=0.25, ratio=3.0, knee=0.05):
+    """
+    Same linear-amplitude curve the mixers used before:
+        |x| > threshold → threshold + (|x| - threshold) / ratio
+    with a quadratic knee of width `knee` around the threshold
+    (knee=0 gives the old hard-knee curve exactly).
+    """
+    x = np.asarray(x, dtype=np.float32)
+    a = np.abs(x)
+    slope = 1.0 / ratio - 1.0
+
+    y = np.where(a > threshold, threshold + (a - threshold) / ratio, a)
+
+    if knee > 0:
+        lo = threshold - knee / 2
+        hi = threshold + knee / 2
+        in_knee = (a > lo) & (a < hi)
+        y = np.where(in_knee, a + slope * (a - lo) ** 2 / (2 * knee), y)
+
+    return (np.sign(x) * y).astype(np.float32)
+
+
+# =========================================================
+# one-pole smoothing with carried state
+# =========================================================
+
+def _one_pole_coef(sr, ms):
+    if ms <= 0:
+        return 0.0
+    return float(np.exp(-1.0 / (sr * ms / 1000.0)))
+
+
+class _OnePole:
+
+    def __init__(self, sr, ms, initial=0.0):
+        self.a = _one_pole_coef(sr, ms)
+        self.zi = np.array([initial * self.a], dtype=np.float64)
+
+    def process(self, x):
+        if self.a == 0.0:
+            return x
+        y, self.zi = lfilter([1 - self.a], [1, -self.a], x, zi=self.zi)
+        return y
+
+
+# =========================================================
+# envelope-follower ducking
+# =========================================================
+
+class Ducker:
+    """
+    Lowers `music` by depth_db while `key` (the vocal) is above threshold.
+
+    key envelope : RMS over ~window_ms (one-pole on x²)
+    gain         : smoothed with attack/release-ish time constant
+    """
+
+    def __init__(self, sr, threshold=0.02, depth_db=5.0, window_ms=40, smooth_ms=30):
+        self.threshold = threshold
+        self.duck_gain = float(db_to_gain(-depth_db))
+        self.env = _OnePole(sr, window_ms)
+        self.gain = _OnePole(sr, smooth_ms, initial=1.0)
+
+    def gain_curve(self, key):
+        key = np.asarray(key, dtype=np.float32)
+        if key.ndim > 1:
+            key = key.mean(axis=1)
+
+        rms = np.sqrt(self.env.process(key.astype(np.float64) ** 2) + 1e-9)
+        target = np.where(rms > self.threshold, self.duck_gain, 1.0)
+        return self.gain.process(target).astype(np.float32)
+
+    def process(self, music, key):
+        g = self.gain_curve(key)
+        return music * (g[:, None] if music.ndim > 1 else g)
+
+
+def segment_duck_curve(start, n, sr, segments, depth_db=6.0, ramp_seconds=0.25):
+    """
+    Ducking gain for samples [start, start + n) from known
+    (start_sec, end_sec) segments, e.g. VAD speech timestamps.
+
+    Each segment gets a trapezoid: ramps down over ramp_seconds
+    before it starts, back up over ramp_seconds after it ends.
+    Stateless → any block can be computed on its own.
+    """
+    t = (start + np.arange(n)) / sr
+    cover = np.zeros(n, dtype=np.float32)
+
+    if len(segments) and ramp_seconds > 0:
+        seg = np.asarray(segments, dtype=np.float64)
+        # only segments whose ramps touch this block
+        hit = (seg[:, 0] - ramp_seconds < t[-1]) & (seg[:, 1] + ramp_seconds > t[0])
+
+        for s, e in seg[hit]:
+            rise = (t - (s - ramp_seconds)) / ramp_seconds
+            fall = ((e + ramp_seconds) - t) / ramp_seconds
+            cover = np.maximum(cover, np.clip(np.minimum(rise, fall), 0.0, 1.0))
+
+    duck = 1.0 - float(db_to_gain(-depth_db))
+    return (1.0 - duck * cover).astype(np.float32)
+
+
+# =========================================================
+# convolution reverb (FFT overlap-add, streaming)
+# =========================================================
+
+def room_ir(sr, seconds, decay=4.0):
+    """
+    Exponential-decay "tiny room" impulse (what the mixers used).
+    """
+    n = max(1, int(seconds * sr))
+    return np.exp(-np.linspace(0, decay, n)).astype(np.float32)
+
+
+def echo_ir(sr, seconds):
+    """
+    Single early reflection after `seconds`.
+    """
+    n = max(1, int(seconds * sr))
+    ir = np.zeros(n + 1, dtype=np.float32)
+    ir[n] = 1.0
+    return ir
+
+
+class Convolver:
+    """
+    out = dry * x + wet * (x ∗ ir), one block at a time.
+    """
+
+    def __init__(self, ir, dry=1.0, wet=0.1):
+        self.ir = np.asarray(ir, dtype=np.float32)
+        self.dry = np.float32(dry)
+        self.wet = np.float32(wet)
+        self.tail = None
+
+    def process(self, x):
+        x = np.asarray(x, dtype=np.float32)
+        ir = self.ir if x.ndim == 1 else self.ir[:, None]
+
+        full = oaconvolve(x, ir, mode="full", axes=0).astype(np.float32)
+
+        # previous tail is len(ir) - 1 long, always fits inside `full`
+        if self.tail is not None:
+            full[:len(self.tail)] += self.tail
+
+        out = full[:len(x)]
+        self.tail = full[len(x):]
+
+        return self.dry * x + self.wet * out
+
+    def flush(self):
+        """
+        Remaining reverb tail (wet only) after the last block.
+        """
+        tail = self.tail if self.tail is not None else np.zeros(0, np.float32)
+        self.tail = None
+        return self.wet * tail
+
+
+# =========================================================
+# stereo
+# =========================================================
+
+def widen(stereo, amount=1.4):
+    """
+    Mid/side widening: side *= amount.
+    """
+    stereo = np.asarray(stereo, dtype=np.float32)
+    mid = (stereo[:, 0] + stereo[:, 1]) * 0.5
+    side = (stereo[:, 0] - stereo[:, 1]) * 0.5 * amount
+    return np.stack([mid + side, mid - side], axis=1)
+
+
+def mono_to_stereo(mono, width=0.35):
+    """
+    Mono → stereo with side = width * mid
+    (same as left = m*(1+w), right = m*(1-w)).
+    """
+    mono = np.asarray(mono, dtype=np.float32)
+    side = mono * np.float32(width)
+    return np.stack([mono + side, mono - side], axis=1)
+
+
+# =========================================================
+# streaming file helpers
+# =========================================================
+
+def read_blocks(path, sr, mono=True, block=BLOCK):
+    """
+    Yield float32 blocks at `sr`.
+
+    Matching sample rate → true streaming via soundfile.
+    Otherwise librosa resamples the whole file once, then we slice.
+    """
+    info = sf.info(path)
+
+    if info.samplerate == sr:
+        for b in sf.blocks(path, blocksize=block, dtype="float32", always_2d=True):
+            yield b.mean(axis=1) if mono else b
+        return
+
+    import librosa
+    y, _ = librosa.load(path, sr=sr, mono=mono)
+    y = y.astype(np.float32)
+    if not mono:
+        y = y.T if y.ndim > 1 else np.stack([y, y], axis=1)
+
+    for i in range(0, len(y), block):
+        yield y[i:i + block]
+
+
+def paired_blocks(a_blocks, b_blocks, pad_to_longest=False):
+    """
+    Walk two block streams in lockstep, re-slicing to equal lengths.
+    pad_to_longest=False → stop at the shorter stream (min-length trim)
+    pad_to_longest=True  → zero-pad the shorter stream
+    """
+    a_iter, b_iter = iter(a_blocks), iter(b_blocks)
+    a = next(a_iter, None)
+    b = next(b_iter, None)
+
+    while a is not None or b is not None:
+
+        if a is None or b is None:
+            if not pad_to_longest:
+                return
+
+            if a is not None:
+                yield a, np.zeros_like(a)
+                a = next(a_iter, None)
+            else:
+                yield np.zeros_like(b), b
+                b = next(b_iter, None)
+            continue
+
+        n = min(len(a), len(b))
+        yield a[:n], b[:n]
+
+        a = a[n:] if len(a) > n else next(a_iter, None)
+        b = b[n:] if len(b) > n else next(b_iter, None)
+
+
+class PeakWriter:
+    """
+    Write float blocks to a temp file while tracking peak and RMS,
+    then rescale into the final file in a second streaming pass.
+    """
+
+    def __init__(self, out_path, sr, channels):
+        self.out_path = out_path
+        self.sr = sr
+        self.tmp_path = out_path + ".tmp.wav"
+        self.f = sf.SoundFile(self.tmp_path, "w", sr, channels, subtype="FLOAT")
+        self.peak = 0.0
+        self.sumsq = 0.0
+        self.count = 0
+
+    def write(self, block):
+        if len(block):
+            self.peak = max(self.peak, peak(block))
+            self.sumsq += float(np.sum(np.square(block, dtype=np.float64)))
+            self.count += block.size
+            self.f.write(block)
+
+    @property
+    def rms_db(self) -> float:
+        """
+        Whole-file RMS in dBFS (same as pydub's AudioSegment.dBFS).
+        """
+        if not self.sumsq:
+            return -np.inf
+        return 10 * np.log10(self.sumsq / self.count)
+
+    def close(self, target=0.98, only_above=None, subtype="PCM_16", gain=None):
+        """
+        Scale so peak == target.
+        only_above: only scale down when peak exceeds this (limiter style).
+        gain: fixed linear gain instead (e.g. RMS loudness target), clipped.
+        """
+        self.f.close()
+
+        scale = 1.0
+        if gain is not None:
+            scale = gain
+        elif self.peak > 0 and (only_above is None or self.peak > only_above):
+            scale = target / self.peak
+
+        info = sf.info(self.tmp_path)
+        with sf.SoundFile(self.out_path, "w", self.sr, info.channels, subtype=subtype) as out:
+            for b in sf.blocks(self.tmp_path, blocksize=BLOCK, dtype="float32", always_2d=True):
+                out.write(np.clip(b * np.float32(scale), -1.0, 1.0))
+
+        os.remove(self.tmp_path)
+        return self.out_path
@@ -1,25 +1,20 @@
 # app/services/karaoke_ai/midi_renderer.py
 
-import subprocess
+from app.services.midi_render_service import get_midi_render_service
 
 
 class MidiRenderer:
     """
-    Render MIDI → WAV using FluidSynth
+    Render MIDI → WAV using the shared (warm, cached) FluidSynth pool
     """
 
     def __init__(self, soundfont="/usr/share/sounds/sf2/FluidR3_GM.sf2"):
         self.soundfont = soundfont
 
     def render(self, midi_path, wav_path):
-        cmd = [
-            "fluidsynth",
-            "-ni",
-            self.soundfont,
+        get_midi_render_service().render(
             midi_path,
-            "-F", wav_path,
-            "-r", "44100"
-        ]
-
-        subprocess.run(cmd, check=True)
-
+            wav_path,
+            bank=self.soundfont,
+            sample_rate=44100
+        )
@@ -2,7 +2,8 @@ import torch
 import librosa
 import soundfile as sf
 import numpy as np
-from audiocraft.models import MusicGen
+
+from app.services import model_store
 
 
 class MusicGenBacking:
@@ -20,7 +21,7 @@ class MusicGenBacking:
     def __init__(self, chunk_seconds=20):
         print("🚀 Loading MusicGen MELODY model...")
 
-        self.model = MusicGen.get_pretrained("facebook/musicgen-melody")
+        self.model = model_store.load_musicgen("musicgen-melody")
 
         self.chunk_seconds = chunk_seconds
 
@@ -1,10 +1,10 @@
 # app/services/karaoke_ai/studio_mixer.py
 
-import numpy as np
-import librosa
-import soundfile as sf
+import os
 import subprocess
 
+from app.services.karaoke_ai import dsp
+
 
 class StudioMixer:
     """
@@ -12,52 +12,14 @@ class StudioMixer:
 
     Goal:
     Make vocal sit INSIDE music, not above it.
+
+    Processing runs block-by-block through karaoke_ai.dsp,
+    only the final loudnorm pass goes through ffmpeg.
     """
 
     def __init__(self, sr=44100):
         self.sr = sr
 
-    # =========================================================
-    # utils
-    # =========================================================
-
-    def _normalize(self, x):
-        peak = np.max(np.abs(x)) + 1e-9
-        return x / peak
-
-    def _match_length(self, a, b):
-        L = max(len(a), len(b))
-        a = np.pad(a, (0, L - len(a)))
-        b = np.pad(b, (0, L - len(b)))
-        return a, b
-
-    # =========================================================
-    # vocal compression (IMPORTANT)
-    # =========================================================
-
-    def _compress(self, x, threshold=0.25, ratio=4.0):
-        """
-        Simple soft compressor
-        reduces 'bold mic voice' effect
-        """
-        y = x.copy()
-
-        mask = np.abs(y) > threshold
-        y[mask] = np.sign(y[mask]) * (
-            threshold + (np.abs(y[mask]) - threshold) / ratio
-        )
-
-        return y
-
-    # =========================================================
-    # small room reverb (puts vocal in same space as bgm)
-    # =========================================================
-
-    def _reverb(self, x, amount=0.12):
-        delay = int(0.03 * self.sr)  # 30ms room reflection
-        wet = np.pad(x, (delay, 0))[:-delay]
-        return x + wet * amount
-
     # =========================================================
     # main mix
     # =========================================================
@@ -72,36 +34,35 @@ class StudioMixer:
     ):
         print("🎧 Loading audio...")
 
-        vocal, _ = librosa.load(vocal_path, sr=self.sr, mono=True)
-        music, _ = librosa.load(music_path, sr=self.sr, mono=True)
+        vocal_gain = dsp.db_to_gain(vocal_gain_db)
+        music_gain = dsp.db_to_gain(music_gain_db)
 
-        vocal, music = self._match_length(vocal, music)
+        # small room reflection (30 ms) puts vocal in same space as bgm
+        room = dsp.Convolver(dsp.echo_ir(self.sr, 0.03), dry=1.0, wet=0.12)
 
-        # =====================================================
-        # Gains
-        # =====================================================
+        temp = out_path.replace(".wav", "_temp.wav")
+        writer = dsp.PeakWriter(temp, self.sr, channels=1)
 
-        vocal *= 10 ** (vocal_gain_db / 20)
-        music *= 10 ** (music_gain_db / 20)
+        # shorter input is zero-padded (same as before)
+        pairs = dsp.paired_blocks(
+            dsp.read_blocks(vocal_path, self.sr),
+            dsp.read_blocks(music_path, self.sr),
+            pad_to_longest=True
+        )
 
-        # =====================================================
-        # Studio processing
-        # =====================================================
+        for vocal, music in pairs:
 
-        vocal = self._compress(vocal)     # tame peaks
-        vocal = self._reverb(vocal)       # glue to mix
+            # =================================================
+            # Studio processing
+            # =================================================
 
-        # =====================================================
-        # Mix
-        # =====================================================
+            vocal = dsp.compress(vocal * vocal_gain, threshold=0.25, ratio=4.0)   # tame peaks
+            vocal = room.process(vocal)                                           # glue to mix
 
-        mix = vocal + music
+            writer.write(vocal + music * music_gain)
 
         # limiter
-        mix = self._normalize(mix) * 0.95
-
-        temp = out_path.replace(".wav", "_temp.wav")
-        sf.write(temp, mix, self.sr)
+        writer.close(target=0.95)
 
         # =====================================================
         # Loudness normalize (pro sound)
@@ -117,5 +78,6 @@ class StudioMixer:
             out_path
         ], stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
 
-        print(f"✅ Studio mix ready: {out_path}")
+        os.remove(temp)
 
+        print(f"✅ Studio mix ready: {out_path}")
@@ -2,8 +2,9 @@
 
 import librosa
 import numpy as np
-import pretty_midi
-import crepe
+
+from app.services.melody_transcription import transcribe_notes, write_notes_midi
+from app.services.pitch_tracking_service import track_pitch
 
 
 class VocalAnalyzer:
@@ -14,8 +15,9 @@ class VocalAnalyzer:
     - melody MIDI
     """
 
-    def __init__(self, sr=16000):
+    def __init__(self, sr=16000, pitch_backend=None):
         self.sr = sr
+        self.pitch_backend = pitch_backend
 
     # ---------------------------
     # Load audio
@@ -46,36 +48,11 @@ class VocalAnalyzer:
     # Pitch → MIDI
     # ---------------------------
     def extract_melody_midi(self, y, sr, out_midi_path):
-        time, freq, conf, _ = crepe.predict(
-            y,
-            sr,
-            viterbi=True
-        )
-
-        pm = pretty_midi.PrettyMIDI()
-        inst = pretty_midi.Instrument(program=0)
-
-        step = 0.05  # 50ms resolution
-
-        for t, f, c in zip(time, freq, conf):
-            if f <= 0 or c < 0.6:
-                continue
-
-            pitch = pretty_midi.hz_to_note_number(f)
-            start = float(t)
-            end = float(t + step)
-
-            inst.notes.append(
-                pretty_midi.Note(
-                    velocity=90,
-                    pitch=int(pitch),
-                    start=start,
-                    end=end
-                )
-            )
-
-        pm.instruments.append(inst)
-        pm.write(out_midi_path)
+        time, freq, conf = track_pitch(y, sr, backend=self.pitch_backend)
+
+        notes = transcribe_notes(freq, conf, times=time)
+
+        write_notes_midi(notes, out_midi_path, program=0, velocity=90)
 
     # ---------------------------
     # Main entry
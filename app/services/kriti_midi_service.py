@@ -36,6 +36,27 @@ SWARA_MAP = {
 }
 
 
+# -------------------------------------------------------
+# 🎯 timing (shared with the sample fast path)
+# -------------------------------------------------------
+TICKS_PER_BEAT = 480
+NOTE_FRACTION = 0.9     # legato feel (less robotic)
+GAP_FRACTION = 0.1
+DEFAULT_TEMPO_BPM = 90
+DEFAULT_PROGRAM = 104
+
+
+def swara_pitches(notes: str) -> list[int]:
+    """
+    Swara string → MIDI pitches ("|" bar marks skipped)
+    """
+    return [
+        SWARA_MAP.get(token.upper(), 60)
+        for token in notes.split()
+        if token != "|"
+    ]
+
+
 # -------------------------------------------------------
 # 🎼 Kriti MIDI Builder
 # -------------------------------------------------------
@@ -45,17 +66,17 @@ class KritiMidiService:
         OUT_DIR.mkdir(parents=True, exist_ok=True)
 
     # ---------------------------------------------------
-    # Create MIDI from swaras
+    # Build MIDI from swaras (in memory)
     # ---------------------------------------------------
-    def create_midi(
+    def build_midi(
         self,
         notes: str,
         instrument: str = "veena",
-        tempo_bpm: int = 90
-    ) -> str:
+        tempo_bpm: int = DEFAULT_TEMPO_BPM
+    ) -> MidiFile:
 
         # better musical resolution
-        mid = MidiFile(ticks_per_beat=480)
+        mid = MidiFile(ticks_per_beat=TICKS_PER_BEAT)
 
         track = MidiTrack()
         mid.tracks.append(track)
@@ -70,24 +91,19 @@ class KritiMidiService:
         # 🎯 instrument selection
         # THIS is what fixes piano issue
         # ----------------------------
-        program = GM_PROGRAMS.get(instrument.lower(), 104)
+        program = GM_PROGRAMS.get(instrument.lower(), DEFAULT_PROGRAM)
         track.append(Message('program_change', program=program, time=0))
 
         # ----------------------------
         # 🎯 note rendering
         # ----------------------------
-        beat = 480
-        note_length = int(beat * 0.9)   # legato feel (less robotic)
-        gap = int(beat * 0.1)
+        beat = TICKS_PER_BEAT
+        note_length = int(beat * NOTE_FRACTION)
+        gap = int(beat * GAP_FRACTION)
 
         first_note = True
 
-        for token in notes.split():
-
-            if token == "|":
-                continue
-
-            pitch = SWARA_MAP.get(token.upper(), 60)
+        for pitch in swara_pitches(notes):
 
             # first note should start immediately
             start_time = 0 if first_note else gap
@@ -96,6 +112,20 @@ class KritiMidiService:
             track.append(Message('note_on', note=pitch, velocity=90, time=start_time))
             track.append(Message('note_off', note=pitch, velocity=80, time=note_length))
 
+        return mid
+
+    # ---------------------------------------------------
+    # Create MIDI from swaras
+    # ---------------------------------------------------
+    def create_midi(
+        self,
+        notes: str,
+        instrument: str = "veena",
+        tempo_bpm: int = DEFAULT_TEMPO_BPM
+    ) -> str:
+
+        mid = self.build_midi(notes, instrument, tempo_bpm)
+
         # ----------------------------
         # save
         # ----------------------------
@@ -103,4 +133,3 @@ class KritiMidiService:
         mid.save(out_file)
 
         return str(out_file)
-
@@ -1,8 +1,9 @@
 # app/services/kriti_render_service.py
 
-import subprocess
-from pathlib import Path
 import uuid
+from pathlib import Path
+
+from app.services.midi_render_service import get_midi_render_service
 
 
 BASE_DIR = Path(__file__).resolve().parents[2]
@@ -11,7 +12,6 @@ MIDI_DIR = BASE_DIR / "outputs/midi"
 RENDER_DIR = BASE_DIR / "outputs/renders"
 
 # ✅ Use absolute paths (systemd-safe)
-FLUIDSYNTH_BIN = "/usr/bin/fluidsynth"
 SOUNDFONT = "/usr/share/sounds/sf2/FluidR3_GM.sf2"
 
 
@@ -19,9 +19,15 @@ class KritiRenderService:
 
     def __init__(self):
         RENDER_DIR.mkdir(parents=True, exist_ok=True)
+        self.renderer = get_midi_render_service()
+
+        # preload the SoundFont once at startup, not per request
+        if Path(SOUNDFONT).exists():
+            self.renderer.warmup(SOUNDFONT, 44100)
 
     # -------------------------------------------------
     # 🎯 Render MIDI → WAV using FluidSynth
+    # (warm synth pool + render cache, no process spawn)
     # -------------------------------------------------
     def render(self, midi_path: str) -> str:
 
@@ -30,24 +36,9 @@ class KritiRenderService:
         if not Path(midi_path).exists():
             raise FileNotFoundError(f"MIDI missing: {midi_path}")
 
-        if not Path(FLUIDSYNTH_BIN).exists():
-            raise FileNotFoundError("fluidsynth not found at /usr/bin/fluidsynth")
-
         if not Path(SOUNDFONT).exists():
             raise FileNotFoundError("SoundFont missing: FluidR3_GM.sf2")
 
+        # identical swaras → identical MIDI → copied straight from cache
         out_file = RENDER_DIR / f"{uuid.uuid4()}.wav"
-
-        cmd = [
-            FLUIDSYNTH_BIN,   # ✅ absolute path
-            "-ni",
-            SOUNDFONT,
-            midi_path,
-            "-F", str(out_file),
-            "-r", "44100"
-        ]
-
-        subprocess.run(cmd, check=True)
-
-        return str(out_file)
-
+        return self.renderer.render(midi_path, str(out_file), bank=SOUNDFONT, sample_rate=44100)
@@ -0,0 +1,147 @@
+# app/services/kriti_sample_service.py
+
+"""
+Kriti fast path (swaras → WAV without a synth run per request)
+
+A kriti is only SWARA_MAP pitches on a handful of GM_PROGRAMS,
+each note with the same legato timing as KritiMidiService.create_midi.
+
+So we render every (instrument, swara) note ONCE through FluidSynth
+(note + release tail) and assemble requests by NumPy overlap-add
+at the exact onsets create_midi would produce.
+
+FluidSynth voices sum linearly, so the result matches a full render.
+Unknown instruments → caller falls back to MIDI + FluidSynth.
+"""
+
+import io
+import os
+import tempfile
+import threading
+
+import numpy as np
+import soundfile as sf
+
+from app.services.kriti_midi_service import (
+    GAP_FRACTION,
+    GM_PROGRAMS,
+    NOTE_FRACTION,
+    SWARA_MAP,
+    TICKS_PER_BEAT,
+    DEFAULT_TEMPO_BPM,
+    KritiMidiService,
+    swara_pitches,
+)
+from app.services.midi_render_service import SOUNDFONT, get_midi_render_service
+
+
+SAMPLE_RATE = 44100
+
+
+class KritiSampleService:
+
+    def __init__(self, soundfont: str = SOUNDFONT, sample_rate: int = SAMPLE_RATE):
+        self.soundfont = soundfont
+        self.sample_rate = sample_rate
+        self.midi = KritiMidiService()
+        self.renderer = get_midi_render_service()
+
+        # (program, pitch, tempo_bpm) → stereo float32 note sample
+        self._bank = {}
+        self._lock = threading.Lock()
+
+    # -------------------------------------------------
+    def supports(self, instrument: str) -> bool:
+        return instrument.lower() in GM_PROGRAMS
+
+    def _onset_seconds(self, tempo_bpm: int) -> float:
+        """
+        Seconds between note-ons, exactly as create_midi lays them out:
+        note_length + gap ticks at the MIDI tempo.
+        """
+        ticks = int(TICKS_PER_BEAT * NOTE_FRACTION) + int(TICKS_PER_BEAT * GAP_FRACTION)
+        tempo_us = int(60_000_000 / tempo_bpm)
+        return ticks * tempo_us / 1e6 / TICKS_PER_BEAT
+
+    # -------------------------------------------------
+    # sample bank
+    # -------------------------------------------------
+    def _render_note(self, instrument: str, swara: str, tempo_bpm: int) -> np.ndarray:
+        mid = self.midi.build_midi(swara, instrument, tempo_bpm)
+
+        fd, path = tempfile.mkstemp(suffix=".mid")
+        os.close(fd)
+
+        try:
+            mid.save(path)
+            audio, _ = self.renderer.render_audio(path, self.soundfont, self.sample_rate)
+        finally:
+            os.remove(path)
+
+        return audio
+
+    def _note(self, instrument: str, pitch: int, tempo_bpm: int) -> np.ndarray:
+        program = GM_PROGRAMS[instrument.lower()]
+        key = (program, pitch, tempo_bpm)
+
+        sample = self._bank.get(key)
+        if sample is not None:
+            return sample
+
+        swara = next(s for s, p in SWARA_MAP.items() if p == pitch)
+        sample = self._render_note(instrument, swara, tempo_bpm)
+
+        with self._lock:
+            self._bank[key] = sample
+
+        return sample
+
+    def warmup(self, tempo_bpm: int = DEFAULT_TEMPO_BPM):
+        """
+        Precompute every instrument × swara (call once at startup).
+        """
+        for instrument in GM_PROGRAMS:
+            for pitch in set(SWARA_MAP.values()):
+                self._note(instrument, pitch, tempo_bpm)
+
+        print(f"🎻 Kriti sample bank ready ({len(self._bank)} notes)")
+
+    # -------------------------------------------------
+    # assembly
+    # -------------------------------------------------
+    def render(
+        self,
+        notes: str,
+        instrument: str = "veena",
+        tempo_bpm: int = DEFAULT_TEMPO_BPM
+    ) -> np.ndarray:
+
+        pitches = swara_pitches(notes)
+        if not pitches:
+            return np.zeros((0, 2), dtype=np.float32)
+
+        step = self._onset_seconds(tempo_bpm)
+        onsets = [int(i * step * self.sample_rate) for i in range(len(pitches))]
+
+        samples = [self._note(instrument, p, tempo_bpm) for p in pitches]
+
+        total = max(o + len(s) for o, s in zip(onsets, samples))
+        out = np.zeros((total, 2), dtype=np.float32)
+
+        for o, s in zip(onsets, samples):
+            out[o:o + len(s)] += s
+
+        return out
+
+    def render_wav_bytes(
+        self,
+        notes: str,
+        instrument: str = "veena",
+        tempo_bpm: int = DEFAULT_TEMPO_BPM
+    ) -> bytes:
+
+        audio = self.render(notes, instrument, tempo_bpm)
+
+        buf = io.BytesIO()
+        sf.write(buf, np.clip(audio, -1.0, 1.0), self.sample_rate, format="WAV", subtype="PCM_16")
+        return buf.getvalue()
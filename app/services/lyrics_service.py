@@ -1,7 +1,10 @@
 import torch
 from transformers import AutoTokenizer, AutoModelForCausalLM
 
+from app.services import model_store
+
 MODEL_ID = "meta-llama/Meta-Llama-3-8B-Instruct"
+MODEL_KEY = "llama3-8b-instruct"     # app.services.model_store
 
 
 class LyricsService:
@@ -9,13 +12,13 @@ class LyricsService:
         device = "cuda" if torch.cuda.is_available() else "cpu"
         print(f"[LyricsService] Loading {MODEL_ID} on {device}")
 
-        self.tokenizer = AutoTokenizer.from_pretrained(
-            MODEL_ID,
+        self.tokenizer = model_store.load_hf(
+            MODEL_KEY, AutoTokenizer,
             use_fast=True
         )
 
-        self.model = AutoModelForCausalLM.from_pretrained(
-            MODEL_ID,
+        self.model = model_store.load_hf(
+            MODEL_KEY, AutoModelForCausalLM,
             torch_dtype=torch.float16 if device == "cuda" else torch.float32,
             device_map="auto"
         )
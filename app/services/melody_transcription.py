@@ -0,0 +1,226 @@
+# app/services/melody_transcription.py
+
+"""
+Melody transcription (f0 → notes)
+
+Shared by:
+- VocalAnalyzer (karaoke_ai)
+- audio_to_midi
+- midi_accompaniment_pipeline.py
+
+Turns per-frame pitch + confidence into a compact note list:
+✓ confidence hysteresis (no flicker on weak frames)
+✓ run-length encoding (one note per held pitch, not per frame)
+✓ tiny gaps bridged, tiny blips merged into neighbours
+✓ structured NumPy array → written to MIDI in one go
+
+Everything is vectorized (no per-frame Python loop).
+"""
+
+import numpy as np
+
+
+# -------------------------------------------------
+# Note array layout
+# -------------------------------------------------
+NOTE_DTYPE = np.dtype([
+    ("start", np.float32),
+    ("end", np.float32),
+    ("pitch", np.int16),
+    ("velocity", np.int16),
+])
+
+
+def empty_notes() -> np.ndarray:
+    return np.zeros(0, dtype=NOTE_DTYPE)
+
+
+# -------------------------------------------------
+# helpers
+# -------------------------------------------------
+def _hysteresis(confidence, conf_on, conf_off):
+    """
+    Frame is voiced once confidence crosses conf_on and stays
+    voiced until it drops below conf_off.
+    """
+    above_off = confidence >= conf_off
+    above_on = confidence >= conf_on
+
+    # label each contiguous run of above_off frames
+    run_start = above_off & ~np.concatenate(([False], above_off[:-1]))
+    run_id = np.cumsum(run_start)
+
+    # latest run that has already seen a conf_on frame
+    seen_on = np.maximum.accumulate(np.where(above_on, run_id, 0))
+
+    return above_off & (seen_on == run_id)
+
+
+def _runs(keys):
+    """
+    Run-length encode an int array → (starts, lengths, values)
+    """
+    if len(keys) == 0:
+        z = np.zeros(0, dtype=np.int64)
+        return z, z, z
+
+    change = np.flatnonzero(np.diff(keys)) + 1
+    starts = np.concatenate(([0], change))
+    lengths = np.diff(np.concatenate((starts, [len(keys)])))
+    return starts, lengths, keys[starts]
+
+
+def _expand(starts, lengths, values, n):
+    return np.repeat(values, lengths)[:n]
+
+
+# -------------------------------------------------
+# main
+# -------------------------------------------------
+def transcribe_notes(
+    f0,
+    confidence,
+    times=None,
+    hop_seconds: float | None = None,
+    conf_on: float = 0.6,
+    conf_off: float = 0.45,
+    min_note_seconds: float = 0.08,
+    max_gap_seconds: float = 0.06,
+) -> np.ndarray:
+    """
+    Convert frame-wise f0 (Hz) + confidence (0..1) into notes.
+
+    times       : frame timestamps (crepe style), or
+    hop_seconds : constant frame hop (pyin style)
+
+    Returns a NOTE_DTYPE structured array sorted by start.
+    """
+
+    f0 = np.asarray(f0, dtype=np.float64).ravel()
+    confidence = np.nan_to_num(
+        np.asarray(confidence, dtype=np.float64).ravel(), nan=0.0
+    )
+
+    n = min(len(f0), len(confidence))
+    if n == 0:
+        return empty_notes()
+
+    f0 = f0[:n]
+    confidence = confidence[:n]
+
+    if times is None:
+        if not hop_seconds:
+            raise ValueError("times or hop_seconds is required")
+        times = np.arange(n) * hop_seconds
+    else:
+        times = np.asarray(times, dtype=np.float64).ravel()[:n]
+        if hop_seconds is None:
+            hop_seconds = float(np.median(np.diff(times))) if n > 1 else 0.01
+
+    # ---------------------------------
+    # 1. voicing + pitch per frame
+    # ---------------------------------
+    valid = np.isfinite(f0) & (f0 > 0)
+    voiced = _hysteresis(confidence, conf_on, conf_off) & valid
+
+    pitch = np.full(n, -1, dtype=np.int64)
+    pitch[voiced] = np.round(
+        12 * np.log2(f0[voiced] / 440.0) + 69
+    ).astype(np.int64)
+    pitch[(pitch < 0) | (pitch > 127)] = -1
+
+    min_frames = max(1, int(round(min_note_seconds / hop_seconds)))
+    max_gap = int(round(max_gap_seconds / hop_seconds))
+
+    # ---------------------------------
+    # 2. bridge short unvoiced gaps between equal pitches
+    # ---------------------------------
+    starts, lengths, values = _runs(pitch)
+
+    if len(values) > 2 and max_gap > 0:
+        prev_v = np.concatenate(([-2], values[:-1]))
+        next_v = np.concatenate((values[1:], [-2]))
+        fill = (values == -1) & (lengths <= max_gap) & (prev_v == next_v) & (prev_v >= 0)
+        values = np.where(fill, prev_v, values)
+        pitch = _expand(starts, lengths, values, n)
+        starts, lengths, values = _runs(pitch)
+
+    # ---------------------------------
+    # 3. merge short blips into a touching neighbour
+    # ---------------------------------
+    if len(values) > 1:
+        prev_v = np.concatenate(([-1], values[:-1]))
+        next_v = np.concatenate((values[1:], [-1]))
+        short = (values >= 0) & (lengths < min_frames)
+        merged = np.where(prev_v >= 0, prev_v, next_v)
+        values = np.where(short, merged, values)
+        pitch = _expand(starts, lengths, values, n)
+        starts, lengths, values = _runs(pitch)
+
+    # whatever is still too short is noise
+    keep = (values >= 0) & (lengths >= min_frames)
+    starts, lengths, values = starts[keep], lengths[keep], values[keep]
+
+    if len(values) == 0:
+        return empty_notes()
+
+    # ---------------------------------
+    # 4. velocity from mean confidence per note
+    # ---------------------------------
+    csum = np.concatenate(([0.0], np.cumsum(confidence)))
+    mean_conf = (csum[starts + lengths] - csum[starts]) / lengths
+    velocity = np.clip(np.round(50 + 60 * mean_conf), 1, 127)
+
+    notes = np.empty(len(values), dtype=NOTE_DTYPE)
+    notes["start"] = times[starts]
+    notes["end"] = times[starts + lengths - 1] + hop_seconds
+    notes["pitch"] = values
+    notes["velocity"] = velocity
+
+    return notes
+
+
+# -------------------------------------------------
+# MIDI export (bulk)
+# -------------------------------------------------
+def notes_to_instrument(notes: np.ndarray, program: int = 0, velocity: int | None = None):
+    """
+    Build a pretty_midi Instrument from a NOTE_DTYPE array.
+    """
+    import pretty_midi
+
+    inst = pretty_midi.Instrument(program=program)
+
+    vel = notes["velocity"] if velocity is None else np.full(len(notes), velocity)
+
+    inst.notes = [
+        pretty_midi.Note(velocity=int(v), pitch=int(p), start=float(s), end=float(e))
+        for s, e, p, v in zip(
+            notes["start"].tolist(),
+            notes["end"].tolist(),
+            notes["pitch"].tolist(),
+            vel.tolist(),
+        )
+    ]
+
+    return inst
+
+
+def write_notes_midi(
+    notes: np.ndarray,
+    midi_path: str,
+    program: int = 0,
+    velocity: int | None = None,
+    tempo: float | None = None,
+) -> str:
+    import pretty_midi
+
+    pm = (
+        pretty_midi.PrettyMIDI(initial_tempo=tempo)
+        if tempo
+        else pretty_midi.PrettyMIDI()
+    )
+    pm.instruments.append(notes_to_instrument(notes, program, velocity))
+    pm.write(midi_path)
+
+    return midi_path
@@ -0,0 +1,413 @@
+# app/services/midi_render_service.py
+
+"""
+MIDI render service (shared by kriti, karaoke_ai and the arranger scripts)
+
+Why:
+Every render used to spawn a fresh fluidsynth / sfizz_render process,
+reload the whole SoundFont, render all tracks serially and write a WAV
+that was read straight back.
+
+What this does:
+✓ keeps FluidSynth synths warm (SoundFont loaded once, pooled)
+✓ renders each MIDI track on its own synth in parallel, then sums
+✓ caches rendered audio by hash(MIDI bytes, bank, sample rate),
+  capped by size (RENDER_CACHE_MAX_MB) and age (RENDER_CACHE_MAX_DAYS),
+  least recently used entries go first
+✓ returns float32 stereo arrays (no WAV round-trip unless asked)
+
+SFZ banks (sfizz) have no in-process API → each track still runs
+sfizz_render, but tracks run in parallel and results are cached.
+
+If pyfluidsynth is missing we fall back to the fluidsynth CLI.
+"""
+
+import hashlib
+import io
+import os
+import queue
+import shutil
+import subprocess
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+import numpy as np
+import soundfile as sf
+
+try:
+    import fluidsynth
+except ImportError:  # CLI fallback
+    fluidsynth = None
+
+
+BASE_DIR = Path(__file__).resolve().parents[2]
+CACHE_DIR = Path(os.getenv("RENDER_CACHE_DIR", BASE_DIR / "outputs/render_cache"))
+CACHE_MAX_BYTES = int(os.getenv("RENDER_CACHE_MAX_MB", "2048")) * 2**20
+CACHE_MAX_AGE = float(os.getenv("RENDER_CACHE_MAX_DAYS", "30")) * 86400
+
+FLUIDSYNTH_BIN = "/usr/bin/fluidsynth"
+SFIZZ_BIN = "/usr/local/bin/sfizz_render"
+SOUNDFONT = "/usr/share/sounds/sf2/FluidR3_GM.sf2"
+
+SAMPLE_RATE = 44100
+POOL_SIZE = int(os.getenv("RENDER_POOL_SIZE", min(4, os.cpu_count() or 2)))   # each synth holds its own copy of the bank
+TAIL_SECONDS = 1.0      # let releases ring out (CLI renders until silence)
+BLOCK = 4096
+
+
+# -------------------------------------------------
+# cache key
+# -------------------------------------------------
+def _bank_id(bank: str) -> str:
+    st = os.stat(bank)
+    return f"{os.path.abspath(bank)}:{st.st_size}:{int(st.st_mtime)}"
+
+
+def render_key(midi_bytes: bytes, bank: str, sample_rate: int) -> str:
+    h = hashlib.sha256()
+    h.update(midi_bytes)
+    h.update(_bank_id(bank).encode())
+    h.update(str(sample_rate).encode())
+    return h.hexdigest()
+
+
+# -------------------------------------------------
+# warm synth pool (one per bank + sample rate)
+# -------------------------------------------------
+class _SynthPool:
+
+    def __init__(self, soundfont: str, sample_rate: int, size: int):
+        self.soundfont = soundfont
+        self.sample_rate = sample_rate
+        self.size = size
+        self._free = queue.Queue()
+        self._created = 0
+        self._lock = threading.Lock()
+
+    def _new_synth(self):
+        synth = fluidsynth.Synth(samplerate=float(self.sample_rate))
+        sfid = synth.sfload(self.soundfont)
+        return synth, sfid
+
+    def warmup(self):
+        with self._lock:
+            while self._created < self.size:
+                self._free.put(self._new_synth())
+                self._created += 1
+
+    def acquire(self):
+        try:
+            return self._free.get_nowait()
+        except queue.Empty:
+            pass
+
+        with self._lock:
+            if self._created < self.size:
+                self._created += 1
+                return self._new_synth()
+
+        return self._free.get()
+
+    def release(self, item):
+        synth, _ = item
+
+        # silence + reset every channel so the next track starts clean
+        for ch in range(16):
+            synth.cc(ch, 120, 0)   # all sound off
+            synth.cc(ch, 121, 0)   # reset controllers
+
+        self._free.put(item)
+
+
+# -------------------------------------------------
+# per-track synthesis
+# -------------------------------------------------
+def _track_events(inst):
+    """
+    (time, order, kind, a, b) — note-offs sort before note-ons at same time
+    """
+    events = []
+
+    for n in inst.notes:
+        events.append((n.start, 2, "on", n.pitch, n.velocity))
+        events.append((n.end, 0, "off", n.pitch, 0))
+
+    for b in inst.pitch_bends:
+        events.append((b.time, 1, "bend", b.pitch, 0))
+
+    for c in inst.control_changes:
+        events.append((c.time, 1, "cc", c.number, c.value))
+
+    events.sort(key=lambda e: (e[0], e[1]))
+    return events
+
+
+def _synth_track(pool: _SynthPool, inst, end_time: float) -> np.ndarray:
+    sr = pool.sample_rate
+    item = pool.acquire()
+    synth, sfid = item
+
+    try:
+        channel = 9 if inst.is_drum else 0
+        synth.program_select(channel, sfid, 128 if inst.is_drum else 0, inst.program)
+
+        total = int((end_time + TAIL_SECONDS) * sr)
+        out = np.zeros((total, 2), dtype=np.float32)
+
+        pos = 0
+        for t, _, kind, a, b in _track_events(inst):
+            target = min(int(t * sr), total)
+
+            while pos < target:
+                n = min(BLOCK, target - pos)
+                out[pos:pos + n] = synth.get_samples(n).reshape(-1, 2) / 32768.0
+                pos += n
+
+            if kind == "on":
+                synth.noteon(channel, a, b)
+            elif kind == "off":
+                synth.noteoff(channel, a)
+            elif kind == "bend":
+                synth.pitch_bend(channel, a)
+            else:
+                synth.cc(channel, a, b)
+
+        while pos < total:
+            n = min(BLOCK, total - pos)
+            out[pos:pos + n] = synth.get_samples(n).reshape(-1, 2) / 32768.0
+            pos += n
+
+        return out
+
+    finally:
+        pool.release(item)
+
+
+def _sum_tracks(tracks) -> np.ndarray:
+    tracks = [t for t in tracks if len(t)]
+    if not tracks:
+        return np.zeros((0, 2), dtype=np.float32)
+
+    out = np.zeros((max(len(t) for t in tracks), 2), dtype=np.float32)
+    for t in tracks:
+        out[:len(t)] += t
+    return out
+
+
+# -------------------------------------------------
+# service
+# -------------------------------------------------
+class MidiRenderService:
+
+    def __init__(self, pool_size: int = POOL_SIZE, cache_dir: Path = CACHE_DIR,
+                 cache_max_bytes: int = CACHE_MAX_BYTES, cache_max_age: float = CACHE_MAX_AGE):
+        self.pool_size = pool_size
+        self.cache_dir = Path(cache_dir)
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        self.cache_max_bytes = cache_max_bytes
+        self.cache_max_age = cache_max_age
+        self._prune_lock = threading.Lock()
+
+        self._pools = {}
+        self._pools_lock = threading.Lock()
+        self._executor = ThreadPoolExecutor(max_workers=pool_size)
+
+    # ---------------------------------------------
+    def _pool(self, soundfont: str, sample_rate: int) -> _SynthPool:
+        key = (os.path.abspath(soundfont), sample_rate)
+
+        with self._pools_lock:
+            if key not in self._pools:
+                self._pools[key] = _SynthPool(soundfont, sample_rate, self.pool_size)
+            return self._pools[key]
+
+    def warmup(self, soundfont: str = SOUNDFONT, sample_rate: int = SAMPLE_RATE):
+        """
+        Preload the bank into every pooled synth (call at worker start).
+        """
+        if fluidsynth is not None and not soundfont.endswith(".sfz"):
+            self._pool(soundfont, sample_rate).warmup()
+
+    def _cache_path(self, key: str) -> Path:
+        return self.cache_dir / key[:2] / f"{key}.wav"
+
+    def prune(self):
+        """
+        Drop entries older than cache_max_age, then the least recently
+        used ones until the cache fits cache_max_bytes (hits touch mtime).
+        """
+        with self._prune_lock:
+            entries = []
+            for path in self.cache_dir.glob("*/*.wav"):
+                try:
+                    st = path.stat()
+                except FileNotFoundError:
+                    continue
+                entries.append((st.st_mtime, st.st_size, path))
+
+            entries.sort()
+            total = sum(size for _, size, _ in entries)
+            now = time.time()
+
+            for mtime, size, path in entries:
+                if total <= self.cache_max_bytes and now - mtime <= self.cache_max_age:
+                    break
+                path.unlink(missing_ok=True)
+                total -= size
+
+    # ---------------------------------------------
+    # backends
+    # ---------------------------------------------
+    def _render_fluidsynth(self, midi_bytes, soundfont, sample_rate):
+        import pretty_midi
+
+        pm = pretty_midi.PrettyMIDI(io.BytesIO(midi_bytes))
+        end_time = pm.get_end_time()
+        pool = self._pool(soundfont, sample_rate)
+
+        tracks = self._executor.map(
+            lambda inst: _synth_track(pool, inst, end_time),
+            pm.instruments,
+        )
+
+        return _sum_tracks(list(tracks))
+
+    def _render_cli(self, cmd_for, midi_bytes, sample_rate, split_tracks):
+        """
+        Subprocess renderers (fluidsynth CLI fallback, sfizz_render).
+        """
+        import pretty_midi
+
+        with tempfile.TemporaryDirectory() as tmp:
+            midis = []
+
+            if split_tracks:
+                pm = pretty_midi.PrettyMIDI(io.BytesIO(midi_bytes))
+                for i, inst in enumerate(pm.instruments):
+                    one = pretty_midi.PrettyMIDI(resolution=pm.resolution)
+                    one.instruments.append(inst)
+                    path = os.path.join(tmp, f"track_{i}.mid")
+                    one.write(path)
+                    midis.append(path)
+            else:
+                path = os.path.join(tmp, "song.mid")
+                Path(path).write_bytes(midi_bytes)
+                midis.append(path)
+
+            def one_track(path):
+                wav = path[:-4] + ".wav"
+                subprocess.run(cmd_for(path, wav), check=True,
+                               stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+                audio, _ = sf.read(wav, dtype="float32", always_2d=True)
+                if audio.shape[1] == 1:
+                    audio = np.repeat(audio, 2, axis=1)
+                return audio[:, :2]
+
+            return _sum_tracks(list(self._executor.map(one_track, midis)))
+
+    def _render_sfz(self, midi_bytes, sfz, sample_rate):
+        def cmd(midi, wav):
+            return [
+                SFIZZ_BIN,
+                "--sfz", sfz,
+                "--midi", midi,
+                "--wav", wav,
+                "--samplerate", str(sample_rate),
+                "--quality", "4",
+                "--polyphony", "64",
+            ]
+        return self._render_cli(cmd, midi_bytes, sample_rate, split_tracks=True)
+
+    def _render_fluidsynth_cli(self, midi_bytes, soundfont, sample_rate):
+        def cmd(midi, wav):
+            return [FLUIDSYNTH_BIN, "-ni", soundfont, midi, "-F", wav, "-r", str(sample_rate)]
+        return self._render_cli(cmd, midi_bytes, sample_rate, split_tracks=False)
+
+    # ---------------------------------------------
+    # public API
+    # ---------------------------------------------
+    def render_audio(
+        self,
+        midi_path: str,
+        bank: str = SOUNDFONT,
+        sample_rate: int = SAMPLE_RATE,
+    ) -> tuple[np.ndarray, str]:
+        """
+        Returns (stereo float32 audio, cached wav path).
+        The cached file is shared by every caller: read it, never modify it.
+        """
+        if not Path(bank).exists():
+            raise FileNotFoundError(f"Instrument bank missing: {bank}")
+
+        midi_bytes = Path(midi_path).read_bytes()
+        key = render_key(midi_bytes, bank, sample_rate)
+        cached = self._cache_path(key)
+
+        if cached.exists():
+            try:
+                audio, _ = sf.read(cached, dtype="float32", always_2d=True)
+                os.utime(cached)        # recently used → pruned last
+                return audio, str(cached)
+            except (OSError, RuntimeError):
+                pass                    # pruned in between → render again
+
+        if bank.endswith(".sfz"):
+            audio = self._render_sfz(midi_bytes, bank, sample_rate)
+        elif fluidsynth is not None:
+            audio = self._render_fluidsynth(midi_bytes, bank, sample_rate)
+        else:
+            audio = self._render_fluidsynth_cli(midi_bytes, bank, sample_rate)
+
+        # atomic publish so concurrent renders never read half a file
+        cached.parent.mkdir(parents=True, exist_ok=True)
+        tmp = cached.with_suffix(f".{os.getpid()}.{threading.get_ident()}.tmp.wav")
+        sf.write(tmp, np.clip(audio, -1.0, 1.0), sample_rate, subtype="PCM_16")
+        os.replace(tmp, cached)
+        self.prune()
+
+        return audio, str(cached)
+
+    def render(
+        self,
+        midi_path: str,
+        wav_path: str | None = None,
+        bank: str = SOUNDFONT,
+        sample_rate: int = SAMPLE_RATE,
+    ) -> str:
+        """
+        Render MIDI → WAV at wav_path (a new temp file when None).
+        Always a private copy: the caller may move / edit / delete it
+        without touching the shared cache.
+        """
+        _, cached = self.render_audio(midi_path, bank, sample_rate)
+
+        if wav_path is None:
+            fd, wav_path = tempfile.mkstemp(suffix=".wav")
+            os.close(fd)
+
+        shutil.copyfile(cached, wav_path)
+        return wav_path
+
+
+# -------------------------------------------------
+# shared instance
+# -------------------------------------------------
+_SERVICE = None
+_SERVICE_LOCK = threading.Lock()
+
+
+def get_midi_render_service() -> MidiRenderService:
+    global _SERVICE
+
+    with _SERVICE_LOCK:
+        if _SERVICE is None:
+            _SERVICE = MidiRenderService()
+
+    return _SERVICE
+
+
+def render_midi_file(midi_path, wav_path, bank=SOUNDFONT, sample_rate=SAMPLE_RATE) -> str:
+    return get_midi_render_service().render(midi_path, wav_path, bank, sample_rate)
@@ -0,0 +1,136 @@
+# app/services/model_preload.py
+
+"""
+Preload CPU models in the Celery parent, share them copy-on-write
+
+Why:
+With prefork concurrency N every child loaded its own crepe / demucs /
+prompt-encoder copy → RSS grew linearly with N.
+
+What this does:
+✓ loads the models named in PRELOAD_MODELS in the worker parent
+  (celery worker_init, i.e. BEFORE the pool forks)
+✓ gc.freeze() afterwards so the collector never writes to those
+  object headers in the children (keeps pages shared)
+✓ children find the models already resident → only pages they
+  actually write become private
+
+    PRELOAD_MODELS=demucs,crepe,prompt-encoder celery -A app.celery_app worker -Q cpu -c 8
+
+Only models the task code calls IN the worker process benefit. The BGM
+video pipeline (BLIP, Whisper, silero VAD) runs as a subprocess with
+its own interpreter per video and loads its own copies, so those are
+not preloadable; get_whisper / get_silero_vad only dedupe loads within
+that one run.
+
+Rules:
+- CPU only. CUDA must not be initialised before fork; GPU models
+  still load lazily in each child.
+- No inference in the parent (thread pools + fork don't mix), and no
+  models that start thread pools on load (CTranslate2 Whisper).
+"""
+
+import gc
+import os
+import threading
+import time
+
+
+PRELOAD_MODELS = [m.strip() for m in os.getenv("PRELOAD_MODELS", "").split(",") if m.strip()]
+
+WHISPER_SIZE = os.getenv("BGM_WHISPER_MODEL", "small")
+
+# checks CUDA through NVML instead of creating a context (fork-safe)
+os.environ.setdefault("PYTORCH_NVML_BASED_CUDA_CHECK", "1")
+
+
+_RESIDENT = {}
+_LOCK = threading.Lock()
+
+
+def resident(name: str, loader):
+    """
+    Process-wide model cache. Survives fork → children reuse parent copies.
+    """
+    with _LOCK:
+        if name not in _RESIDENT:
+            _RESIDENT[name] = loader()
+    return _RESIDENT[name]
+
+
+# -------------------------------------------------
+# shared getters (used by callers AND by preload)
+# -------------------------------------------------
+def get_whisper(size: str = WHISPER_SIZE, device: str = "cpu", compute_type: str = "int8"):
+    from app.services import model_store
+
+    return resident(
+        f"whisper-{size}:{device}:{compute_type}",
+        lambda: model_store.load_whisper(size, device, compute_type),
+    )
+
+
+def get_silero_vad():
+    from app.services import model_store
+
+    return resident("silero-vad", model_store.load_silero_vad)
+
+
+def _crepe():
+    from app.services.pitch_tracking_service import load_crepe
+    return load_crepe("tiny", "cpu")
+
+
+def _llm():
+    from app.intelligence import llm_client
+    # model only: the batcher thread starts lazily in each child
+    llm_client._load_model()
+
+
+def _prompt_encoder():
+    from app.services.prompt_index import get_encoder
+    return get_encoder()
+
+
+def _demucs():
+    from app.services.source_separation_service import load_separator
+    return load_separator(device="cpu")
+
+
+PRELOADERS = {
+    "crepe": _crepe,
+    "demucs": _demucs,
+    "llm": _llm,
+    "prompt-encoder": _prompt_encoder,
+}
+
+
+# -------------------------------------------------
+# preload
+# -------------------------------------------------
+def preload(names=None) -> dict:
+    """
+    Load `names` (default PRELOAD_MODELS) in this process, then freeze GC.
+    Returns {name: seconds}.
+    """
+    names = PRELOAD_MODELS if names is None else names
+    if not names:
+        return {}
+
+    unknown = [n for n in names if n not in PRELOADERS]
+    if unknown:
+        raise KeyError(f"Unknown preload model(s) {unknown} (known: {', '.join(PRELOADERS)})")
+
+    times = {}
+    for name in names:
+        t0 = time.perf_counter()
+        PRELOADERS[name]()
+        times[name] = time.perf_counter() - t0
+        print(f"📦 preloaded {name} in {times[name]:.1f}s (pid {os.getpid()})")
+
+    # move everything alive now into the permanent generation:
+    # no GC header writes after fork → pages stay shared
+    gc.collect()
+    gc.freeze()
+
+    return times
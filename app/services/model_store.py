@@ -0,0 +1,516 @@
+# app/services/model_store.py
+
+"""
+Local model store (offline weights for every model the stack uses)
+
+Why:
+MusicGen (+ its T5 text encoder) / BLIP / Whisper / flan-t5 / TinyLlama /
+Llama-3 / silero-vad / demucs were all pulled from their hubs at runtime.
+Cold starts depended on hub lookups and failed outright without network.
+
+What this does:
+✓ one directory (MODEL_STORE_DIR) with a manifest.json + sha256 per file
+✓ prefetch CLI fills it once (deploy step / image build)
+✓ loaders read ONLY from the store (no hub lookups)
+✓ safetensors preferred when a repo ships them (memory-mapped by transformers)
+✓ every load is timed → time-to-ready per model
+
+    python -m app.services.model_store list
+    python -m app.services.model_store prefetch musicgen-large blip-caption-base
+    python -m app.services.model_store prefetch --all
+    python -m app.services.model_store verify
+    python -m app.services.model_store ready tinyllama-chat flan-t5-base
+
+Missing models raise FileNotFoundError naming the prefetch command.
+MODEL_STORE_ALLOW_HUB=1 falls back to the hub instead (dev machines).
+MUSICGEN_BACKEND=stub loads a synthetic MusicGen (load tests, no GPU).
+"""
+
+import argparse
+import hashlib
+import json
+import os
+import threading
+import time
+from contextlib import contextmanager
+from pathlib import Path
+
+
+BASE_DIR = Path(__file__).resolve().parents[2]
+STORE_DIR = Path(os.getenv("MODEL_STORE_DIR", BASE_DIR / "models"))
+MANIFEST = STORE_DIR / "manifest.json"
+
+ALLOW_HUB = os.getenv("MODEL_STORE_ALLOW_HUB", "0") == "1"
+
+# "stub" → synthetic MusicGen for load tests (app/services/musicgen_stub.py)
+MUSICGEN_BACKEND = os.getenv("MUSICGEN_BACKEND", "audiocraft")
+
+
+# -------------------------------------------------
+# registry (key → where it comes from)
+# -------------------------------------------------
+MODELS = {
+    # audiocraft reads state_dict.bin + compression_state_dict.bin from a dir
+    "musicgen-small":     {"kind": "musicgen", "repo": "facebook/musicgen-small"},
+    "musicgen-large":     {"kind": "musicgen", "repo": "facebook/musicgen-large"},
+    "musicgen-melody":    {"kind": "musicgen", "repo": "facebook/musicgen-melody"},
+
+    "blip-caption-base":  {"kind": "hf", "repo": "Salesforce/blip-image-captioning-base",
+                           "cls": "BlipForConditionalGeneration"},
+    "flan-t5-base":       {"kind": "hf", "repo": "google/flan-t5-base", "cls": "AutoModelForSeq2SeqLM"},
+    "tinyllama-chat":     {"kind": "hf", "repo": "TinyLlama/TinyLlama-1.1B-Chat-v1.0", "cls": "AutoModelForCausalLM"},
+    "llama3-8b-instruct": {"kind": "hf", "repo": "meta-llama/Meta-Llama-3-8B-Instruct", "cls": "AutoModelForCausalLM"},
+    "minilm-l6":          {"kind": "hf", "repo": "sentence-transformers/all-MiniLM-L6-v2", "cls": "AutoModel"},
+
+    # text encoder of every MusicGen checkpoint (audiocraft's T5Conditioner)
+    "t5-base":            {"kind": "hf", "repo": "t5-base", "cls": "T5EncoderModel"},
+
+    # CTranslate2 conversions used by faster-whisper
+    "whisper-tiny":       {"kind": "hf", "repo": "Systran/faster-whisper-tiny"},
+    "whisper-base":       {"kind": "hf", "repo": "Systran/faster-whisper-base"},
+    "whisper-small":      {"kind": "hf", "repo": "Systran/faster-whisper-small"},
+    "whisper-medium":     {"kind": "hf", "repo": "Systran/faster-whisper-medium"},
+
+    "silero-vad":         {"kind": "torchhub", "repo": "snakers4/silero-vad", "entry": "silero_vad"},
+    "htdemucs":           {"kind": "demucs", "repo": "htdemucs"},
+}
+
+MUSICGEN_FILES = ["state_dict.bin", "compression_state_dict.bin", "*.json"]
+MUSICGEN_TEXT_ENCODER = "t5-base"
+
+# never needed when loading through transformers
+HF_SKIP = ["original/*", "*.onnx", "*.msgpack", "*.h5", "*.ot", "flax_model*", "tf_model*", "rust_model*"]
+HF_WEIGHTS_FALLBACK = ["*.bin", "*.pt", "*.pth"]
+
+READY_TIMES = {}        # key → seconds of the last load in this process
+
+_LOCK = threading.Lock()
+
+
+# -------------------------------------------------
+# manifest
+# -------------------------------------------------
+def _read_manifest() -> dict:
+    if not MANIFEST.exists():
+        return {}
+    return json.loads(MANIFEST.read_text())
+
+
+def _write_manifest(manifest: dict):
+    STORE_DIR.mkdir(parents=True, exist_ok=True)
+    tmp = MANIFEST.with_suffix(f".{os.getpid()}.tmp")
+    tmp.write_text(json.dumps(manifest, indent=2, sort_keys=True))
+    os.replace(tmp, MANIFEST)
+
+
+def _sha256(path: Path) -> str:
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            h.update(chunk)
+    return h.hexdigest()
+
+
+def _record(key: str, path: Path):
+    files = {}
+    total = 0
+
+    for p in sorted(path.rglob("*")):
+        if p.is_file() and ".cache" not in p.parts:
+            rel = str(p.relative_to(path))
+            files[rel] = {"sha256": _sha256(p), "bytes": p.stat().st_size}
+            total += p.stat().st_size
+
+    with _LOCK:
+        manifest = _read_manifest()
+        manifest[key] = {
+            **MODELS[key],
+            "path": str(path.relative_to(STORE_DIR)),
+            "files": files,
+            "bytes": total,
+            "fetched_at": int(time.time()),
+        }
+        _write_manifest(manifest)
+
+    return manifest[key]
+
+
+# -------------------------------------------------
+# lookup
+# -------------------------------------------------
+def model_path(key: str) -> Path:
+    """
+    Local directory for `key`. Cheap check (manifest + file sizes);
+    full checksums are `verify`.
+    """
+    if key not in MODELS:
+        raise KeyError(f"Unknown model '{key}' (known: {', '.join(MODELS)})")
+
+    entry = _read_manifest().get(key)
+    if entry is None:
+        raise FileNotFoundError(
+            f"Model '{key}' not in {STORE_DIR}. "
+            f"Run: python -m app.services.model_store prefetch {key}"
+        )
+
+    path = STORE_DIR / entry["path"]
+    for rel, meta in entry["files"].items():
+        f = path / rel
+        if not f.exists() or f.stat().st_size != meta["bytes"]:
+            raise FileNotFoundError(
+                f"Model '{key}' incomplete ({rel}). "
+                f"Run: python -m app.services.model_store prefetch {key}"
+            )
+
+    return path
+
+
+def _source(key: str) -> str:
+    """
+    Local path, or the hub id when the store is missing it and
+    MODEL_STORE_ALLOW_HUB=1.
+    """
+    try:
+        return str(model_path(key))
+    except FileNotFoundError:
+        if not ALLOW_HUB:
+            raise
+        print(f"⚠️ {key} not in model store → loading from hub")
+        return MODELS[key]["repo"]
+
+
+def has_safetensors(path) -> bool:
+    return Path(path).is_dir() and any(Path(path).rglob("*.safetensors"))
+
+
+@contextmanager
+def timed(key: str):
+    """
+    with timed("musicgen-large"): model = ...
+    """
+    from app.services.tracing import record
+
+    t0 = time.perf_counter()
+    yield
+    READY_TIMES[key] = time.perf_counter() - t0
+    print(f"⏱ {key} ready in {READY_TIMES[key]:.2f}s")
+    record("model_load", READY_TIMES[key], model=key)
+
+
+# -------------------------------------------------
+# loaders (store only)
+# -------------------------------------------------
+def _is_model(cls) -> bool:
+    """
+    False for tokenizers / processors / feature extractors (their Auto*
+    factories included), True for everything else.
+    """
+    import transformers
+    from transformers.feature_extraction_utils import FeatureExtractionMixin
+    from transformers.image_processing_utils import ImageProcessingMixin
+    from transformers.processing_utils import ProcessorMixin
+    from transformers.tokenization_utils_base import PreTrainedTokenizerBase
+
+    factories = tuple(
+        getattr(transformers, name)
+        for name in ("AutoTokenizer", "AutoProcessor", "AutoFeatureExtractor", "AutoImageProcessor")
+        if hasattr(transformers, name)
+    )
+    if cls in factories:
+        return False
+    bases = (PreTrainedTokenizerBase, ProcessorMixin, FeatureExtractionMixin, ImageProcessingMixin)
+    return not (isinstance(cls, type) and issubclass(cls, bases))
+
+
+def load_hf(key: str, cls, **kwargs):
+    """
+    cls.from_pretrained from the store. safetensors (mmap) when present.
+    Works for models, tokenizers and processors.
+    """
+    source = _source(key)
+    is_model = _is_model(cls)
+
+    if Path(source).is_dir():
+        kwargs.setdefault("local_files_only", True)
+        if is_model and has_safetensors(source):
+            kwargs.setdefault("use_safetensors", True)
+
+    with timed(key if is_model else f"{key}:{cls.__name__}"):
+        return cls.from_pretrained(source, **kwargs)
+
+
+def load_musicgen(key: str):
+    if MUSICGEN_BACKEND == "stub":
+        from app.services.musicgen_stub import StubMusicGen
+        with timed(key):
+            return StubMusicGen(key)
+
+    from audiocraft.models import MusicGen
+
+    with timed(key), _t5_from_store():
+        return MusicGen.get_pretrained(_source(key))
+
+
+class _StoreRedirect:
+    """
+    Stands in for a transformers class inside audiocraft: from_pretrained
+    of the hub name loads the store copy instead.
+    """
+
+    def __init__(self, cls, hub_name: str, source: str):
+        self.cls, self.hub_name, self.source = cls, hub_name, source
+
+    def from_pretrained(self, name, *args, **kwargs):
+        if name == self.hub_name and Path(self.source).is_dir():
+            name = self.source
+            kwargs.setdefault("local_files_only", True)
+        return self.cls.from_pretrained(name, *args, **kwargs)
+
+
+_T5_LOCK = threading.Lock()
+
+
+@contextmanager
+def _t5_from_store():
+    """
+    audiocraft's T5Conditioner calls T5Tokenizer / T5EncoderModel
+    .from_pretrained("t5-base") straight from the hub; while MusicGen
+    loads, those names point at the store copy.
+    """
+    from audiocraft.modules import conditioners
+
+    source = _source(MUSICGEN_TEXT_ENCODER)
+    names = ("T5Tokenizer", "T5EncoderModel")
+
+    with _T5_LOCK:
+        originals = {n: getattr(conditioners, n) for n in names}
+        for n, cls in originals.items():
+            setattr(conditioners, n, _StoreRedirect(cls, MUSICGEN_TEXT_ENCODER, source))
+        try:
+            yield
+        finally:
+            for n, cls in originals.items():
+                setattr(conditioners, n, cls)
+
+
+def load_whisper(size: str, device: str, compute_type: str):
+    from faster_whisper import WhisperModel
+
+    key = f"whisper-{size}"
+    source = _source(key) if key in MODELS else size
+
+    with timed(key):
+        return WhisperModel(source, device=device, compute_type=compute_type,
+                            local_files_only=Path(source).is_dir())
+
+
+def load_silero_vad():
+    import torch
+
+    key = "silero-vad"
+    spec = MODELS[key]
+
+    with timed(key):
+        try:
+            return torch.hub.load(str(model_path(key)), spec["entry"], source="local")
+        except FileNotFoundError:
+            if not ALLOW_HUB:
+                raise
+            return torch.hub.load(spec["repo"], spec["entry"])
+
+
+def demucs_hub_dir():
+    """
+    Point torch.hub at the store so demucs finds its checkpoints offline.
+    """
+    import torch
+
+    try:
+        path = model_path("htdemucs")
+    except FileNotFoundError:
+        if not ALLOW_HUB:
+            raise
+        print("⚠️ htdemucs not in model store → loading from hub")
+        return None
+
+    torch.hub.set_dir(str(path))
+    return path
+
+
+# -------------------------------------------------
+# prefetch
+# -------------------------------------------------
+def _hf_patterns(repo: str):
+    from huggingface_hub import HfApi
+
+    files = HfApi().list_repo_files(repo)
+    ignore = list(HF_SKIP)
+
+    # safetensors present → skip the duplicate pickle weights
+    if any(f.endswith(".safetensors") for f in files):
+        ignore += HF_WEIGHTS_FALLBACK
+
+    return ignore
+
+
+def prefetch(key: str, force: bool = False):
+    spec = MODELS[key]
+    dest = STORE_DIR / key
+
+    # MusicGen also needs its T5 text encoder offline
+    if spec["kind"] == "musicgen":
+        prefetch(MUSICGEN_TEXT_ENCODER, force=force)
+
+    if not force:
+        try:
+            model_path(key)
+            print(f"✓ {key} already in store")
+            return
+        except FileNotFoundError:
+            pass
+
+    print(f"⬇️ Fetching {key} ({spec['repo']})")
+    dest.mkdir(parents=True, exist_ok=True)
+
+    if spec["kind"] in ("hf", "musicgen"):
+        from huggingface_hub import snapshot_download
+
+        if spec["kind"] == "musicgen":
+            kwargs = {"allow_patterns": MUSICGEN_FILES}
+        else:
+            kwargs = {"ignore_patterns": _hf_patterns(spec["repo"])}
+
+        snapshot_download(spec["repo"], local_dir=dest, local_dir_use_symlinks=False, **kwargs)
+
+    elif spec["kind"] == "torchhub":
+        import shutil
+        import torch
+
+        hub = dest / ".hub"
+        torch.hub.set_dir(str(hub))
+        torch.hub.load(spec["repo"], spec["entry"], trust_repo=True)
+
+        # keep the checked-out repo itself, loaded later with source="local"
+        repo_dir = next(p for p in hub.iterdir() if p.is_dir() and p.name.startswith(spec["repo"].replace("/", "_")))
+        for item in repo_dir.iterdir():
+            target = dest / item.name
+            if target.exists():
+                shutil.rmtree(target) if target.is_dir() else target.unlink()
+            shutil.move(str(item), target)
+        shutil.rmtree(hub, ignore_errors=True)
+
+    elif spec["kind"] == "demucs":
+        import torch
+        from demucs.pretrained import get_model
+
+        torch.hub.set_dir(str(dest))
+        get_model(spec["repo"])
+
+    entry = _record(key, dest)
+    print(f"✅ {key}: {len(entry['files'])} files, {entry['bytes'] / 2**30:.2f} GiB")
+
+
+def verify(keys=None) -> bool:
+    manifest = _read_manifest()
+    ok = True
+
+    for key in keys or sorted(manifest):
+        entry = manifest.get(key)
+        if entry is None:
+            print(f"✗ {key}: not in store")
+            ok = False
+            continue
+
+        path = STORE_DIR / entry["path"]
+        bad = [rel for rel, meta in entry["files"].items()
+               if not (path / rel).exists() or _sha256(path / rel) != meta["sha256"]]
+
+        print(f"{'✓' if not bad else '✗'} {key}" + (f": {len(bad)} bad files ({bad[0]} …)" if bad else ""))
+        ok = ok and not bad
+
+    return ok
+
+
+# -------------------------------------------------
+# time-to-ready
+# -------------------------------------------------
+def _ready_one(key: str):
+    spec = MODELS[key]
+
+    if spec["kind"] == "musicgen":
+        load_musicgen(key)
+
+    elif spec["kind"] == "torchhub":
+        load_silero_vad()
+
+    elif spec["kind"] == "demucs":
+        demucs_hub_dir()
+        from demucs.pretrained import get_model
+        with timed(key):
+            get_model(spec["repo"])
+
+    elif key.startswith("whisper-"):
+        load_whisper(key.split("-", 1)[1], "cpu", "int8")
+
+    else:
+        import transformers
+        load_hf(key, getattr(transformers, spec["cls"]))
+
+    return READY_TIMES.get(key)
+
+
+def ready_times(keys=None) -> dict:
+    """
+    Cold-load every model (each from the store) and report seconds.
+    """
+    out = {}
+    for key in keys or sorted(_read_manifest()):
+        _ready_one(key)
+        out[key] = READY_TIMES.get(key)
+    return out
+
+
+# -------------------------------------------------
+# CLI
+# -------------------------------------------------
+def main(argv=None):
+    ap = argparse.ArgumentParser(prog="python -m app.services.model_store")
+    sub = ap.add_subparsers(dest="cmd", required=True)
+
+    sub.add_parser("list")
+
+    p = sub.add_parser("prefetch")
+    p.add_argument("keys", nargs="*")
+    p.add_argument("--all", action="store_true")
+    p.add_argument("--force", action="store_true")
+
+    v = sub.add_parser("verify")
+    v.add_argument("keys", nargs="*")
+
+    r = sub.add_parser("ready")
+    r.add_argument("keys", nargs="*")
+
+    args = ap.parse_args(argv)
+
+    if args.cmd == "list":
+        manifest = _read_manifest()
+        print(f"store: {STORE_DIR}")
+        for key, spec in MODELS.items():
+            entry = manifest.get(key)
+            size = f"{entry['bytes'] / 2**30:6.2f} GiB" if entry else "   missing"
+            print(f"  {key:<20} {size}   {spec['repo']}")
+
+    elif args.cmd == "prefetch":
+        for key in (list(MODELS) if args.all else args.keys):
+            prefetch(key, force=args.force)
+
+    elif args.cmd == "verify":
+        raise SystemExit(0 if verify(args.keys) else 1)
+
+    elif args.cmd == "ready":
+        for key, sec in ready_times(args.keys).items():
+            print(f"{key:<20} " + (f"{sec:8.2f}s" if sec is not None else "       ?"))
+
+
+if __name__ == "__main__":
+    main()
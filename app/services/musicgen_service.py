@@ -1,9 +1,10 @@
 import os
 import uuid
 import torch
-from audiocraft.models import MusicGen
 from audiocraft.data.audio import audio_write
 
+from app.services import model_store
+
 OUTPUT_DIR = "outputs"
 
 class MusicGenService:
@@ -11,7 +12,7 @@ class MusicGenService:
         os.makedirs(OUTPUT_DIR, exist_ok=True)
 
         print("[MusicGenService] Loading MusicGen model…")
-        self.model = MusicGen.get_pretrained("facebook/musicgen-small")
+        self.model = model_store.load_musicgen("musicgen-small")
 
         self.model.set_generation_params(
             use_sampling=True,
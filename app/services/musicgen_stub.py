@@ -0,0 +1,198 @@
+# app/services/musicgen_stub.py
+
+"""
+Stub MusicGen backend (load testing without a GPU or checkpoints)
+
+Selected in model_store.load_musicgen:
+
+    MUSICGEN_BACKEND=stub celery -A app.celery_app worker -Q gpu -c 1
+    MUSICGEN_BACKEND=stub uvicorn app.main:app
+    python -m benchmarks.load_test --jobs 100 --concurrency 16
+
+Same contract as audiocraft's MusicGen:
+✓ set_generation_params(...) with the same keywords and defaults
+  (a call resets everything it does not pass, like the real one)
+✓ generate / generate_with_chroma / generate_continuation /
+  generate_unconditional → float tensor [batch, 1, duration * 32000]
+✓ deterministic audio: same description + duration → same samples
+  (chord pad + melody + pulse, seeded from the text)
+
+Cost knobs (per process):
+    MUSICGEN_STUB_LATENCY       wall seconds per second of audio (0.5)
+    MUSICGEN_STUB_MEMORY_MB     resident ballast held like weights (0)
+    MUSICGEN_STUB_LOAD_SECONDS  time-to-ready on load (0)
+
+Generations serialize on a lock, like one GPU per worker.
+"""
+
+import hashlib
+import os
+import threading
+import time
+
+import numpy as np
+
+
+LATENCY = float(os.getenv("MUSICGEN_STUB_LATENCY", "0.5"))
+MEMORY_MB = int(os.getenv("MUSICGEN_STUB_MEMORY_MB", "0"))
+LOAD_SECONDS = float(os.getenv("MUSICGEN_STUB_LOAD_SECONDS", "0"))
+
+SAMPLE_RATE = 32000
+FRAME_RATE = 50             # encodec frames per second (tokens)
+CODEBOOKS = 4
+
+_GPU = threading.Lock()
+
+
+# -------------------------------------------------
+# synth
+# -------------------------------------------------
+def _seed(text: str, duration: float) -> int:
+    digest = hashlib.sha256(f"{text}|{duration:.3f}".encode()).digest()
+    return int.from_bytes(digest[:8], "little")
+
+
+def synth(text: str, duration: float, sr: int = SAMPLE_RATE) -> np.ndarray:
+    """
+    Mono float32, peak ~0.5. Pure function of (text, duration).
+    """
+    rng = np.random.default_rng(_seed(text or "", duration))
+    n = int(round(duration * sr))
+    t = np.arange(n) / sr
+
+    root = 45 + int(rng.integers(0, 12))              # A2 … G#3
+    bpm = float(rng.integers(70, 130))
+    beat = 60 / bpm
+    progression = rng.choice([0, 5, 7, 9], size=8)     # I IV V vi degrees
+
+    bar = (t // (4 * beat)).astype(int) % len(progression)
+    chord_root = root + progression[bar]
+
+    def hz(m):
+        return 440.0 * 2 ** ((m - 69) / 12)
+
+    pad = sum(0.08 * np.sin(2 * np.pi * hz(chord_root + 12 + i) * t) for i in (0, 4, 7))
+    bass = 0.15 * np.sin(2 * np.pi * hz(chord_root) * t)
+
+    steps = rng.choice([0, 2, 4, 7, 9, 12], size=int(duration / beat) + 2)
+    melody_hz = hz(root + 24 + steps[(t / beat).astype(int)])
+    phase = 2 * np.pi * np.cumsum(melody_hz) / sr
+    envelope = np.exp(-3 * (t % beat))
+    melody = 0.12 * envelope * (np.sin(phase) + 0.3 * np.sin(2 * phase))
+
+    pulse = 0.06 * rng.standard_normal(n) * np.exp(-40 * (t % beat))
+
+    wav = pad + bass + melody + pulse
+    return (0.5 * wav / (np.abs(wav).max() + 1e-9)).astype(np.float32)
+
+
+# -------------------------------------------------
+# model
+# -------------------------------------------------
+class StubMusicGen:
+    """
+    Drop-in for audiocraft.models.MusicGen (what model_store.load_musicgen returns).
+    """
+
+    sample_rate = SAMPLE_RATE
+    frame_rate = FRAME_RATE
+    audio_channels = 1
+
+    def __init__(
+        self,
+        name: str = "musicgen-large",
+        latency: float = LATENCY,
+        memory_mb: int = MEMORY_MB,
+        load_seconds: float = LOAD_SECONDS,
+    ):
+        self.name = name
+        self.device = "cpu"
+        self.max_duration = 30.0
+        self.latency = latency
+
+        # held like weights; np.ones touches every page → counts in RSS
+        self._ballast = np.ones(memory_mb * 2**20, dtype=np.uint8) if memory_mb else None
+        time.sleep(load_seconds)
+
+        # get_pretrained leaves duration at 15 s
+        self.set_generation_params(duration=15)
+        print(f"🧪 stub MusicGen '{name}' ({latency:g} s per audio second, {memory_mb} MB)")
+
+    # ---------------------------------------------
+    def set_generation_params(
+        self,
+        use_sampling: bool = True,
+        top_k: int = 250,
+        top_p: float = 0.0,
+        temperature: float = 1.0,
+        duration: float = 30.0,
+        cfg_coef: float = 3.0,
+        two_step_cfg: bool = False,
+        extend_stride: float = 18,
+    ):
+        assert extend_stride < self.max_duration, "Cannot stride by more than max generation duration."
+        self.extend_stride = extend_stride
+        self.duration = duration
+        self.generation_params = {
+            "use_sampling": use_sampling,
+            "temp": temperature,
+            "top_k": top_k,
+            "top_p": top_p,
+            "cfg_coef": cfg_coef,
+            "two_step_cfg": two_step_cfg,
+        }
+
+    # ---------------------------------------------
+    def _generate(self, descriptions, prefix=None, prefix_sr=None, return_tokens=False):
+        import torch
+
+        n = int(round(self.duration * self.sample_rate))
+
+        with _GPU:
+            time.sleep(self.latency * self.duration)
+
+            rows = []
+            for i, text in enumerate(descriptions):
+                wav = synth(text or "", self.duration, self.sample_rate)
+                if prefix is not None:
+                    head = _resample(prefix[i % len(prefix)], prefix_sr, self.sample_rate)[:n]
+                    wav[:len(head)] = head
+                rows.append(wav)
+
+        out = torch.from_numpy(np.stack(rows)[:, None, :])
+
+        if return_tokens:
+            frames = int(round(self.duration * self.frame_rate))
+            seeds = [_seed(text or "", self.duration) for text in descriptions]
+            tokens = np.stack([
+                np.random.default_rng(s).integers(0, 2048, (CODEBOOKS, frames)) for s in seeds
+            ])
+            return out, torch.from_numpy(tokens)
+        return out
+
+    def generate(self, descriptions, progress: bool = False, return_tokens: bool = False):
+        return self._generate(list(descriptions), return_tokens=return_tokens)
+
+    def generate_unconditional(self, num_samples: int, progress: bool = False, return_tokens: bool = False):
+        return self._generate([None] * num_samples, return_tokens=return_tokens)
+
+    def generate_with_chroma(self, descriptions, melody_wavs, melody_sample_rate: int,
+                             progress: bool = False, return_tokens: bool = False):
+        # melody only conditions the real model; output length is still self.duration
+        return self._generate(list(descriptions), return_tokens=return_tokens)
+
+    def generate_continuation(self, prompt, prompt_sample_rate: int, descriptions=None,
+                              progress: bool = False, return_tokens: bool = False):
+        prompt = prompt.cpu().numpy() if hasattr(prompt, "cpu") else np.asarray(prompt)
+        if prompt.ndim == 2:
+            prompt = prompt[None]
+        prefix = prompt.mean(axis=1).astype(np.float32)          # [B, T] mono
+        descriptions = list(descriptions) if descriptions else [None] * len(prefix)
+        return self._generate(descriptions, prefix, prompt_sample_rate, return_tokens)
+
+
+def _resample(x, sr_in, sr_out):
+    if sr_in == sr_out:
+        return x
+    n = int(round(len(x) * sr_out / sr_in))
+    return np.interp(np.linspace(0, len(x) - 1, n), np.arange(len(x)), x).astype(np.float32)
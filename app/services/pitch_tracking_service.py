@@ -0,0 +1,196 @@
+# app/services/pitch_tracking_service.py
+
+"""
+Pitch tracking (audio → f0)
+
+One API, selectable backends:
+
+    torchcrepe-tiny   fast, batched, model kept in memory
+    torchcrepe-full   closest to crepe.predict (no TensorFlow)
+    pyin              librosa probabilistic YIN
+    yin               librosa YIN (fastest, energy-gated confidence)
+
+    times, f0, confidence = track_pitch(y, sr)
+
+f0 is in Hz (0 where unvoiced), confidence is 0..1.
+Output plugs straight into melody_transcription.transcribe_notes.
+"""
+
+import os
+import threading
+
+import numpy as np
+
+
+BACKENDS = ("torchcrepe-tiny", "torchcrepe-full", "pyin", "yin")
+
+DEFAULT_BACKEND = os.getenv("PITCH_BACKEND", "torchcrepe-tiny")
+
+FMIN = 50.0
+FMAX = 1100.0
+
+CREPE_BATCH_FRAMES = 1024
+
+
+# -------------------------------------------------
+# torchcrepe (models stay resident per capacity/device)
+# -------------------------------------------------
+_CREPE_MODELS = {}
+_CREPE_LOCK = threading.Lock()
+
+
+def _device(device):
+    if device:
+        return device
+
+    import torch
+    return "cuda" if torch.cuda.is_available() else "cpu"
+
+
+def load_crepe(capacity: str = "tiny", device: str | None = None):
+    """
+    Load a torchcrepe network once and keep it.
+
+    torchcrepe itself holds a single global model and reloads it
+    whenever the capacity changes, so we keep our own per-capacity copy.
+    """
+    import torch
+    import torchcrepe
+
+    device = _device(device)
+    key = (capacity, device)
+
+    with _CREPE_LOCK:
+        if key not in _CREPE_MODELS:
+            print(f"🎯 Loading torchcrepe-{capacity} on {device}")
+
+            model = torchcrepe.Crepe(capacity)
+            weights = os.path.join(
+                os.path.dirname(torchcrepe.__file__), "assets", f"{capacity}.pth"
+            )
+            model.load_state_dict(torch.load(weights, map_location=device))
+            model = model.to(torch.device(device))
+            model.eval()
+
+            _CREPE_MODELS[key] = model
+
+    return _CREPE_MODELS[key]
+
+
+def _track_torchcrepe(y, sr, hop_length, fmin, fmax, capacity, device, viterbi, batch_frames):
+    import torch
+    import torchcrepe
+
+    device = _device(device)
+    model = load_crepe(capacity, device)
+
+    decoder = torchcrepe.decode.viterbi if viterbi else torchcrepe.decode.weighted_argmax
+
+    audio = torch.from_numpy(np.ascontiguousarray(y, dtype=np.float32))[None]
+
+    pitches = []
+    periodicities = []
+
+    with torch.inference_mode():
+        for frames in torchcrepe.preprocess(audio, sr, hop_length, batch_frames, device, pad=True):
+
+            probs = model(frames, embed=False)
+            probs = probs.reshape(1, -1, torchcrepe.PITCH_BINS).transpose(1, 2)
+
+            pitch, periodicity = torchcrepe.postprocess(
+                probs, fmin, fmax, decoder, return_periodicity=True
+            )
+
+            pitches.append(pitch.cpu())
+            periodicities.append(periodicity.cpu())
+
+    f0 = torch.cat(pitches, 1)[0].numpy().astype(np.float64)
+    conf = torch.cat(periodicities, 1)[0].numpy().astype(np.float64)
+
+    return f0, conf
+
+
+# -------------------------------------------------
+# librosa backends
+# -------------------------------------------------
+def _track_pyin(y, sr, hop_length, fmin, fmax):
+    import librosa
+
+    f0, _, voiced_prob = librosa.pyin(
+        y,
+        fmin=fmin,
+        fmax=fmax,
+        sr=sr,
+        frame_length=2048,
+        hop_length=hop_length,
+    )
+
+    return np.nan_to_num(f0, nan=0.0), np.nan_to_num(voiced_prob, nan=0.0)
+
+
+def _track_yin(y, sr, hop_length, fmin, fmax, silence_db=-40.0):
+    """
+    YIN has no voicing model → confidence is a soft energy gate.
+    """
+    import librosa
+
+    f0 = librosa.yin(y, fmin=fmin, fmax=fmax, sr=sr, frame_length=2048, hop_length=hop_length)
+
+    rms = librosa.feature.rms(y=y, frame_length=2048, hop_length=hop_length)[0]
+    db = librosa.amplitude_to_db(rms, ref=np.max)
+
+    n = min(len(f0), len(db))
+    conf = np.clip((db[:n] - silence_db) / 20.0, 0.0, 1.0)
+
+    return f0[:n], conf
+
+
+# -------------------------------------------------
+# main API
+# -------------------------------------------------
+def track_pitch(
+    y,
+    sr: int,
+    backend: str | None = None,
+    hop_seconds: float = 0.01,
+    fmin: float = FMIN,
+    fmax: float = FMAX,
+    device: str | None = None,
+    viterbi: bool = True,
+    batch_frames: int = CREPE_BATCH_FRAMES,
+):
+    """
+    Returns:
+        (times, f0, confidence)  — float64 arrays of equal length
+    """
+
+    backend = backend or DEFAULT_BACKEND
+
+    if backend not in BACKENDS:
+        raise ValueError(f"Unknown pitch backend: {backend} (use one of {BACKENDS})")
+
+    y = np.asarray(y, dtype=np.float32)
+    if y.ndim > 1:
+        y = y.mean(axis=0)   # librosa layout (channels, samples)
+
+    hop_length = max(1, int(round(sr * hop_seconds)))
+
+    if backend.startswith("torchcrepe"):
+        capacity = backend.split("-", 1)[1]
+        f0, conf = _track_torchcrepe(
+            y, sr, hop_length, fmin, fmax, capacity, device, viterbi, batch_frames
+        )
+    elif backend == "pyin":
+        f0, conf = _track_pyin(y, sr, hop_length, fmin, fmax)
+    else:
+        f0, conf = _track_yin(y, sr, hop_length, fmin, fmax)
+
+    frame_seconds = hop_length / sr
+
+    if backend.startswith("torchcrepe") and sr != 16000:
+        # torchcrepe resamples to 16 kHz and rounds the hop there
+        frame_seconds = int(hop_length * 16000 / sr) / 16000
+
+    times = np.arange(len(f0)) * frame_seconds
+
+    return times, f0, conf
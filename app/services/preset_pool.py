@@ -0,0 +1,267 @@
+# app/services/preset_pool.py
+
+"""
+Preset pre-generation pool (fills idle GPU time)
+
+Preset-only requests (UI preset, no prompt / description / instruments)
+are a large share of traffic and all look the same to MusicGen. Instead
+of making each one wait for a fresh generation:
+
+✓ a pool of finished, mastered variants per (preset, mode, duration)
+✓ request → pop one variant, rename its files to the new job id → done
+✓ refill with watermarks: below POOL_LOW start refilling, stop at POOL_HIGH
+✓ lowest priority: a fill job is only queued when the gpu queue is empty,
+  and at most POOL_MAX_INFLIGHT fill jobs run at once (Celery priority 9)
+✓ demand driven: only keys that were actually requested get pooled
+✓ hit / miss counters + hit rate per key (GET /api/music/pool/stats)
+
+Refill runs from celery beat (preset_pool.refill, every POOL_REFILL_EVERY s):
+
+    celery -A app.celery_app beat
+    python -m app.services.preset_pool stats
+
+State lives in the job-store Redis (db 2); every variant is popped at
+most once, so two users never get the same file.
+"""
+
+import argparse
+import json
+import os
+import time
+import uuid
+
+import redis
+
+from app.services import artifact_store
+from app.services.audio_delivery import DERIVED_EXTENSIONS
+from app.services.job_store import r
+from app.services.presets import PRESETS
+
+
+DURATION_BUCKETS = [int(d) for d in os.getenv("POOL_DURATIONS", "10,20,30").split(",")]
+POOL_PRESETS = [
+    "Carnatic Ensemble", "Devotional Bhajan", "Romantic Film", "Cinematic Epic", "Lo-Fi Chill",
+]
+POOL_MODES = ("cinematic", "classical")
+
+POOL_LOW = int(os.getenv("POOL_LOW", "2"))
+POOL_HIGH = int(os.getenv("POOL_HIGH", "4"))
+POOL_MAX_INFLIGHT = int(os.getenv("POOL_MAX_INFLIGHT", "1"))
+POOL_REFILL_EVERY = float(os.getenv("POOL_REFILL_EVERY", "15"))
+FILL_TIMEOUT = 900          # in-flight fill older than this is assumed lost
+FILL_PRIORITY = 9           # lowest
+
+PREFIX = "preset_pool"
+EXTENSIONS = (".wav", ".mp4")
+
+
+# -------------------------------------------------
+# keys
+# -------------------------------------------------
+def pool_key(preset: str, mode: str, duration: int) -> str | None:
+    """
+    None → not poolable (unknown preset / mode, or duration outside the
+    buckets). Client input never grows the key space.
+    """
+    if preset not in POOL_PRESETS or mode not in POOL_MODES or duration not in DURATION_BUCKETS:
+        return None
+    return f"{preset}|{mode}|{duration}"
+
+
+def _split(key):
+    preset, mode, duration = key.split("|")
+    return preset, mode, int(duration)
+
+
+def _variants(key):
+    return f"{PREFIX}:variants:{key}"
+
+
+def _inflight(key):
+    return f"{PREFIX}:inflight:{key}"
+
+
+DEMAND = f"{PREFIX}:demand"          # zset key → eligible requests
+REFILLING = f"{PREFIX}:refilling"    # set of keys between LOW and HIGH
+METRICS = f"{PREFIX}:metrics"        # hash counters
+
+
+def pool_prompt(preset: str) -> str:
+    from app.music_prompt.quality_guardrails import apply_quality_guardrails
+    return apply_quality_guardrails(PRESETS[preset]["base_prompt"], [])
+
+
+# -------------------------------------------------
+# serve
+# -------------------------------------------------
+def _count(key, outcome):
+    r.hincrby(METRICS, outcome, 1)
+    r.hincrby(METRICS, f"{outcome}:{key}", 1)
+
+
+def take(key: str, job_id: str, output_dir: str) -> bool:
+    """
+    Pop a ready variant for `key` and move its files to `job_id`.
+    False (miss) → caller generates as usual.
+    """
+    r.zincrby(DEMAND, 1, key)
+
+    while True:
+        pooled = r.lpop(_variants(key))
+        if pooled is None:
+            _count(key, "misses")
+            return False
+
+        # here or in the shared store (filled on another gpu node)
+        if all(artifact_store.exists(pooled, ext, output_dir) for ext in EXTENSIONS):
+            break
+        # cleaned up behind our back → try the next one
+
+    # m4a etc. travel along when present (older variants may lack them);
+    # wav last → the new job reads as done only once everything is there
+    for ext in (*DERIVED_EXTENSIONS, ".mp4", ".wav"):
+        artifact_store.move(pooled, job_id, ext, output_dir)
+
+    _count(key, "hits")
+    print(f"🎁 pool hit {key} → {job_id} (from {pooled})")
+    return True
+
+
+def add(key: str, pooled_id: str):
+    """
+    Called by the gpu worker when a fill job has finished.
+    """
+    r.zrem(_inflight(key), pooled_id)
+    r.rpush(_variants(key), pooled_id)
+    r.hincrby(METRICS, "fills_done", 1)
+
+
+def fill_failed(key: str, pooled_id: str):
+    """
+    Called by the gpu worker when a fill job failed (exception or QA):
+    frees its in-flight slot now instead of after FILL_TIMEOUT.
+    """
+    r.zrem(_inflight(key), pooled_id)
+    r.hincrby(METRICS, "fills_failed", 1)
+
+
+# -------------------------------------------------
+# refill
+# -------------------------------------------------
+def _gpu_queue_empty() -> bool:
+    from app.celery_app import celery
+
+    broker = redis.Redis.from_url(celery.conf.broker_url)
+    return broker.llen("gpu") == 0
+
+
+def _inflight_count(key) -> int:
+    r.zremrangebyscore(_inflight(key), 0, time.time() - FILL_TIMEOUT)
+    return r.zcard(_inflight(key))
+
+
+def _enqueue_fill(key):
+    from app.tasks.musicgen_task import generate_music_task
+
+    preset, mode, duration = _split(key)
+    pooled_id = f"pool-{uuid.uuid4().hex[:12]}"
+
+    r.zadd(_inflight(key), {pooled_id: time.time()})
+    generate_music_task.apply_async(
+        args=(pooled_id, {
+            "prompt": pool_prompt(preset),
+            "duration": duration,
+            "mode": mode,
+            "pool_key": key,
+        }),
+        priority=FILL_PRIORITY,
+    )
+    r.hincrby(METRICS, "fills_enqueued", 1)
+    print(f"🧺 pool fill queued {key} ({pooled_id})")
+
+
+def refill() -> list:
+    """
+    One refill round. Returns the keys a fill job was queued for.
+    """
+    keys = r.zrevrange(DEMAND, 0, -1)       # most requested first
+
+    levels = {k: r.llen(_variants(k)) + _inflight_count(k) for k in keys}
+
+    # watermarks (hysteresis): start below LOW, keep going until HIGH
+    for k, level in levels.items():
+        if level < POOL_LOW:
+            r.sadd(REFILLING, k)
+        elif level >= POOL_HIGH:
+            r.srem(REFILLING, k)
+
+    wanted = [k for k in keys if r.sismember(REFILLING, k)]
+    if not wanted:
+        return []
+
+    # user jobs first: only use the gpu when nothing is waiting
+    busy = sum(r.zcard(_inflight(k)) for k in keys)
+    if busy >= POOL_MAX_INFLIGHT or not _gpu_queue_empty():
+        return []
+
+    queued = []
+    # emptiest first, most requested first among equals (stable sort)
+    for k in sorted(wanted, key=lambda k: levels[k]):
+        if busy >= POOL_MAX_INFLIGHT:
+            break
+        _enqueue_fill(k)
+        busy += 1
+        queued.append(k)
+
+    return queued
+
+
+# -------------------------------------------------
+# metrics
+# -------------------------------------------------
+def stats() -> dict:
+    m = {k: int(v) for k, v in r.hgetall(METRICS).items()}
+    hits, misses = m.get("hits", 0), m.get("misses", 0)
+
+    keys = {}
+    for k in r.zrevrange(DEMAND, 0, -1):
+        h, mi = m.get(f"hits:{k}", 0), m.get(f"misses:{k}", 0)
+        keys[k] = {
+            "ready": r.llen(_variants(k)),
+            "inflight": r.zcard(_inflight(k)),
+            "refilling": bool(r.sismember(REFILLING, k)),
+            "hits": h,
+            "misses": mi,
+            "hit_rate": round(h / (h + mi), 3) if h + mi else None,
+        }
+
+    return {
+        "hits": hits,
+        "misses": misses,
+        "hit_rate": round(hits / (hits + misses), 3) if hits + misses else None,
+        "fills_enqueued": m.get("fills_enqueued", 0),
+        "fills_done": m.get("fills_done", 0),
+        "fills_failed": m.get("fills_failed", 0),
+        "watermarks": {"low": POOL_LOW, "high": POOL_HIGH},
+        "keys": keys,
+    }
+
+
+# -------------------------------------------------
+# CLI
+# -------------------------------------------------
+def main():
+    ap = argparse.ArgumentParser(prog="python -m app.services.preset_pool")
+    sub = ap.add_subparsers(dest="cmd", required=True)
+    sub.add_parser("stats")
+    sub.add_parser("refill")
+    args = ap.parse_args()
+
+    if args.cmd == "stats":
+        print(json.dumps(stats(), indent=2))
+    else:
+        print("queued:", refill())
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,300 @@
+# app/services/profiling.py
+
+"""
+On-demand per-job profiling (Celery workers)
+
+For musicgen.generate, bgm.generate and accompaniment.generate a run is
+captured when:
+
+✓ the job asked for it: Celery header profile=True (the API sets it for
+  admin requests with "X-Profile: 1"), or "profile": true in the payload
+✓ or it was sampled: PROFILE_SAMPLE_RATE (0.0 … 1.0) of all runs
+
+A capture holds:
+✓ cProfile stats (PROFILE_MODE=cprofile, default) → profile.prof + top-N text
+  or a sampling profile (PROFILE_MODE=sample) → stacks.folded
+  (flamegraph.pl / speedscope) — near-zero overhead on long GPU jobs
+✓ peak RSS during the run (sampled), RSS before / after
+✓ torch CUDA memory: peak allocated / reserved (when torch is loaded)
+
+Saved under PROFILE_DIR/<job id>/ (newest PROFILE_KEEP kept); listed and
+downloaded through GET /api/admin/profiles (X-Admin-Token).
+
+    snakeviz outputs/profiles/<job id>/profile.prof
+    flamegraph.pl outputs/profiles/<job id>/stacks.folded > flame.svg
+"""
+
+import cProfile
+import io
+import json
+import os
+import pstats
+import random
+import shutil
+import sys
+import threading
+import time
+from collections import Counter
+from pathlib import Path
+
+import psutil
+
+
+BASE_DIR = Path(__file__).resolve().parents[2]
+PROFILE_DIR = Path(os.getenv("PROFILE_DIR", BASE_DIR / "outputs/profiles"))
+
+PROFILE_SAMPLE_RATE = float(os.getenv("PROFILE_SAMPLE_RATE", "0"))
+PROFILE_MODE = os.getenv("PROFILE_MODE", "cprofile")        # cprofile | sample
+PROFILE_INTERVAL = float(os.getenv("PROFILE_INTERVAL_MS", "10")) / 1000
+PROFILE_KEEP = int(os.getenv("PROFILE_KEEP", "200"))
+TOP_N = 40
+
+PROFILED_TASKS = {"musicgen.generate", "bgm.generate", "accompaniment.generate"}
+
+MB = 2 ** 20
+
+
+# -------------------------------------------------
+# monitor thread (peak RSS + optional stack samples)
+# -------------------------------------------------
+def _collapse(frame) -> str:
+    names = []
+    while frame is not None:
+        code = frame.f_code
+        names.append(f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})")
+        frame = frame.f_back
+    return ";".join(reversed(names))
+
+
+class _Monitor(threading.Thread):
+
+    def __init__(self, thread_id: int, stacks: bool, interval: float = PROFILE_INTERVAL):
+        super().__init__(name="profile-monitor", daemon=True)
+        self.thread_id = thread_id
+        self.stacks = stacks
+        self.interval = interval
+        self.process = psutil.Process()
+        self.peak_rss = self.process.memory_info().rss
+        self.counts = Counter()
+        self.samples = 0
+        self._done = threading.Event()
+
+    def run(self):
+        while not self._done.wait(self.interval):
+            self.peak_rss = max(self.peak_rss, self.process.memory_info().rss)
+
+            if self.stacks:
+                frame = sys._current_frames().get(self.thread_id)
+                if frame is not None:
+                    self.counts[_collapse(frame)] += 1
+                    self.samples += 1
+
+    def stop(self):
+        self._done.set()
+        self.join()
+
+
+# -------------------------------------------------
+# capture
+# -------------------------------------------------
+def _torch_cuda():
+    torch = sys.modules.get("torch")        # never import torch just for this
+    if torch is None or not torch.cuda.is_available():
+        return None
+    return torch
+
+
+class Capture:
+    """
+    One profiled run. start() / stop() must be called on the task thread.
+    """
+
+    def __init__(self, job_id: str, task: str, reason: str, mode: str = PROFILE_MODE):
+        self.job_id = job_id
+        self.task = task
+        self.reason = reason
+        self.mode = mode
+        self.profiler = cProfile.Profile() if mode == "cprofile" else None
+
+    def start(self):
+        torch = _torch_cuda()
+        if torch is not None:
+            torch.cuda.reset_peak_memory_stats()
+
+        self.started = time.time()
+        self.monitor = _Monitor(threading.get_ident(), stacks=self.profiler is None)
+        self.rss_start = self.monitor.process.memory_info().rss
+        self.monitor.start()
+
+        self.t0 = time.perf_counter()
+        if self.profiler is not None:
+            self.profiler.enable()
+
+    def stop(self, status: str = "SUCCESS") -> Path:
+        if self.profiler is not None:
+            self.profiler.disable()
+        seconds = time.perf_counter() - self.t0
+        self.monitor.stop()
+
+        out = PROFILE_DIR / self.job_id
+        out.mkdir(parents=True, exist_ok=True)
+
+        if self.profiler is not None:
+            self.profiler.dump_stats(out / "profile.prof")
+            summary = _pstats_summary(self.profiler)
+        else:
+            (out / "stacks.folded").write_text(
+                "".join(f"{stack} {n}\n" for stack, n in self.monitor.counts.most_common())
+            )
+            summary = _folded_summary(self.monitor.counts, self.monitor.samples)
+        (out / "summary.txt").write_text(summary)
+
+        meta = {
+            "job_id": self.job_id,
+            "task": self.task,
+            "reason": self.reason,
+            "mode": self.mode,
+            "status": status,
+            "started": self.started,
+            "seconds": round(seconds, 3),
+            "rss_start_mb": round(self.rss_start / MB, 1),
+            "rss_peak_mb": round(self.monitor.peak_rss / MB, 1),
+            "rss_end_mb": round(self.monitor.process.memory_info().rss / MB, 1),
+            "torch_cuda": _torch_stats(),
+            "samples": self.monitor.samples if self.profiler is None else None,
+            "files": sorted(p.name for p in out.iterdir()) + ["meta.json"],
+        }
+        (out / "meta.json").write_text(json.dumps(meta, indent=2))
+
+        print(f"🔬 profile saved {out} ({seconds:.1f}s, peak rss {meta['rss_peak_mb']} MB)")
+        _prune()
+        return out
+
+
+def _torch_stats():
+    torch = _torch_cuda()
+    if torch is None:
+        return None
+
+    return {
+        "device": torch.cuda.get_device_name(),
+        "peak_allocated_mb": round(torch.cuda.max_memory_allocated() / MB, 1),
+        "peak_reserved_mb": round(torch.cuda.max_memory_reserved() / MB, 1),
+        "allocated_mb": round(torch.cuda.memory_allocated() / MB, 1),
+        "reserved_mb": round(torch.cuda.memory_reserved() / MB, 1),
+    }
+
+
+def _pstats_summary(profiler) -> str:
+    buf = io.StringIO()
+    stats = pstats.Stats(profiler, stream=buf).strip_dirs()
+    stats.sort_stats("cumulative").print_stats(TOP_N)
+    stats.sort_stats("tottime").print_stats(TOP_N)
+    return buf.getvalue()
+
+
+def _folded_summary(counts: Counter, samples: int) -> str:
+    inclusive, own = Counter(), Counter()
+    for stack, n in counts.items():
+        frames = stack.split(";")
+        own[frames[-1]] += n
+        for f in set(frames):
+            inclusive[f] += n
+
+    lines = [f"{samples} samples every {PROFILE_INTERVAL * 1000:g} ms", "", "inclusive:"]
+    lines += [f"{100 * n / max(samples, 1):6.1f}%  {f}" for f, n in inclusive.most_common(TOP_N)]
+    lines += ["", "self:"]
+    lines += [f"{100 * n / max(samples, 1):6.1f}%  {f}" for f, n in own.most_common(TOP_N)]
+    return "\n".join(lines) + "\n"
+
+
+def _prune():
+    dirs = sorted((d for d in PROFILE_DIR.iterdir() if d.is_dir()), key=lambda d: d.stat().st_mtime)
+    for d in dirs[:max(0, len(dirs) - PROFILE_KEEP)]:
+        shutil.rmtree(d, ignore_errors=True)
+
+
+# -------------------------------------------------
+# decision
+# -------------------------------------------------
+def _reason(task, args) -> str | None:
+    if getattr(task.request, "profile", False):
+        return "flag"
+    if any(isinstance(a, dict) and a.get("profile") for a in args or ()):
+        return "flag"
+    if PROFILE_SAMPLE_RATE and random.random() < PROFILE_SAMPLE_RATE:
+        return "sampled"
+    return None
+
+
+def install_celery_signals():
+    from celery.signals import task_postrun, task_prerun
+
+    from app.services.tracing import task_job_id
+
+    @task_prerun.connect(weak=False)
+    def _start(task=None, task_id=None, args=None, **_):
+        if task.name not in PROFILED_TASKS:
+            return
+        reason = _reason(task, args)
+        if reason is None:
+            return
+
+        capture = Capture(task_job_id(args, task) or task_id, task.name, reason)
+        capture.start()
+        task.request._profile = capture
+
+    @task_postrun.connect(weak=False)
+    def _end(task=None, state=None, **_):
+        capture = getattr(task.request, "_profile", None)
+        if capture is None:
+            return
+        task.request._profile = None
+        try:
+            capture.stop(state or "?")
+        except Exception as e:
+            # profiling must never fail the job
+            print("⚠️ profile capture failed:", e)
+
+
+# -------------------------------------------------
+# API side
+# -------------------------------------------------
+ADMIN_TOKEN = os.getenv("ADMIN_TOKEN", "")
+
+
+def is_admin(token: str | None) -> bool:
+    return bool(ADMIN_TOKEN) and token == ADMIN_TOKEN
+
+
+def task_headers(request) -> dict:
+    """
+    Celery headers for a job submitted through `request`:
+    admin + "X-Profile: 1" → the worker captures this run.
+    """
+    if request.headers.get("x-profile") == "1" and is_admin(request.headers.get("x-admin-token")):
+        return {"profile": True}
+    return {}
+
+
+def list_captures() -> list:
+    if not PROFILE_DIR.exists():
+        return []
+
+    metas = []
+    for meta in PROFILE_DIR.glob("*/meta.json"):
+        try:
+            metas.append(json.loads(meta.read_text()))
+        except (OSError, ValueError):
+            continue        # capture being written / pruned
+    return sorted(metas, key=lambda m: m["started"], reverse=True)
+
+
+def capture_file(job_id: str, name: str) -> Path | None:
+    """
+    Path of one artifact, None if missing (names are checked, no traversal).
+    """
+    path = (PROFILE_DIR / job_id / name).resolve()
+    if "/" in name or path.parent.parent != PROFILE_DIR.resolve() or not path.is_file():
+        return None
+    return path
@@ -0,0 +1,445 @@
+# app/services/prompt_index.py
+
+"""
+Semantic near-duplicate prompt index (reuse audio for "quick" requests)
+
+Exact-hash caching misses prompts that mean the same thing:
+"calm veena with mridangam" vs "peaceful veena and mridangam".
+
+✓ CPU sentence encoder (all-MiniLM-L6-v2 from the model store,
+  mean pooling, unit vectors, resident per process)
+✓ int8 vectors (384 B / prompt → 1M prompts ≈ 370 MB)
+✓ IVF ANN in NumPy: spherical k-means coarse lists, probe NPROBE lists
+  → a few thousand dot products per query instead of 1M
+  (brute force until TRAIN_MIN entries, retrained as the index grows ×4)
+✓ incremental inserts: gpu workers append one line per finished job to
+  index.log (flock, O_APPEND); readers tail the log before each query
+✓ persisted: index.npz snapshot (vectors + metadata + lists); compact()
+  folds the log into it and retrains the lists (cron / CLI, not on
+  the request path)
+
+    python -m benchmarks.bench_prompt_index --entries 1000000
+    python -m app.services.prompt_index stats
+    python -m app.services.prompt_index compact
+
+Only opt-in ("quick": true) requests reuse audio, and only when the
+best match clears REUSE_THRESHOLD with the same duration and mode.
+"""
+
+import argparse
+import base64
+import fcntl
+import json
+import os
+import threading
+import time
+from array import array
+from pathlib import Path
+
+import numpy as np
+
+from app.services import artifact_store
+from app.services.audio_delivery import DERIVED_EXTENSIONS
+
+
+BASE_DIR = Path(__file__).resolve().parents[2]
+INDEX_DIR = Path(os.getenv("PROMPT_INDEX_DIR", BASE_DIR / "prompt_index"))
+
+ENCODER_KEY = "minilm-l6"        # app.services.model_store
+DIM = 384
+
+REUSE_THRESHOLD = float(os.getenv("PROMPT_REUSE_THRESHOLD", "0.92"))
+NPROBE = 8
+TRAIN_MIN = 4096                 # below this, brute force is faster
+MAX_LISTS = 2048
+KMEANS_ITERS = 10
+
+
+# -------------------------------------------------
+# encoder
+# -------------------------------------------------
+def _load_encoder():
+    from transformers import AutoModel, AutoTokenizer
+    from app.services import model_store
+
+    tokenizer = model_store.load_hf(ENCODER_KEY, AutoTokenizer)
+    model = model_store.load_hf(ENCODER_KEY, AutoModel).eval()
+    return tokenizer, model
+
+
+def get_encoder():
+    from app.services.model_preload import resident
+    return resident(ENCODER_KEY, _load_encoder)
+
+
+def encode(texts) -> np.ndarray:
+    """
+    (n, DIM) float32, L2-normalized (dot product = cosine).
+    """
+    import torch
+
+    tokenizer, model = get_encoder()
+    batch = tokenizer(list(texts), padding=True, truncation=True,
+                      max_length=128, return_tensors="pt")
+
+    with torch.inference_mode():
+        hidden = model(**batch).last_hidden_state
+        mask = batch["attention_mask"].unsqueeze(-1).to(hidden.dtype)
+        emb = (hidden * mask).sum(1) / mask.sum(1).clamp(min=1e-9)
+
+    emb = emb.numpy().astype(np.float32)
+    return emb / np.linalg.norm(emb, axis=1, keepdims=True).clip(1e-9)
+
+
+def quantize(vectors) -> np.ndarray:
+    return np.clip(np.rint(np.asarray(vectors) * 127), -127, 127).astype(np.int8)
+
+
+# -------------------------------------------------
+# spherical k-means (coarse quantizer)
+# -------------------------------------------------
+def _assign(vectors_i8, centroids, chunk=65536):
+    out = np.empty(len(vectors_i8), dtype=np.int32)
+    for i in range(0, len(vectors_i8), chunk):
+        block = vectors_i8[i:i + chunk].astype(np.float32)
+        out[i:i + chunk] = np.argmax(block @ centroids.T, axis=1)
+    return out
+
+
+def kmeans(sample, k, iters=KMEANS_ITERS, seed=0):
+    rng = np.random.default_rng(seed)
+    centroids = sample[rng.choice(len(sample), k, replace=False)].copy()
+
+    for _ in range(iters):
+        labels = np.argmax(sample @ centroids.T, axis=1)
+        sums = np.zeros_like(centroids)
+        np.add.at(sums, labels, sample)
+        empty = ~sums.any(axis=1)
+        # re-seed empty lists from random points
+        sums[empty] = sample[rng.choice(len(sample), int(empty.sum()))]
+        centroids = sums / np.linalg.norm(sums, axis=1, keepdims=True).clip(1e-9)
+
+    return centroids.astype(np.float32)
+
+
+# -------------------------------------------------
+# log (shared between processes)
+# -------------------------------------------------
+def _log_path(directory):
+    return Path(directory) / "index.log"
+
+
+def _snapshot_path(directory):
+    return Path(directory) / "index.npz"
+
+
+def append_log(vectors_i8, metas, directory=INDEX_DIR):
+    """
+    Append entries for other processes to pick up (no index load needed).
+    """
+    Path(directory).mkdir(parents=True, exist_ok=True)
+    lines = "".join(
+        json.dumps({"v": base64.b64encode(v.tobytes()).decode(), "meta": m}) + "\n"
+        for v, m in zip(vectors_i8, metas)
+    )
+
+    with open(_log_path(directory), "a", encoding="utf-8") as f:
+        fcntl.flock(f, fcntl.LOCK_EX)
+        f.write(lines)
+        f.flush()
+        fcntl.flock(f, fcntl.LOCK_UN)
+
+
+# -------------------------------------------------
+# index
+# -------------------------------------------------
+class PromptIndex:
+
+    def __init__(self, directory=INDEX_DIR, dim=DIM, nprobe=NPROBE):
+        self.directory = Path(directory)
+        self.dim = dim
+        self.nprobe = nprobe
+        self._lock = threading.Lock()
+        self._reset()
+        self.load()
+
+    def _reset(self):
+        self.vectors = np.zeros((1024, self.dim), dtype=np.int8)
+        self.n = 0
+        self.meta = []
+        self.centroids = None
+        self.lists = []
+        self.trained_at = 0
+        self.log_offset = 0
+        self.log_lines = 0
+        self.snapshot_mtime = None
+
+    def _snapshot_mtime(self):
+        path = _snapshot_path(self.directory)
+        return path.stat().st_mtime_ns if path.exists() else None
+
+    # ---------- storage ----------
+    def add(self, vectors_i8, metas):
+        vectors_i8 = np.asarray(vectors_i8, dtype=np.int8).reshape(-1, self.dim)
+        start, end = self.n, self.n + len(vectors_i8)
+
+        if end > len(self.vectors):
+            grown = np.zeros((max(end, 2 * len(self.vectors)), self.dim), dtype=np.int8)
+            grown[:self.n] = self.vectors[:self.n]
+            self.vectors = grown
+
+        self.vectors[start:end] = vectors_i8
+        self.meta.extend(metas)
+        self.n = end
+
+        if self.centroids is not None:
+            for i, c in zip(range(start, end), _assign(vectors_i8, self.centroids)):
+                self.lists[c].append(i)
+
+        # first training is cheap; later retrains run in compact()
+        if self.centroids is None and self.n >= TRAIN_MIN:
+            self.train()
+
+    def train(self, seed=0):
+        n = self.n
+        k = int(min(MAX_LISTS, max(16, 4 * np.sqrt(n))))
+        rng = np.random.default_rng(seed)
+        idx = rng.choice(n, min(n, 64 * k), replace=False)
+        sample = self.vectors[idx].astype(np.float32) / 127
+
+        self.centroids = kmeans(sample, k, seed=seed)
+        self._build_lists(_assign(self.vectors[:n], self.centroids))
+        self.trained_at = n
+
+    def _build_lists(self, labels):
+        order = np.argsort(labels, kind="stable").astype(np.int32)
+        bounds = np.concatenate([[0], np.cumsum(np.bincount(labels, minlength=len(self.centroids)))])
+        self.lists = [array("i", order[a:b].tobytes()) for a, b in zip(bounds[:-1], bounds[1:])]
+
+    # ---------- query ----------
+    def search(self, vector, k=5):
+        """
+        [(cosine, meta), ...] best first. `vector` unit-norm float32.
+        """
+        q = np.asarray(vector, dtype=np.float32).ravel()
+
+        if self.centroids is None:
+            cand = np.arange(self.n)
+            scores = self.vectors[:self.n].astype(np.float32) @ q
+        else:
+            probe = min(self.nprobe, len(self.centroids))
+            lists = np.argpartition(self.centroids @ q, -probe)[-probe:]
+            cand = np.concatenate([np.frombuffer(self.lists[c], dtype=np.int32) for c in lists])
+            scores = self.vectors[cand].astype(np.float32) @ q
+
+        if not len(cand):
+            return []
+
+        k = min(k, len(cand))
+        top = np.argpartition(scores, -k)[-k:]
+        top = top[np.argsort(scores[top])[::-1]]
+
+        return [(float(scores[i]) / 127, self.meta[cand[i]]) for i in top]
+
+    # ---------- persistence ----------
+    def save(self):
+        self.directory.mkdir(parents=True, exist_ok=True)
+        path = _snapshot_path(self.directory)
+        tmp = path.with_suffix(".tmp.npz")
+
+        labels = np.zeros(self.n, dtype=np.int32)
+        for c, rows in enumerate(self.lists):
+            labels[np.frombuffer(rows, dtype=np.int32)] = c
+
+        np.savez(
+            tmp,
+            vectors=self.vectors[:self.n],
+            meta=np.array(json.dumps(self.meta)),
+            centroids=self.centroids if self.centroids is not None else np.zeros((0, self.dim), np.float32),
+            labels=labels,
+            trained_at=np.array(self.trained_at),
+        )
+        os.replace(tmp, path)
+
+    def load(self):
+        self._reset()
+        path = _snapshot_path(self.directory)
+
+        self.snapshot_mtime = self._snapshot_mtime()
+        if path.exists():
+            with np.load(path) as z:
+                vectors = z["vectors"]
+                self.vectors = np.zeros((max(1024, len(vectors)), self.dim), dtype=np.int8)
+                self.vectors[:len(vectors)] = vectors
+                self.n = len(vectors)
+                self.meta = json.loads(str(z["meta"]))
+                if len(z["centroids"]):
+                    self.centroids = z["centroids"]
+                    self._build_lists(z["labels"])
+                self.trained_at = int(z["trained_at"])
+
+        self.sync()
+
+    def sync(self):
+        """
+        Pick up entries other processes appended since the last call.
+        """
+        log = _log_path(self.directory)
+        if not log.exists():
+            return
+
+        with open(log, "rb") as f:
+            fcntl.flock(f, fcntl.LOCK_SH)
+            # compact() rewrites the snapshot before truncating the log
+            compacted = self._snapshot_mtime() != self.snapshot_mtime
+            if not compacted:
+                f.seek(self.log_offset)
+                data = f.read()
+            fcntl.flock(f, fcntl.LOCK_UN)
+
+        if compacted:
+            # another process folded the log → snapshot has it all
+            return self.load()
+
+        self._ingest(data)
+
+    def _ingest(self, data):
+        data = data[:data.rfind(b"\n") + 1]     # whole lines only
+        if not data:
+            return
+
+        vectors, metas = [], []
+        for line in data.splitlines():
+            entry = json.loads(line)
+            vectors.append(np.frombuffer(base64.b64decode(entry["v"]), dtype=np.int8))
+            metas.append(entry["meta"])
+
+        self.add(np.stack(vectors), metas)
+        self.log_offset += len(data)
+        self.log_lines += len(metas)
+
+    def compact(self):
+        """
+        Fold the log into the snapshot and truncate it.
+        Retrains the coarse lists once the index has grown ×4.
+        """
+        self.sync()
+        if self.n >= TRAIN_MIN and self.n >= 4 * self.trained_at:
+            self.train()
+
+        self.directory.mkdir(parents=True, exist_ok=True)
+        with open(_log_path(self.directory), "a+b") as f:
+            fcntl.flock(f, fcntl.LOCK_EX)
+            f.seek(self.log_offset)
+            self._ingest(f.read())
+            self.save()
+            f.truncate(0)
+            self.snapshot_mtime = self._snapshot_mtime()
+            fcntl.flock(f, fcntl.LOCK_UN)
+
+        self.log_offset = 0
+        self.log_lines = 0
+
+
+# -------------------------------------------------
+# app-level helpers
+# -------------------------------------------------
+_INDEX = None
+_INDEX_LOCK = threading.Lock()
+
+
+def get_index() -> PromptIndex:
+    global _INDEX
+    with _INDEX_LOCK:
+        if _INDEX is None:
+            _INDEX = PromptIndex()
+        return _INDEX
+
+
+def record(prompt: str, job_id: str, duration: int, mode: str):
+    """
+    Worker side: one finished job → one log line.
+    `prompt` is the guarded prompt (what /generate sent to MusicGen),
+    so lookups compare like with like.
+    """
+    vector = quantize(encode([prompt]))
+    append_log(vector, [{
+        "job_id": job_id,
+        "prompt": prompt,
+        "duration": int(duration),
+        "mode": mode,
+        "ts": time.time(),
+    }])
+
+
+def lookup(prompt: str, duration: int, mode: str, output_dir: str,
+           threshold: float = REUSE_THRESHOLD):
+    """
+    Best earlier job with the same duration / mode whose prompt is
+    at least `threshold` similar and whose files still exist.
+    Returns (meta, similarity) or None.
+    """
+    index = get_index()
+
+    with index._lock:
+        index.sync()
+
+        t0 = time.perf_counter()
+        hits = index.search(encode([prompt])[0], k=10)
+        print(f"🔎 prompt index: {index.n} entries, {1000 * (time.perf_counter() - t0):.1f} ms")
+
+    for score, meta in hits:
+        if score < threshold:
+            break
+        if meta["duration"] != duration or meta["mode"] != mode:
+            continue
+        if all(artifact_store.exists(meta["job_id"], ext, output_dir) for ext in (".wav", ".mp4")):
+            return meta, score
+
+    return None
+
+
+def reuse(src_id: str, job_id: str, output_dir: str):
+    """
+    Serve an earlier job's files under a new job id (hard link when
+    possible, server-side copy in the shared store). Missing derived
+    files are encoded on demand later.
+    """
+    for ext in (*DERIVED_EXTENSIONS, ".mp4", ".wav"):
+        artifact_store.link(src_id, job_id, ext, output_dir)
+
+
+# -------------------------------------------------
+# CLI
+# -------------------------------------------------
+def main():
+    ap = argparse.ArgumentParser(prog="python -m app.services.prompt_index")
+    sub = ap.add_subparsers(dest="cmd", required=True)
+    sub.add_parser("stats")
+    sub.add_parser("compact")
+    q = sub.add_parser("query")
+    q.add_argument("prompt")
+    args = ap.parse_args()
+
+    index = PromptIndex()
+
+    if args.cmd == "compact":
+        index.compact()
+
+    if args.cmd == "query":
+        for score, meta in index.search(encode([args.prompt])[0]):
+            print(f"{score:.3f}  {meta['job_id']}  {meta['prompt'][:80]}")
+        return
+
+    lists = [len(rows) for rows in index.lists]
+    print(json.dumps({
+        "entries": index.n,
+        "lists": len(lists),
+        "largest_list": max(lists, default=0),
+        "log_lines": index.log_lines,
+        "dir": str(index.directory),
+    }, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -1,6 +1,8 @@
 import torch
 from transformers import AutoTokenizer, AutoModelForSeq2SeqLM
 
+from app.services import model_store
+
 
 class SingerDecisionService:
     """
@@ -22,12 +24,12 @@ class SingerDecisionService:
 
         self.device = "cuda" if torch.cuda.is_available() else "cpu"
 
-        self.tokenizer = AutoTokenizer.from_pretrained(
-            "google/flan-t5-base"
+        self.tokenizer = model_store.load_hf(
+            "flan-t5-base", AutoTokenizer
         )
 
-        self.model = AutoModelForSeq2SeqLM.from_pretrained(
-            "google/flan-t5-base",
+        self.model = model_store.load_hf(
+            "flan-t5-base", AutoModelForSeq2SeqLM,
             torch_dtype=torch.float16 if self.device == "cuda" else torch.float32
         ).to(self.device)
 
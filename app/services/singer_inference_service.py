@@ -1,5 +1,7 @@
 from typing import Dict
-import re
+
+from app.intelligence import lexicon
+from app.intelligence.canonical_map import SINGER_CUES
 
 
 class SingerInferenceService:
@@ -7,20 +9,9 @@ class SingerInferenceService:
     Infers singer type (male / female / duet) from lyrics + intent.
     """
 
-    FEMALE_CUES = [
-        "love", "romantic", "lullaby", "mother", "goddess",
-        "soft", "gentle", "cradle", "devotional"
-    ]
-
-    MALE_CUES = [
-        "shiva", "mahadev", "warrior", "power",
-        "strength", "chant", "mantra"
-    ]
-
-    DUET_CUES = [
-        "conversation", "dialogue", "together",
-        "union", "marriage", "wedding", "duet"
-    ]
+    FEMALE_CUES = SINGER_CUES["female"]
+    MALE_CUES = SINGER_CUES["male"]
+    DUET_CUES = SINGER_CUES["duet"]
 
     def infer(
         self,
@@ -30,9 +21,11 @@ class SingerInferenceService:
     ) -> Dict:
         text = lyrics.lower()
 
-        female_score = self._score(text, self.FEMALE_CUES)
-        male_score = self._score(text, self.MALE_CUES)
-        duet_score = self._score(text, self.DUET_CUES)
+        # one point per distinct cue, all three lists in one scan
+        scores = lexicon.analyze(text)["singer_scores"]
+        female_score = scores["female"]
+        male_score = scores["male"]
+        duet_score = scores["duet"]
 
         # Style-based bias (NOT hardcoded output)
         if style == "romantic":
@@ -58,11 +51,3 @@ class SingerInferenceService:
                 "duet": duet_score
             }
         }
-
-    def _score(self, text: str, cues: list) -> float:
-        score = 0.0
-        for c in cues:
-            if re.search(rf"\b{c}\b", text):
-                score += 1.0
-        return score
-
@@ -0,0 +1,158 @@
+# app/services/source_separation_service.py
+
+"""
+Source separation (Demucs, in-process)
+
+Replaces:
+    subprocess.run(["demucs", "-n", "htdemucs", input_wav])
+    + reading separated/htdemucs/<name>/*.wav back from disk
+
+✓ model loaded once per (name, device) and kept resident
+✓ long inputs go through demucs' own split=True: model-sized segments
+  with OVERLAP, blended (peak model memory depends on the segment size,
+  not song length)
+✓ stems returned as in-memory float32 arrays, shape (samples, 2)
+✓ configurable shift count; DEMUCS_THREADS caps torch CPU threads for
+  the duration of a separation only (restored afterwards)
+"""
+
+import os
+import threading
+from contextlib import contextmanager
+
+import numpy as np
+
+
+MODEL_NAME = "htdemucs"
+
+OVERLAP = float(os.getenv("DEMUCS_OVERLAP", 0.25))        # fraction of a segment
+SHIFTS = int(os.getenv("DEMUCS_SHIFTS", 1))
+THREADS = int(os.getenv("DEMUCS_THREADS", 0))     # 0 → torch default
+
+
+_MODELS = {}
+_LOCK = threading.Lock()
+
+
+def _device(device):
+    if device:
+        return device
+
+    import torch
+    return "cuda" if torch.cuda.is_available() else "cpu"
+
+
+def load_separator(name: str = MODEL_NAME, device: str | None = None):
+    from demucs.pretrained import get_model
+
+    from app.services import model_store
+
+    device = _device(device)
+    key = (name, device)
+
+    with _LOCK:
+        if key not in _MODELS:
+            print(f"🎚 Loading Demucs {name} on {device}")
+            model_store.demucs_hub_dir()     # checkpoints from the local store
+            with model_store.timed(name):
+                model = get_model(name)
+            model.to(device)
+            model.eval()
+            _MODELS[key] = model
+
+    return _MODELS[key]
+
+
+# -------------------------------------------------
+# helpers
+# -------------------------------------------------
+def _load_audio(path: str, samplerate: int) -> np.ndarray:
+    import soundfile as sf
+    import librosa
+
+    audio, sr = sf.read(path, dtype="float32", always_2d=True)
+
+    if audio.shape[1] == 1:
+        audio = np.repeat(audio, 2, axis=1)
+    audio = audio[:, :2]
+
+    if sr != samplerate:
+        audio = librosa.resample(audio.T, orig_sr=sr, target_sr=samplerate).T
+
+    return np.ascontiguousarray(audio, dtype=np.float32)
+
+
+@contextmanager
+def _torch_threads(threads: int):
+    """
+    torch's thread count is process-wide (other models in this worker
+    share it) → only changed while one separation runs, then restored.
+    """
+    import torch
+
+    if not threads:
+        yield
+        return
+
+    previous = torch.get_num_threads()
+    torch.set_num_threads(threads)
+    try:
+        yield
+    finally:
+        torch.set_num_threads(previous)
+
+
+# -------------------------------------------------
+# main API
+# -------------------------------------------------
+def separate(
+    audio,
+    samplerate: int | None = None,
+    name: str = MODEL_NAME,
+    device: str | None = None,
+    shifts: int = SHIFTS,
+    threads: int = THREADS,
+    overlap: float = OVERLAP,
+) -> tuple[dict, int]:
+    """
+    audio: path or float array (samples, channels) at `samplerate`
+
+    Returns:
+        ({"vocals": arr, "drums": arr, "bass": arr, "other": arr}, model_sr)
+    """
+    import torch
+    from demucs.apply import apply_model
+
+    device = _device(device)
+    model = load_separator(name, device)
+    sr = model.samplerate
+
+    if isinstance(audio, str):
+        mix = _load_audio(audio, sr)
+    else:
+        mix = np.asarray(audio, dtype=np.float32)
+        if mix.ndim == 1:
+            mix = mix[:, None]
+        if mix.shape[1] == 1:
+            mix = np.repeat(mix, 2, axis=1)
+        mix = mix[:, :2]
+
+        if samplerate and samplerate != sr:
+            import librosa
+            mix = librosa.resample(mix.T, orig_sr=samplerate, target_sr=sr).T
+
+    # same normalisation as the demucs CLI
+    ref = mix.mean(axis=1)
+    mean, std = float(ref.mean()), float(ref.std()) or 1.0
+
+    wav = torch.from_numpy(np.ascontiguousarray(((mix - mean) / std).T))[None].to(device)
+
+    with _torch_threads(threads if device == "cpu" else 0), torch.no_grad():
+        out = apply_model(
+            model, wav, shifts=shifts, split=True, overlap=overlap,
+            progress=False, device=device,
+        )[0]
+
+    stems = out.cpu().numpy().transpose(0, 2, 1) * std + mean     # (sources, n, 2)
+
+    return dict(zip(model.sources, stems.astype(np.float32))), sr
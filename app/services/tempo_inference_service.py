@@ -1,5 +1,7 @@
 from typing import Dict
-import re
+
+from app.intelligence import lexicon
+from app.intelligence.canonical_map import TEMPO_CUES
 
 
 class TempoInferenceService:
@@ -29,53 +31,19 @@ class TempoInferenceService:
     }
 
     # Semantic cues (INTENT ONLY, not timing)
-    VERY_SLOW_CUES = [
-        "meditative", "chant", "aarti", "deep devotion",
-        "mantra", "temple", "spiritual", "peaceful silence"
-    ]
-
-    SLOW_CUES = [
-        "devotional", "calm", "peaceful", "romantic",
-        "soft", "emotional", "bhajan", "slow"
-    ]
-
-    FAST_CUES = [
-        "fast", "energetic", "dance", "celebration",
-        "folk", "festival", "upbeat", "rock"
-    ]
+    VERY_SLOW_CUES = TEMPO_CUES["very_slow"]
+    SLOW_CUES = TEMPO_CUES["slow"]
+    FAST_CUES = TEMPO_CUES["fast"]
 
     def infer(self, request_text: str) -> Dict:
         """
         Infer tempo class from user request.
         """
-        text = request_text.lower()
-
-        # Very slow has highest priority
-        if self._contains_any(text, self.VERY_SLOW_CUES):
-            tempo = "very_slow"
-
-        # Fast overrides medium/slow
-        elif self._contains_any(text, self.FAST_CUES):
-            tempo = "fast"
-
-        # Slow devotional default
-        elif self._contains_any(text, self.SLOW_CUES):
-            tempo = "slow"
-
-        # Default musical pacing
-        else:
-            tempo = "medium"
+        # very_slow > fast > slow > medium (compiled lexicon, one scan)
+        tempo = lexicon.analyze(request_text)["tempo"]
 
         return {
             "tempo": tempo,
             "syllables_per_second": self.TEMPO_MAP[tempo]["syllables_per_second"],
             "description": self.TEMPO_MAP[tempo]["description"]
         }
-
-    @staticmethod
-    def _contains_any(text: str, keywords: list) -> bool:
-        for k in keywords:
-            if re.search(rf"\b{k}\b", text):
-                return True
-        return False
-
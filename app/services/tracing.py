@@ -0,0 +1,248 @@
+# app/services/tracing.py
+
+"""
+Per-stage timing spans → Prometheus (/metrics)
+
+    with span("generate", job_id=job_id, model="musicgen-large"):
+        wav = model.generate(...)
+
+✓ one histogram + counter for every stage
+  (api, llm_expand, queue_wait, model_load, generate, qa, mastering,
+   video_encode, download, ... whatever name the caller uses)
+✓ job-id correlation: job_context(job_id) makes every nested span
+  carry it → structured log line + exemplar on the histogram bucket
+  (exemplars only reach Prometheus from a single-process registry
+  scraped as OpenMetrics; multiprocess mode drops them, the log
+  line still has the job id)
+✓ Celery signals: queue wait (publish → prerun) and task runtime for
+  every task, in every worker
+✓ queue depth per Celery queue as gauges, read from the broker at
+  scrape time (all priority sub-queues summed)
+
+API + workers on one host share metrics through prometheus_client
+multiprocess mode: set PROMETHEUS_MULTIPROC_DIR (an empty dir, wiped
+on deploy) for uvicorn AND every celery worker.
+
+    curl localhost:8000/metrics
+    curl -H 'Accept: application/openmetrics-text' localhost:8000/metrics
+
+Prometheus asks for OpenMetrics by default; enable exemplar storage
+with --enable-feature=exemplar-storage.
+"""
+
+import json
+import os
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from prometheus_client import (
+    CONTENT_TYPE_LATEST,
+    CollectorRegistry,
+    Counter,
+    Histogram,
+    REGISTRY,
+    generate_latest,
+)
+from prometheus_client.core import GaugeMetricFamily
+from prometheus_client.openmetrics import exposition as openmetrics
+
+
+QUEUES = ["gpu", "cpu"]
+PRIORITY_STEPS = 10                 # celery_app broker_transport_options
+LOG_SPANS = os.getenv("TRACE_LOG", "1") == "1"
+
+# 10 ms … 30 min (LLM calls up to long BGM renders)
+BUCKETS = (0.01, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 120, 300, 600, 1800)
+
+STAGE_SECONDS = Histogram(
+    "indianode_stage_seconds", "Wall time per pipeline stage",
+    ["stage"], buckets=BUCKETS,
+)
+STAGE_TOTAL = Counter(
+    "indianode_stage_total", "Pipeline stage runs by outcome",
+    ["stage", "status"],
+)
+TASK_SECONDS = Histogram(
+    "indianode_task_seconds", "Celery task runtime",
+    ["task", "queue"], buckets=BUCKETS,
+)
+QUEUE_WAIT_SECONDS = Histogram(
+    "indianode_queue_wait_seconds", "Celery publish → start delay",
+    ["task", "queue"], buckets=BUCKETS,
+)
+HTTP_SECONDS = Histogram(
+    "indianode_http_request_seconds", "API request handling time",
+    ["method", "route", "status"], buckets=BUCKETS,
+)
+
+_job_id = ContextVar("job_id", default=None)
+
+
+# -------------------------------------------------
+# spans
+# -------------------------------------------------
+@contextmanager
+def job_context(job_id):
+    token = _job_id.set(job_id)
+    try:
+        yield
+    finally:
+        _job_id.reset(token)
+
+
+def current_job():
+    return _job_id.get()
+
+
+def record(stage: str, seconds: float, status: str = "ok", job_id=None, **attrs):
+    """
+    Report a span that was timed elsewhere.
+    """
+    job_id = job_id or _job_id.get()
+
+    STAGE_SECONDS.labels(stage).observe(
+        seconds, exemplar={"job_id": str(job_id)} if job_id else None
+    )
+    STAGE_TOTAL.labels(stage, status).inc()
+
+    if LOG_SPANS:
+        print("⏱ span " + json.dumps({
+            "stage": stage, "job_id": job_id, "seconds": round(seconds, 4),
+            "status": status, **attrs,
+        }, default=str), flush=True)
+
+
+@contextmanager
+def span(stage: str, job_id=None, **attrs):
+    job_id = job_id or _job_id.get()
+    token = _job_id.set(job_id)
+    t0 = time.perf_counter()
+    status = "ok"
+
+    try:
+        yield
+    except BaseException:
+        status = "error"
+        raise
+    finally:
+        _job_id.reset(token)
+        record(stage, time.perf_counter() - t0, status, job_id, **attrs)
+
+
+# -------------------------------------------------
+# celery (queue wait + task runtime, every task)
+# -------------------------------------------------
+def install_celery_signals():
+    from celery.signals import (
+        before_task_publish,
+        task_prerun,
+        task_postrun,
+        worker_process_shutdown,
+    )
+
+    @before_task_publish.connect(weak=False)
+    def _stamp(headers=None, **_):
+        if headers is not None:
+            headers["enqueued_at"] = time.time()
+
+    @task_prerun.connect(weak=False)
+    def _start(task=None, args=None, **_):
+        queue = (task.request.delivery_info or {}).get("routing_key", "?")
+        enqueued = getattr(task.request, "enqueued_at", None)
+        if enqueued:
+            wait = max(0.0, time.time() - enqueued)
+            QUEUE_WAIT_SECONDS.labels(task.name, queue).observe(wait)
+            record("queue_wait", wait, job_id=task_job_id(args, task), task=task.name)
+        task.request._trace_t0 = time.perf_counter()
+
+    @task_postrun.connect(weak=False)
+    def _end(task=None, state=None, **_):
+        t0 = getattr(task.request, "_trace_t0", None)
+        if t0 is not None:
+            queue = (task.request.delivery_info or {}).get("routing_key", "?")
+            TASK_SECONDS.labels(task.name, queue).observe(time.perf_counter() - t0)
+
+    @worker_process_shutdown.connect(weak=False)
+    def _dead(pid=None, **_):
+        if os.getenv("PROMETHEUS_MULTIPROC_DIR"):
+            from prometheus_client import multiprocess
+            multiprocess.mark_process_dead(pid or os.getpid())
+
+
+def task_job_id(args, task=None):
+    # musicgen.generate(job_id, payload); other tasks (bgm.generate)
+    # are queued with the API job id as their task id
+    if args and isinstance(args[0], str) and len(args) > 1 and isinstance(args[1], dict):
+        return args[0]
+    return task.request.id if task is not None else None
+
+
+# -------------------------------------------------
+# queue depth (scrape time)
+# -------------------------------------------------
+class QueueDepthCollector:
+
+    def __init__(self, queues=QUEUES):
+        self.queues = queues
+
+    def describe(self):
+        # registering must not touch the broker
+        yield GaugeMetricFamily("indianode_queue_depth", "Messages waiting per Celery queue", labels=["queue"])
+
+    def collect(self):
+        gauge = GaugeMetricFamily(
+            "indianode_queue_depth", "Messages waiting per Celery queue", labels=["queue"]
+        )
+
+        # a broken broker must not break the whole scrape
+        try:
+            import redis
+            from app.celery_app import celery
+
+            broker = redis.Redis.from_url(celery.conf.broker_url)
+            sep = celery.conf.broker_transport_options.get("sep", ":")
+            pipe = broker.pipeline()
+            for q in self.queues:
+                pipe.llen(q)
+                for p in range(1, PRIORITY_STEPS):
+                    pipe.llen(f"{q}{sep}{p}")
+            counts = pipe.execute()
+        except Exception as e:
+            print("⚠️ queue depth unavailable:", e)
+            return
+
+        for i, q in enumerate(self.queues):
+            gauge.add_metric([q], sum(counts[i * PRIORITY_STEPS:(i + 1) * PRIORITY_STEPS]))
+        yield gauge
+
+
+def metrics_payload(accept: str = ""):
+    """
+    (body, content type) for GET /metrics. OpenMetrics (with exemplars)
+    when the scraper's Accept header asks for it, else Prometheus text.
+    """
+    if os.getenv("PROMETHEUS_MULTIPROC_DIR"):
+        from prometheus_client import multiprocess
+
+        # fresh registry per scrape (prometheus_client multiprocess docs)
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+        registry.register(QueueDepthCollector())
+    else:
+        registry = _single_process_registry()
+
+    if "application/openmetrics-text" in accept:
+        return openmetrics.generate_latest(registry), openmetrics.CONTENT_TYPE_LATEST
+    return generate_latest(registry), CONTENT_TYPE_LATEST
+
+
+_QUEUE_REGISTERED = False
+
+
+def _single_process_registry():
+    global _QUEUE_REGISTERED
+    if not _QUEUE_REGISTERED:
+        REGISTRY.register(QueueDepthCollector())
+        _QUEUE_REGISTERED = True
+    return REGISTRY
@@ -0,0 +1,175 @@
+# app/services/waveform_peaks.py
+
+"""
+Waveform peaks sidecar (player draws the waveform before any audio loads)
+
+Written by the musicgen task right after mastering:
+
+    outputs/<job id>.peaks      a few KB, vs MBs of wav / mp4
+
+✓ min/max pairs per pixel, channels folded (min of mins, max of maxes)
+✓ multi-resolution: finest level ≤ MAX_POINTS pixels, each next level
+  halves it (down to MIN_POINTS) → any player width without resampling
+✓ int8 values (-127 … 127), plenty for drawing
+✓ one vectorized pass over the samples, coarser levels reduce the finer
+
+Binary layout (little endian):
+
+    b"PEAK" u8 version  u8 channels(1)  u16 levels  u32 sample_rate  u32 samples
+    per level: u32 samples_per_pixel  u32 length  int8[length * 2] (min, max, ...)
+
+    GET /api/music/peaks/{job_id}?width=1200   one level as JSON
+    GET /api/music/peaks/{job_id}?format=bin   the whole sidecar
+
+The JSON view uses the audiowaveform layout (peaks.js / wavesurfer
+read it as-is).
+"""
+
+import os
+import struct
+import uuid
+
+import numpy as np
+import soundfile as sf
+
+from app.services import artifact_store
+
+
+MAGIC = b"PEAK"
+VERSION = 1
+HEADER = struct.Struct("<4sBBHII")
+LEVEL = struct.Struct("<II")
+
+MAX_POINTS = 8192
+MIN_POINTS = 256
+MIN_SAMPLES_PER_PIXEL = 64
+
+
+# -------------------------------------------------
+# compute
+# -------------------------------------------------
+def compute(audio: np.ndarray) -> list:
+    """
+    audio: float [samples] or [samples, channels] in -1 … 1.
+    Returns [(samples_per_pixel, int8 [length, 2]), ...], finest first.
+    """
+    audio = np.asarray(audio, dtype=np.float32)
+    if audio.ndim == 1:
+        audio = audio[:, None]
+    n = len(audio)
+
+    if n == 0:
+        audio, n = np.zeros((1, audio.shape[1]), np.float32), 1
+
+    spp = MIN_SAMPLES_PER_PIXEL
+    while -(-n // spp) > MAX_POINTS:
+        spp *= 2
+
+    # pad to whole pixels with edge values (no fake silence at the end)
+    length = -(-n // spp)
+    pad = length * spp - n
+    if pad:
+        audio = np.concatenate([audio, np.repeat(audio[-1:], pad, axis=0)])
+
+    frames = audio.reshape(length, spp * audio.shape[1])
+    lo, hi = frames.min(axis=1), frames.max(axis=1)
+
+    levels = [(spp, lo, hi)]
+    while len(lo) > MIN_POINTS:
+        if len(lo) % 2:
+            lo, hi = np.append(lo, lo[-1]), np.append(hi, hi[-1])
+        lo, hi = lo.reshape(-1, 2).min(axis=1), hi.reshape(-1, 2).max(axis=1)
+        spp *= 2
+        levels.append((spp, lo, hi))
+
+    return [(s, _quantize(np.stack([l, h], axis=1))) for s, l, h in levels]
+
+
+def _quantize(x):
+    return np.clip(np.round(x * 127), -127, 127).astype(np.int8)
+
+
+# -------------------------------------------------
+# sidecar
+# -------------------------------------------------
+def write(path: str, levels: list, sample_rate: int, samples: int) -> str:
+    parts = [HEADER.pack(MAGIC, VERSION, 1, len(levels), sample_rate, samples)]
+    for spp, data in levels:
+        parts.append(LEVEL.pack(spp, len(data)))
+        parts.append(data.tobytes())
+
+    tmp = f"{path}.{uuid.uuid4().hex[:8]}.part"      # worker and API may write at once
+    with open(tmp, "wb") as f:
+        f.write(b"".join(parts))
+    os.replace(tmp, path)
+    return path
+
+
+def read(path: str) -> dict:
+    with open(path, "rb") as f:
+        buf = f.read()
+
+    magic, version, channels, count, sample_rate, samples = HEADER.unpack_from(buf)
+    if magic != MAGIC or version != VERSION:
+        raise ValueError(f"Not a peaks file: {path}")
+
+    levels, offset = [], HEADER.size
+    for _ in range(count):
+        spp, length = LEVEL.unpack_from(buf, offset)
+        offset += LEVEL.size
+        data = np.frombuffer(buf, dtype=np.int8, count=length * 2, offset=offset).reshape(length, 2)
+        offset += length * 2
+        levels.append((spp, data))
+
+    return {"sample_rate": sample_rate, "samples": samples, "levels": levels}
+
+
+def from_wav(wav_path: str, peaks_path: str) -> str:
+    audio, sr = sf.read(wav_path, dtype="float32", always_2d=True)
+    return write(peaks_path, compute(audio), sr, len(audio))
+
+
+def ensure(job_id: str, output_dir: str) -> str | None:
+    """
+    Sidecar path, computed on first use for jobs that predate it.
+    None → no wav for this job.
+    """
+    path = artifact_store.fetch(job_id, ".peaks", output_dir)
+    if path:
+        return path
+
+    wav_path = artifact_store.fetch(job_id, ".wav", output_dir)
+    if wav_path is None:
+        return None
+
+    path = from_wav(wav_path, os.path.join(output_dir, f"{job_id}.peaks"))
+    artifact_store.publish(job_id, ".peaks", path)
+    return path
+
+
+# -------------------------------------------------
+# JSON view (one level)
+# -------------------------------------------------
+def level_for_width(peaks: dict, width: int | None) -> tuple:
+    """
+    Coarsest level that still has ≥ width points (finest if none does).
+    """
+    levels = peaks["levels"]
+    if not width:
+        return levels[0]
+    fitting = [lv for lv in levels if len(lv[1]) >= width]
+    return fitting[-1] if fitting else levels[0]
+
+
+def to_json(peaks: dict, width: int | None = None) -> dict:
+    spp, data = level_for_width(peaks, width)
+    return {
+        "version": VERSION,
+        "sample_rate": peaks["sample_rate"],
+        "duration": round(peaks["samples"] / peaks["sample_rate"], 3),
+        "samples_per_pixel": spp,
+        "bits": 8,
+        "length": len(data),
+        "data": data.reshape(-1).tolist(),      # min, max, min, max, ...
+        "levels": [s for s, _ in peaks["levels"]],
+    }
@@ -1,8 +1,19 @@
+import os
+
 from celery import shared_task
+from app.services import artifact_store
 from app.services.accompaniment_service import generate_accompaniment
 
 
 @shared_task(name="accompaniment.generate")
 def accompaniment_generate(input_path: str):
-    return generate_accompaniment(input_path)
+    job_id = accompaniment_generate.request.id
+
+    # uploaded through another API node → pull it from the shared store
+    if not os.path.exists(input_path):
+        input_path = artifact_store.fetch(job_id, "_in.wav", os.path.dirname(input_path)) or input_path
+
+    output_path = generate_accompaniment(input_path)
+    artifact_store.publish(job_id, ".mp4", output_path)
+    return output_path
 
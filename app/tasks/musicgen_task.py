@@ -2,13 +2,17 @@
 
 import os
 import torch
+import shutil
 import soundfile as sf
-import subprocess
 
-from audiocraft.models import MusicGen
 from celery import shared_task
 
 from app.services.job_store import job_store
+from app.services import artifact_store, model_store
+from app.services.tracing import span
+from app.utils.mp4_generator import render_job_mp4
+from app.services.audio_delivery import encode_aac
+from app.services import waveform_peaks
 from app.services.audio_postprocess_service import enhance_audio
 from app.services.classical_postprocess_service import classical_polish_audio
 from app.services.audio_quality_service import check_audio_quality
@@ -29,11 +33,9 @@ BASE_DIR = os.path.dirname(
     )
 )
 
-OUTPUT_DIR = os.path.join(BASE_DIR, "outputs")
+OUTPUT_DIR = artifact_store.OUTPUT_DIR          # BASE_DIR/outputs unless OUTPUT_DIR is set
 os.makedirs(OUTPUT_DIR, exist_ok=True)
 
-FFMPEG = "/usr/bin/ffmpeg"
-
 _MODEL = None
 _MODEL_NAME = None
 
@@ -41,21 +43,21 @@ MAX_RETRIES = 4
 
 
 # -------------------------------------------------
-# Load model once (UNCHANGED)
+# Load model once (local model store)
 # -------------------------------------------------
 def load_musicgen(mode: str):
     global _MODEL, _MODEL_NAME
 
     target_model = (
-        "facebook/musicgen-small"
+        "musicgen-small"
         if mode == "classical"
-        else "facebook/musicgen-large"
+        else "musicgen-large"
     )
 
     if _MODEL is None or _MODEL_NAME != target_model:
         print(f"🎵 Loading MusicGen: {target_model}")
 
-        _MODEL = MusicGen.get_pretrained(target_model)
+        _MODEL = model_store.load_musicgen(target_model)
         _MODEL_NAME = target_model
 
         _MODEL.set_generation_params(
@@ -86,6 +88,10 @@ def generate_music_task(job_id: str, payload: dict):
         duration = int(payload.get("duration", 10))
         image_path = payload.get("image_path")   # ⭐ already passed from API
 
+        # uploaded through another API node → pull it from the shared store
+        if image_path and not os.path.exists(image_path):
+            image_path = artifact_store.fetch(job_id, os.path.splitext(image_path)[1], OUTPUT_DIR)
+
         model = load_musicgen(mode)
         model.set_generation_params(duration=duration)
 
@@ -105,7 +111,8 @@ def generate_music_task(job_id: str, payload: dict):
 
             print(f"🎵 Attempt {attempt+1}/{MAX_RETRIES}")
 
-            with torch.no_grad():
+            with span("generate", job_id, model=_MODEL_NAME, duration=duration, attempt=attempt + 1), \
+                    torch.no_grad():
                 wav = model.generate([current_prompt])[0]
 
             raw_path = os.path.abspath(
@@ -119,7 +126,8 @@ def generate_music_task(job_id: str, payload: dict):
                 subtype="PCM_16"
             )
 
-            ok, reason = check_audio_quality(raw_path, current_prompt, mode)
+            with span("qa", job_id):
+                ok, reason = check_audio_quality(raw_path, current_prompt, mode)
 
             print("🔍 QA:", ok, reason)
 
@@ -137,108 +145,88 @@ def generate_music_task(job_id: str, payload: dict):
         if not ok:
             msg = "Some finetuning of prompt needed, Lets retry"
             job_store.set_error(job_id, msg)
+            _pool_fill_failed(payload, job_id)
             return 
 
         # ============================================
         # POSTPROCESS ONLY ONCE (AFTER PASS)
         # ============================================
 
-        if mode == "classical":
-            wav_path = os.path.abspath(classical_polish_audio(raw_path))
-        else:
-            wav_path = os.path.abspath(enhance_audio(raw_path))
+        with span("mastering", job_id, mode=mode):
+            if mode == "classical":
+                wav_path = os.path.abspath(classical_polish_audio(raw_path))
+            else:
+                wav_path = os.path.abspath(enhance_audio(raw_path))
         final_wav_path = os.path.abspath(
             os.path.join(OUTPUT_DIR, f"{job_id}.wav")
         )
-        subprocess.run(["cp", wav_path, final_wav_path], check=True)
-        wav_path = final_wav_path
+
+        # everything below reads a temp copy; <job>.wav appears LAST
+        # (status reads done on it, segmented BGM polls for it) → nobody
+        # sees a half-written wav, or a "done" job whose m4a / mp4 are
+        # still being encoded
+        tmp_wav_path = os.path.join(OUTPUT_DIR, f"{job_id}.part.wav")
+        shutil.copyfile(wav_path, tmp_wav_path)
+        wav_path = tmp_wav_path
+
+        # segment jobs (scene-segmented BGM) only need the wav
+        if payload.get("audio_only"):
+            os.replace(tmp_wav_path, final_wav_path)
+            with span("publish", job_id):
+                artifact_store.publish(job_id, ".wav", output_dir=OUTPUT_DIR)
+            job_store.set_done(job_id, final_wav_path)
+            return final_wav_path
 
         # =================================================
-        # MP4 CREATION (FIXED FOR UNIVERSAL COMPATIBILITY)
+        # WAVEFORM PEAKS (player draws before audio loads)
         # =================================================
+        with span("peaks", job_id):
+            waveform_peaks.from_wav(wav_path, os.path.join(OUTPUT_DIR, f"{job_id}.peaks"))
+
         # =================================================
-        # MP4 CREATION (stable + compatible)
+        # AAC ONCE (m4a download + mp4 audio track)
         # =================================================
+        m4a_path = os.path.join(OUTPUT_DIR, f"{job_id}.m4a")
 
-        mp4_path = os.path.join(OUTPUT_DIR, f"{job_id}.mp4")
+        with span("audio_encode", job_id, format="aac"):
+            encode_aac(wav_path, m4a_path)
 
-        COMMON_FLAGS = [
-            "-map", "0:v:0",
-            "-map", "1:a:0",
-            "-c:v", "libx264",
-            "-preset", "medium",
-            "-profile:v", "baseline",
-            "-level", "3.0",
-            "-pix_fmt", "yuv420p",
-            "-movflags", "+faststart",
-            "-c:a", "aac",
-            "-b:a", "192k",
-            "-ar", "44100",
-            "-ac", "2",
-            "-shortest",
-        ]
-
-        if image_path and os.path.exists(image_path):
-
-            print("🖼 Normalizing uploaded image for mp4 compatibility:", image_path)
-
-            safe_img = os.path.join(OUTPUT_DIR, f"{job_id}_frame.jpg")
-
-            # ⭐ convert ANY image → safe 1080x1080 yuv420p jpg
-            subprocess.run(
-                [
-                    FFMPEG, "-y",
-                    "-i", image_path,
-                    "-vf",
-                    "scale=1080:1080:force_original_aspect_ratio=decrease,"
-                    "pad=1080:1080:(ow-iw)/2:(oh-ih)/2,format=yuv420p",
-                    "-frames:v", "1",
-                    safe_img,
-                ],
-                check=True,
-            )
-
-            subprocess.run(
-                [
-                    FFMPEG, "-y",
-                    "-loop", "1",
-                    "-framerate", "30",
-                    "-i", safe_img,   # ⭐ use normalized image
-                    "-i", wav_path,
-                    *COMMON_FLAGS,
-                    mp4_path,
-                ],
-                check=True,
-            )
+        # =================================================
+        # MP4 CREATION (stable + compatible)
+        # =================================================
+        mp4_path = os.path.join(OUTPUT_DIR, f"{job_id}.mp4")
 
+        with span("video_encode", job_id, image=bool(image_path)):
+            render_job_mp4(wav_path, mp4_path, duration, image_path,
+                           work_dir=OUTPUT_DIR, aac_path=m4a_path)
 
-#################################
-############################################
-        else:
-
-            print("🎨 No image → generating indianode branded frame")
-
-            subprocess.run(
-                [
-                    FFMPEG, "-y",
-                    "-f", "lavfi",
-                    "-i",
-                    f"color=c=black:s=1080x1080:r=30:d={duration},"
-                    "drawtext=text='INDIANODE':"
-                    "fontcolor=white:"
-                    "fontsize=80:"
-                    "x=(w-text_w)/2:"
-                    "y=(h-text_h)/2",
-                    "-i", wav_path,
-                    *COMMON_FLAGS,
-                    mp4_path,
-                ],
-                check=True,
-            )
+        os.replace(tmp_wav_path, final_wav_path)
 
+        # =================================================
+        # SHARED STORE (any API node can serve the job)
+        # =================================================
+        with span("publish", job_id):
+            for ext in artifact_store.JOB_EXTENSIONS:
+                artifact_store.publish(job_id, ext, output_dir=OUTPUT_DIR)
 
         # =================================================
         job_store.set_done(job_id, mp4_path)
+
+        # preset pool fill → variant is ready to be served
+        if payload.get("pool_key"):
+            from app.services import preset_pool
+            preset_pool.add(payload["pool_key"], job_id)
+
+        # text-prompt job → searchable for near-duplicate "quick" requests;
+        # image jobs stay out: their mp4 carries the uploader's image and
+        # their prompt skipped the guardrails /generate applies
+        elif not payload.get("image_path"):
+            from app.services import prompt_index
+            try:
+                prompt_index.record(prompt, job_id, duration, mode)
+            except Exception as e:
+                print("⚠️ prompt index record failed:", e)
+
         return mp4_path
 
     except Exception as e:
@@ -247,5 +235,17 @@ def generate_music_task(job_id: str, payload: dict):
             job_id,
             "This prompt needs a small tweak for best results. Please try again."
         )
+        _pool_fill_failed(payload, job_id)
         raise
 
+
+def _pool_fill_failed(payload: dict, job_id: str):
+    # a failed pool fill must not hold its in-flight slot (blocks refills)
+    if not payload.get("pool_key"):
+        return
+    from app.services import preset_pool
+    try:
+        preset_pool.fill_failed(payload["pool_key"], job_id)
+    except Exception as e:
+        print("⚠️ pool fill cleanup failed:", e)
+
@@ -0,0 +1,13 @@
+# app/tasks/preset_pool_task.py
+
+from celery import shared_task
+
+from app.services import preset_pool
+
+
+# -------------------------------------------------
+# Celery beat → one refill round (cheap, cpu queue)
+# -------------------------------------------------
+@shared_task(name="preset_pool.refill", queue="cpu", ignore_result=True)
+def refill_preset_pool():
+    return preset_pool.refill()
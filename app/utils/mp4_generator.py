@@ -4,6 +4,105 @@ import subprocess
 import os
 
 
+FFMPEG = "/usr/bin/ffmpeg"
+
+# stable + compatible (baseline profile plays everywhere)
+VIDEO_FLAGS = [
+    "-map", "0:v:0",
+    "-map", "1:a:0",
+    "-c:v", "libx264",
+    "-preset", "medium",
+    "-profile:v", "baseline",
+    "-level", "3.0",
+    "-pix_fmt", "yuv420p",
+    "-movflags", "+faststart",
+]
+
+# shared with audio_delivery.encode_aac (the .m4a download)
+AAC_FLAGS = [
+    "-c:a", "aac",
+    "-b:a", "192k",
+    "-ar", "44100",
+    "-ac", "2",
+]
+
+
+def render_job_mp4(
+    wav_path: str,
+    mp4_path: str,
+    duration: float,
+    image_path: str | None = None,
+    work_dir: str | None = None,
+    aac_path: str | None = None,
+) -> str:
+    """
+    MP4 for a generated track (musicgen task):
+    uploaded image (normalized to 1080x1080) or the INDIANODE title frame.
+
+    aac_path (the job's .m4a) → audio track is stream-copied, not re-encoded.
+    """
+    audio_in = aac_path or wav_path
+    flags = [*VIDEO_FLAGS, *(["-c:a", "copy"] if aac_path else AAC_FLAGS), "-shortest"]
+
+    if image_path and os.path.exists(image_path):
+
+        print("🖼 Normalizing uploaded image for mp4 compatibility:", image_path)
+
+        stem = os.path.splitext(os.path.basename(mp4_path))[0]
+        safe_img = os.path.join(work_dir or os.path.dirname(mp4_path), f"{stem}_frame.jpg")
+
+        # ⭐ convert ANY image → safe 1080x1080 yuv420p jpg
+        subprocess.run(
+            [
+                FFMPEG, "-y",
+                "-i", image_path,
+                "-vf",
+                "scale=1080:1080:force_original_aspect_ratio=decrease,"
+                "pad=1080:1080:(ow-iw)/2:(oh-ih)/2,format=yuv420p",
+                "-frames:v", "1",
+                safe_img,
+            ],
+            check=True,
+        )
+
+        subprocess.run(
+            [
+                FFMPEG, "-y",
+                "-loop", "1",
+                "-framerate", "30",
+                "-i", safe_img,   # ⭐ use normalized image
+                "-i", audio_in,
+                *flags,
+                mp4_path,
+            ],
+            check=True,
+        )
+
+    else:
+
+        print("🎨 No image → generating indianode branded frame")
+
+        subprocess.run(
+            [
+                FFMPEG, "-y",
+                "-f", "lavfi",
+                "-i",
+                f"color=c=black:s=1080x1080:r=30:d={duration},"
+                "drawtext=text='INDIANODE':"
+                "fontcolor=white:"
+                "fontsize=80:"
+                "x=(w-text_w)/2:"
+                "y=(h-text_h)/2",
+                "-i", audio_in,
+                *flags,
+                mp4_path,
+            ],
+            check=True,
+        )
+
+    return mp4_path
+
+
 def wav_to_mp4(wav_path: str, mp4_path: str, image_path: str | None = None):
     """
     Generate MP4 from WAV.
@@ -11,7 +110,7 @@ def wav_to_mp4(wav_path: str, mp4_path: str, image_path: str | None = None):
     If not → fallback to black video (Flow-1 behavior).
     """
 
-    cmd = ["/usr/bin/ffmpeg", "-y"]
+    cmd = [FFMPEG, "-y"]
 
     if image_path and os.path.exists(image_path):
         # 🔥 FLOW-2: IMAGE + AUDIO
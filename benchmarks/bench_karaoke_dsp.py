@@ -0,0 +1,171 @@
+# benchmarks/bench_karaoke_dsp.py
+
+"""
+Karaoke DSP benchmark (legacy mixer code vs karaoke_ai.dsp)
+
+Per stage, on a synthetic vocal + music pair:
+    compress   per-sample Python loop (AudioMixer)  vs  dsp.compress
+    duck       40 ms frame loop (AudioMixer)        vs  dsp.Ducker
+    reverb     whole-signal fftconvolve             vs  dsp.Convolver (streamed)
+    widen      mid/side (AIMastering)               vs  dsp.widen
+
+Reported as real-time factor (processing seconds / audio seconds)
+plus the max difference against the legacy output.
+
+    python -m benchmarks.bench_karaoke_dsp
+    python -m benchmarks.bench_karaoke_dsp --seconds 240 --mixers
+"""
+
+import argparse
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+
+import numpy as np
+import soundfile as sf
+from scipy.signal import fftconvolve
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.services.karaoke_ai import dsp  # noqa: E402
+
+
+SR = 44100
+
+
+# -------------------------------------------------
+# fixtures
+# -------------------------------------------------
+def synthetic_pair(seconds: float, sr: int = SR, seed: int = 0):
+    """
+    Phrased vocal (on/off every 2 s) + steady music bed, mono float32.
+    """
+    rng = np.random.default_rng(seed)
+    t = np.arange(int(seconds * sr)) / sr
+
+    gate = (np.sin(2 * np.pi * 0.25 * t) > 0).astype(np.float32)
+    vocal = gate * sum(0.3 / k * np.sin(2 * np.pi * k * 220 * t) for k in range(1, 5))
+    music = 0.2 * np.sin(2 * np.pi * 110 * t) + 0.05 * rng.standard_normal(len(t))
+
+    return vocal.astype(np.float32), music.astype(np.float32)
+
+
+# -------------------------------------------------
+# legacy reference (copied from the old mixers)
+# -------------------------------------------------
+def legacy_compress(x, thresh=0.2, ratio=3):
+    out = np.copy(x)
+    for i in range(len(x)):
+        s = x[i]
+        if abs(s) > thresh:
+            s = np.sign(s) * (thresh + (abs(s) - thresh) / ratio)
+        out[i] = s
+    return out
+
+
+def legacy_duck(music, vocal, sr=SR, frame_ms=40, threshold=0.02, duck_db=5):
+    frame = int(sr * frame_ms / 1000)
+    out = np.copy(music)
+    for i in range(0, len(music), frame):
+        v = vocal[i:i + frame]
+        if np.sqrt(np.mean(v ** 2) + 1e-9) > threshold:
+            out[i:i + frame] *= 10 ** (-duck_db / 20)
+    return out
+
+
+def legacy_reverb(x, sr=SR):
+    ir = np.exp(-np.linspace(0, 4, int(sr * 0.08)))
+    return x * 0.85 + fftconvolve(x, ir)[:len(x)] * 0.15
+
+
+def legacy_widen(stereo, amount=1.5):
+    mid = (stereo[:, 0] + stereo[:, 1]) / 2
+    side = (stereo[:, 0] - stereo[:, 1]) / 2 * amount
+    return np.stack([mid + side, mid - side], axis=1)
+
+
+# -------------------------------------------------
+# new path, streamed in blocks
+# -------------------------------------------------
+def blocks(x, n=dsp.BLOCK):
+    for i in range(0, len(x), n):
+        yield x[i:i + n]
+
+
+def new_duck(music, vocal):
+    d = dsp.Ducker(SR)
+    return np.concatenate([d.process(m, v) for m, v in zip(blocks(music), blocks(vocal))])
+
+
+def new_reverb(x):
+    c = dsp.Convolver(dsp.room_ir(SR, 0.08), dry=0.85, wet=0.15)
+    return np.concatenate([c.process(b) for b in blocks(x)])
+
+
+def timed(fn, *args):
+    t0 = time.perf_counter()
+    out = fn(*args)
+    return out, time.perf_counter() - t0
+
+
+# -------------------------------------------------
+# full mixers: time + peak Python heap
+# -------------------------------------------------
+def bench_mixers(vocal, music, seconds):
+    from app.services.karaoke_ai.audio_mixer import AudioMixer
+
+    with tempfile.TemporaryDirectory() as tmp:
+        v_path = os.path.join(tmp, "vocal.wav")
+        m_path = os.path.join(tmp, "music.wav")
+        sf.write(v_path, vocal, SR)
+        sf.write(m_path, music, SR)
+
+        tracemalloc.start()
+        t0 = time.perf_counter()
+        AudioMixer().mix(v_path, m_path, os.path.join(tmp, "out.wav"))
+        sec = time.perf_counter() - t0
+        _, peak_bytes = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+
+    print(f"AudioMixer.mix   RTF {sec / seconds:.4f}   peak heap {peak_bytes / 2**20:.1f} MiB")
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--seconds", type=float, default=60.0)
+    ap.add_argument("--legacy-compress-seconds", type=float, default=10.0,
+                    help="the per-sample loop is slow; time it on a shorter slice")
+    ap.add_argument("--mixers", action="store_true", help="also run AudioMixer end to end")
+    args = ap.parse_args()
+
+    vocal, music = synthetic_pair(args.seconds)
+    print(f"🎧 {args.seconds:.0f}s synthetic vocal + music @ {SR} Hz, block {dsp.BLOCK}")
+    print(f"{'stage':<10} {'legacy RTF':>11} {'dsp RTF':>10} {'speedup':>9} {'max diff':>10}")
+
+    def row(name, legacy, new, secs):
+        (ref, t_old), (out, t_new) = legacy, new
+        diff = float(np.abs(np.asarray(ref, np.float32) - out).max())
+        print(f"{name:<10} {t_old / secs:11.5f} {t_new / secs:10.5f} {t_old / t_new:8.1f}x {diff:10.2e}")
+
+    n = int(args.legacy_compress_seconds * SR)
+    row("compress",
+        timed(legacy_compress, vocal[:n]),
+        timed(lambda x: dsp.compress(x, 0.2, 3, knee=0), vocal[:n]),
+        n / SR)
+
+    row("duck", timed(legacy_duck, music, vocal), timed(new_duck, music, vocal), args.seconds)
+    row("reverb", timed(legacy_reverb, vocal), timed(new_reverb, vocal), args.seconds)
+
+    stereo = np.stack([music, 0.8 * music], axis=1)
+    row("widen", timed(legacy_widen, stereo), timed(dsp.widen, stereo, 1.5), args.seconds)
+
+    print("(duck differs by design: smoothed envelope vs hard 40 ms frame steps)")
+
+    if args.mixers:
+        bench_mixers(vocal, music, args.seconds)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,134 @@
+# benchmarks/bench_local_llm.py
+
+"""
+Local LLM benchmark (intent-analysis prompts, CPU int8 by default)
+
+For each concurrency level N, N client threads call run_llm() in a
+loop (what N simultaneous analyze_intent requests look like):
+
+    sequential  old path: one generate() per prompt, full decode, no early stop
+    batched     run_llm(json_mode=True): micro-batched, new tokens only,
+                stops at the closing brace
+
+Reported: throughput (requests/s) and p50 / p95 latency per request.
+Model load is excluded from timings.
+
+    python -m benchmarks.bench_local_llm
+    python -m benchmarks.bench_local_llm --concurrency 1 4 8 16 --requests 32
+    LLM_DEVICE=cuda python -m benchmarks.bench_local_llm
+"""
+
+import argparse
+import os
+import sys
+import threading
+import time
+
+import numpy as np
+
+os.environ.setdefault("ENABLE_LLM", "true")
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.intelligence import llm_client  # noqa: E402
+
+
+IDEAS = [
+    "I feel stressed after work and want something calm",
+    "music for a temple festival morning",
+    "sad rainy evening piano",
+    "energetic workout track with drums",
+    "romantic song for a wedding",
+    "focus music for studying late at night",
+]
+
+PROMPT = """You are a music director. Respond ONLY with valid JSON:
+{{"user_emotion": string, "genre": string, "tempo": "slow" | "medium" | "fast",
+"energy": "low" | "medium" | "high", "instruments": [string]}}
+
+User input:
+{idea}
+"""
+
+
+def prompts(n):
+    return [PROMPT.format(idea=IDEAS[i % len(IDEAS)]) for i in range(n)]
+
+
+# -------------------------------------------------
+# old path (one prompt per generate, decodes prompt + answer)
+# -------------------------------------------------
+_generate_lock = threading.Lock()
+
+
+def sequential(prompt):
+    import torch
+
+    tok, model = llm_client._tokenizer, llm_client._model
+    inputs = tok(prompt, return_tensors="pt").to(llm_client._device)
+
+    # the old client had no batching → requests serialize on the model
+    with _generate_lock, torch.no_grad():
+        out = model.generate(**inputs, max_new_tokens=llm_client.MAX_NEW_TOKENS,
+                             do_sample=False, use_cache=True,
+                             pad_token_id=tok.pad_token_id)
+    return tok.decode(out[0], skip_special_tokens=True)
+
+
+def batched(prompt):
+    return llm_client.run_llm(prompt, json_mode=True)
+
+
+# -------------------------------------------------
+# load generator
+# -------------------------------------------------
+def run(fn, concurrency, total):
+    work = prompts(total)
+    latencies = []
+    lock = threading.Lock()
+
+    def client(k):
+        for p in work[k::concurrency]:
+            t0 = time.perf_counter()
+            fn(p)
+            with lock:
+                latencies.append(time.perf_counter() - t0)
+
+    threads = [threading.Thread(target=client, args=(k,)) for k in range(concurrency)]
+    t0 = time.perf_counter()
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    wall = time.perf_counter() - t0
+
+    lat = np.array(latencies)
+    return total / wall, np.percentile(lat, 50), np.percentile(lat, 95)
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--concurrency", type=int, nargs="+", default=[1, 4, 8])
+    ap.add_argument("--requests", type=int, default=16)
+    ap.add_argument("--threads", type=int, default=0)
+    args = ap.parse_args()
+
+    if args.threads:
+        import torch
+        torch.set_num_threads(args.threads)
+
+    t0 = time.perf_counter()
+    llm_client._load_model()
+    print(f"🧠 {llm_client.MODEL_KEY} on {llm_client._device}, load {time.perf_counter() - t0:.1f}s, "
+          f"window {llm_client.LLM_BATCH_WINDOW_MS:.0f} ms, max batch {llm_client.LLM_MAX_BATCH}")
+
+    print(f"{'mode':<11} {'conc':>4} {'req/s':>7} {'p50 s':>7} {'p95 s':>7}")
+    for n in args.concurrency:
+        for name, fn in (("sequential", sequential), ("batched", batched)):
+            rps, p50, p95 = run(fn, n, args.requests)
+            print(f"{name:<11} {n:>4} {rps:7.2f} {p50:7.2f} {p95:7.2f}")
+
+    print("   →", batched(prompts(1)[0])[:200])
+
+
+if __name__ == "__main__":
+    main()
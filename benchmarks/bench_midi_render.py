@@ -0,0 +1,116 @@
+# benchmarks/bench_midi_render.py
+
+"""
+MIDI render benchmark
+
+Compares, for a short kriti-style clip and a 4-track arrangement:
+    cli        fluidsynth -ni ... -F out.wav  (old path, process per render)
+    cold       MidiRenderService, first render (bank load included)
+    warm       MidiRenderService, new MIDI content, synths already warm
+    cached     MidiRenderService, same MIDI again (render cache hit)
+
+    python -m benchmarks.bench_midi_render
+    python -m benchmarks.bench_midi_render --soundfont /path/bank.sf2 --repeat 5
+"""
+
+import argparse
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.services.midi_render_service import (  # noqa: E402
+    FLUIDSYNTH_BIN,
+    SOUNDFONT,
+    MidiRenderService,
+)
+
+
+def kriti_midi(path, n_notes=16, transpose=0):
+    import pretty_midi
+
+    pm = pretty_midi.PrettyMIDI(initial_tempo=90)
+    inst = pretty_midi.Instrument(program=104)
+    swaras = [60, 62, 64, 65, 67, 69, 71, 72]
+    beat = 60 / 90
+
+    for i in range(n_notes):
+        start = i * beat
+        inst.notes.append(pretty_midi.Note(90, swaras[i % 8] + transpose, start, start + 0.9 * beat))
+
+    pm.instruments.append(inst)
+    pm.write(path)
+
+
+def band_midi(path, seconds=20, transpose=0):
+    import pretty_midi
+
+    pm = pretty_midi.PrettyMIDI(initial_tempo=100)
+    beat = 0.6
+
+    programs = [(0, False), (32, False), (48, False), (0, True)]
+    for program, drum in programs:
+        inst = pretty_midi.Instrument(program=program, is_drum=drum)
+        t = 0.0
+        while t < seconds:
+            pitch = 36 if drum else 48 + (int(t / beat) % 7) + transpose
+            inst.notes.append(pretty_midi.Note(80, pitch, t, t + (0.1 if drum else beat)))
+            t += beat
+        pm.instruments.append(inst)
+
+    pm.write(path)
+
+
+def timed(fn, repeat):
+    best = float("inf")
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - t0)
+    return best
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--soundfont", default=SOUNDFONT)
+    ap.add_argument("--repeat", type=int, default=3)
+    args = ap.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        service = MidiRenderService(cache_dir=os.path.join(tmp, "cache"))
+
+        for name, build in (("kriti", kriti_midi), ("band", band_midi)):
+            midi = os.path.join(tmp, f"{name}.mid")
+            build(midi)
+            out = os.path.join(tmp, f"{name}_cli.wav")
+
+            cli = timed(lambda: subprocess.run(
+                [FLUIDSYNTH_BIN, "-ni", args.soundfont, midi, "-F", out, "-r", "44100"],
+                check=True, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+            ), args.repeat)
+
+            t0 = time.perf_counter()
+            service.render(midi, bank=args.soundfont)
+            cold = time.perf_counter() - t0
+
+            counter = iter(range(1, 1000))
+
+            def fresh():
+                m = os.path.join(tmp, f"{name}_fresh.mid")
+                build(m, transpose=next(counter))
+                service.render(m, bank=args.soundfont)
+
+            warm = timed(fresh, args.repeat)
+            cached = timed(lambda: service.render(midi, bank=args.soundfont), args.repeat)
+
+            print(
+                f"{name:<6} cli={cli * 1000:8.1f} ms  cold={cold * 1000:8.1f} ms  "
+                f"warm={warm * 1000:8.1f} ms  cached={cached * 1000:6.1f} ms"
+            )
+
+
+if __name__ == "__main__":
+    main()
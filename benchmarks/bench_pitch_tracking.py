@@ -0,0 +1,197 @@
+# benchmarks/bench_pitch_tracking.py
+
+"""
+Pitch tracking benchmark (CPU)
+
+Times every pitch_tracking_service backend and checks pitch agreement
+against the current path (crepe.predict, viterbi=True, 10 ms).
+
+    python -m benchmarks.bench_pitch_tracking                 # synthetic vocal
+    python -m benchmarks.bench_pitch_tracking vocal.wav       # real take
+    python -m benchmarks.bench_pitch_tracking --json out.json
+
+Reports per backend:
+    rtf        processing seconds / audio seconds (lower is better)
+    load_s     one-off model load (not included in rtf)
+    rpa_50c    % of reference-voiced frames within 50 cents
+    voicing    % of frames with the same voiced/unvoiced decision
+"""
+
+import argparse
+import json
+import os
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.services.pitch_tracking_service import BACKENDS, track_pitch  # noqa: E402
+
+
+SR = 16000
+VOICED_CONF = 0.5
+
+
+# -------------------------------------------------
+# fixtures
+# -------------------------------------------------
+def synthetic_vocal(seconds: float, sr: int = SR, seed: int = 0):
+    """
+    Sung-like line: scale notes, vibrato, harmonics, breaths, noise.
+    Returns (audio, times, true_f0).
+    """
+    rng = np.random.default_rng(seed)
+    n = int(seconds * sr)
+
+    f0 = np.zeros(n)
+    t = 0
+    scale = [0, 2, 4, 5, 7, 9, 11, 12]
+
+    while t < n:
+        length = int(rng.uniform(0.25, 0.8) * sr)
+        gap = int(rng.uniform(0.0, 0.15) * sr)
+        midi = 57 + rng.choice(scale)
+        f0[t:t + length] = 440.0 * 2 ** ((midi - 69) / 12)
+        t += length + gap
+
+    idx = np.arange(n) / sr
+    vibrato = 1 + 0.01 * np.sin(2 * np.pi * 5.5 * idx)
+    inst_f0 = f0 * vibrato
+
+    phase = 2 * np.pi * np.cumsum(inst_f0) / sr
+    y = sum((0.6 / k) * np.sin(k * phase) for k in range(1, 6))
+    y *= (f0 > 0)
+    y += 0.01 * rng.standard_normal(n)
+
+    hop = int(0.01 * sr)
+    true_f0 = inst_f0[::hop]
+
+    return y.astype(np.float32), np.arange(len(true_f0)) * 0.01, true_f0
+
+
+def load_audio(path):
+    import librosa
+    y, _ = librosa.load(path, sr=SR, mono=True)
+    return y
+
+
+# -------------------------------------------------
+# reference (current code path)
+# -------------------------------------------------
+def reference_track(y):
+    try:
+        import crepe
+    except ImportError:
+        print("⚠️ crepe not installed → using torchcrepe-full as reference")
+        return "torchcrepe-full", track_pitch(y, SR, backend="torchcrepe-full", device="cpu")
+
+    times, f0, conf, _ = crepe.predict(y, SR, viterbi=True, verbose=0)
+    return "crepe", (times, f0, conf)
+
+
+# -------------------------------------------------
+# metrics
+# -------------------------------------------------
+def agreement(ref, est):
+    rt, rf, rc = ref
+    et, ef, ec = est
+
+    # align to reference frames
+    idx = np.clip(np.searchsorted(et, rt), 0, len(et) - 1)
+    ef, ec = ef[idx], ec[idx]
+
+    ref_voiced = (rf > 0) & (rc >= VOICED_CONF)
+    est_voiced = (ef > 0) & (ec >= VOICED_CONF)
+
+    both = ref_voiced & (ef > 0)
+    cents = np.abs(1200 * np.log2(ef[both] / rf[both])) if both.any() else np.zeros(0)
+
+    rpa = float(np.sum(cents < 50) / max(1, ref_voiced.sum()))
+    voicing = float(np.mean(ref_voiced == est_voiced))
+
+    return round(100 * rpa, 1), round(100 * voicing, 1)
+
+
+def bench_backend(backend, y, threads):
+    import torch
+    torch.set_num_threads(threads)
+
+    t0 = time.perf_counter()
+    track_pitch(y[:SR], SR, backend=backend, device="cpu")   # warm / load model
+    load_s = time.perf_counter() - t0
+
+    t0 = time.perf_counter()
+    result = track_pitch(y, SR, backend=backend, device="cpu")
+    elapsed = time.perf_counter() - t0
+
+    return result, elapsed, load_s
+
+
+# -------------------------------------------------
+# main
+# -------------------------------------------------
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("wav", nargs="?")
+    ap.add_argument("--seconds", type=float, default=30.0)
+    ap.add_argument("--backends", default=",".join(BACKENDS))
+    ap.add_argument("--threads", type=int, default=os.cpu_count() or 1)
+    ap.add_argument("--json")
+    args = ap.parse_args()
+
+    if args.wav:
+        y = load_audio(args.wav)
+        truth = None
+    else:
+        y, tt, tf = synthetic_vocal(args.seconds)
+        truth = (tt, tf, (tf > 0).astype(float))
+
+    duration = len(y) / SR
+    print(f"🎤 {duration:.1f}s audio, {args.threads} CPU threads")
+
+    t0 = time.perf_counter()
+    ref_name, ref = reference_track(y)
+    ref_elapsed = time.perf_counter() - t0
+
+    rows = [{
+        "backend": f"{ref_name} (reference)",
+        "rtf": round(ref_elapsed / duration, 4),
+        "load_s": None,
+        "rpa_50c": 100.0,
+        "voicing": 100.0,
+    }]
+
+    if truth is not None:
+        rows[0]["truth_rpa_50c"] = agreement(truth, ref)[0]
+
+    for backend in args.backends.split(","):
+        result, elapsed, load_s = bench_backend(backend, y, args.threads)
+        rpa, voicing = agreement(ref, result)
+
+        row = {
+            "backend": backend,
+            "rtf": round(elapsed / duration, 4),
+            "load_s": round(load_s, 3),
+            "rpa_50c": rpa,
+            "voicing": voicing,
+        }
+
+        if truth is not None:
+            row["truth_rpa_50c"] = agreement(truth, result)[0]
+
+        rows.append(row)
+
+    print(f"\n{'backend':<26}{'rtf':>8}{'load_s':>9}{'rpa_50c':>9}{'voicing':>9}")
+    for r in rows:
+        load = "-" if r["load_s"] is None else f"{r['load_s']:.2f}"
+        print(f"{r['backend']:<26}{r['rtf']:>8.3f}{load:>9}{r['rpa_50c']:>9.1f}{r['voicing']:>9.1f}")
+
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump({"duration_s": duration, "threads": args.threads, "results": rows}, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,120 @@
+# benchmarks/bench_prefork_memory.py
+
+"""
+Prefork memory benchmark (per-child unique set size)
+
+For concurrency 1, 4, 8 forks N children that each hold a model:
+
+    per-child   every child loads its own copy after fork (old behaviour)
+    preload     parent loads once (model_preload.preload), children reuse it
+
+Reported per configuration: mean USS per child (memory only that child
+owns), sum of children's USS, and parent RSS.
+
+    python -m benchmarks.bench_prefork_memory                   # synthetic 200 MB "weights"
+    python -m benchmarks.bench_prefork_memory --model demucs
+    python -m benchmarks.bench_prefork_memory --model crepe --concurrency 1 4 8
+"""
+
+import argparse
+import gc
+import multiprocessing as mp
+import os
+import sys
+
+import numpy as np
+import psutil
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.services import model_preload  # noqa: E402
+
+
+# -------------------------------------------------
+# synthetic fixture: a parameter dict of float32 arrays
+# -------------------------------------------------
+def synthetic_model(mb: int):
+    rng = np.random.default_rng(0)
+    n_layers = 16
+    per_layer = mb * 2**20 // 4 // n_layers
+    return {f"layer{i}": rng.standard_normal(per_layer, dtype=np.float32) for i in range(n_layers)}
+
+
+def load(name: str, mb: int):
+    if name == "synthetic":
+        return model_preload.resident("synthetic", lambda: synthetic_model(mb))
+    return model_preload.PRELOADERS[name]()
+
+
+def read_only_pass(model):
+    """
+    Touch every weight page without writing (what inference does).
+    """
+    if isinstance(model, dict):
+        return float(sum(float(w.sum()) for w in model.values()))
+    return 0.0
+
+
+# -------------------------------------------------
+# child
+# -------------------------------------------------
+def child(name, mb, ready, release):
+    model = load(name, mb)
+    read_only_pass(model)
+    ready.put(os.getpid())
+    release.wait()
+
+
+def run(name, mb, concurrency):
+    ctx = mp.get_context("fork")
+    ready, release = ctx.Queue(), ctx.Event()
+
+    procs = [ctx.Process(target=child, args=(name, mb, ready, release)) for _ in range(concurrency)]
+    for p in procs:
+        p.start()
+
+    pids = [ready.get(timeout=600) for _ in procs]
+    uss = [psutil.Process(pid).memory_full_info().uss for pid in pids]
+
+    release.set()
+    for p in procs:
+        p.join()
+
+    return uss
+
+
+def report(mode, concurrency, uss):
+    parent = psutil.Process().memory_info().rss
+    print(f"{mode:<10} c={concurrency:<2} "
+          f"USS/child {np.mean(uss) / 2**20:8.1f} MiB   "
+          f"Σ children {sum(uss) / 2**20:8.1f} MiB   "
+          f"parent RSS {parent / 2**20:8.1f} MiB")
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--model", default="synthetic", choices=["synthetic", *model_preload.PRELOADERS])
+    ap.add_argument("--mb", type=int, default=200, help="synthetic model size")
+    ap.add_argument("--concurrency", type=int, nargs="+", default=[1, 4, 8])
+    args = ap.parse_args()
+
+    print(f"🧠 model={args.model}" + (f" ({args.mb} MB)" if args.model == "synthetic" else ""))
+
+    # old: nothing in the parent, each child loads
+    for c in args.concurrency:
+        report("per-child", c, run(args.model, args.mb, c))
+
+    # new: parent preloads, children inherit pages copy-on-write
+    if args.model == "synthetic":
+        load("synthetic", args.mb)
+        gc.collect()
+        gc.freeze()
+    else:
+        model_preload.preload([args.model])
+
+    for c in args.concurrency:
+        report("preload", c, run(args.model, args.mb, c))
+
+
+if __name__ == "__main__":
+    main()
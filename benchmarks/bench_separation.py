@@ -0,0 +1,112 @@
+# benchmarks/bench_separation.py
+
+"""
+Source separation benchmark (CPU)
+
+    cli      demucs -n htdemucs <wav>  + sf.read of the four stems
+    cold     separate() including model load
+    warm     separate() with the model already resident
+
+Reported as seconds of processing per minute of audio.
+
+    python -m benchmarks.bench_separation                  # 1 min synthetic mix
+    python -m benchmarks.bench_separation song.wav --threads 8 --shifts 1
+"""
+
+import argparse
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+import numpy as np
+import soundfile as sf
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.services import source_separation_service as sep  # noqa: E402
+
+
+SR = 44100
+
+
+def synthetic_mix(seconds: float, sr: int = SR, seed: int = 0):
+    """
+    Voice-like harmonic line + bass + noise-burst drums, stereo.
+    """
+    rng = np.random.default_rng(seed)
+    t = np.arange(int(seconds * sr)) / sr
+
+    voice = sum(0.2 / k * np.sin(2 * np.pi * k * 220 * (1 + 0.01 * np.sin(2 * np.pi * 5 * t)) * t) for k in range(1, 6))
+    bass = 0.3 * np.sin(2 * np.pi * 55 * t)
+
+    drums = np.zeros_like(t)
+    hit = (rng.standard_normal(int(0.05 * sr)) * np.exp(-np.linspace(0, 8, int(0.05 * sr))))
+    for start in range(0, len(t) - len(hit), int(0.5 * sr)):
+        drums[start:start + len(hit)] += 0.5 * hit
+
+    mono = voice + bass + drums
+    return np.stack([mono, 0.9 * mono], axis=1).astype(np.float32)
+
+
+def run_cli(wav_path, out_dir, shifts, threads):
+    env = dict(os.environ)
+    if threads:
+        env["OMP_NUM_THREADS"] = str(threads)
+
+    subprocess.run(
+        ["demucs", "-n", sep.MODEL_NAME, "--shifts", str(shifts), "-d", "cpu", "-o", out_dir, wav_path],
+        check=True, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+    )
+
+    base = os.path.splitext(os.path.basename(wav_path))[0]
+    stem_dir = os.path.join(out_dir, sep.MODEL_NAME, base)
+    return {s: sf.read(os.path.join(stem_dir, f"{s}.wav"))[0] for s in ("vocals", "drums", "bass", "other")}
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("wav", nargs="?")
+    ap.add_argument("--seconds", type=float, default=60.0)
+    ap.add_argument("--threads", type=int, default=os.cpu_count() or 1)
+    ap.add_argument("--shifts", type=int, default=1)
+    ap.add_argument("--skip-cli", action="store_true")
+    args = ap.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        wav = args.wav
+        if wav is None:
+            wav = os.path.join(tmp, "mix.wav")
+            sf.write(wav, synthetic_mix(args.seconds), SR)
+
+        minutes = sf.info(wav).duration / 60
+        print(f"🎧 {minutes * 60:.1f}s audio, {args.threads} threads, shifts={args.shifts}")
+
+        results = {}
+
+        if not args.skip_cli:
+            t0 = time.perf_counter()
+            cli_stems = run_cli(wav, os.path.join(tmp, "separated"), args.shifts, args.threads)
+            results["cli"] = time.perf_counter() - t0
+
+        t0 = time.perf_counter()
+        sep.separate(wav, device="cpu", shifts=args.shifts, threads=args.threads)
+        results["cold"] = time.perf_counter() - t0
+
+        t0 = time.perf_counter()
+        stems, _ = sep.separate(wav, device="cpu", shifts=args.shifts, threads=args.threads)
+        results["warm"] = time.perf_counter() - t0
+
+        for name, sec in results.items():
+            print(f"{name:<6} {sec / minutes:8.2f} s per minute of audio")
+
+        if not args.skip_cli and args.shifts == 1:
+            n = min(len(cli_stems["vocals"]), len(stems["vocals"]))
+            for s in stems:
+                diff = np.abs(cli_stems[s][:n] - stems[s][:n]).max()
+                print(f"   max |cli - service| {s:<7} {diff:.4f}")
+
+
+if __name__ == "__main__":
+    main()
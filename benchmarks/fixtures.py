@@ -0,0 +1,212 @@
+# benchmarks/fixtures.py
+
+"""
+Deterministic synthetic fixtures for the benchmark suite
+
+Everything is generated from a fixed seed (same bytes on every run and
+every machine), so timings are comparable across commits:
+
+    vocal    phrased sine melody with vibrato (kind="sine")
+             or band-limited breathy noise (kind="noise"), mono
+    music    chord pad + bass + hat pulse + noise floor, stereo
+    mix      vocal + music summed (what the mastering chains see)
+    melody   pretty_midi melody notes / .mid file (detect_chords, render)
+    band     melody + bass + pad .mid (multi-track render)
+    image    small gradient PNG (mp4 image path)
+
+Files are written once per Fixtures directory and reused by every case.
+"""
+
+import os
+
+import numpy as np
+import soundfile as sf
+
+
+SR = 44100
+SEED = 1234
+
+SCALE = [60, 62, 64, 65, 67, 69, 71, 72]        # C major, one octave
+CHORDS = [(48, 52, 55), (53, 57, 60), (55, 59, 62), (45, 48, 52)]   # I IV V vi
+
+
+def _rng(*key):
+    return np.random.default_rng([SEED, *key])
+
+
+def _hz(midi):
+    return 440.0 * 2 ** ((np.asarray(midi) - 69) / 12)
+
+
+# -------------------------------------------------
+# audio
+# -------------------------------------------------
+def vocal(seconds: float, kind: str = "sine", sr: int = SR) -> np.ndarray:
+    """
+    Phrased "singer": 2 s phrases with short breaths, one note per 0.5 s.
+    """
+    n = int(seconds * sr)
+    t = np.arange(n) / sr
+    rng = _rng(0, int(seconds), kind == "noise")
+
+    gate = ((t % 2.0) < 1.7).astype(np.float32)
+    gate = np.convolve(gate, np.hanning(441) / 220.5, mode="same")    # 10 ms fades
+
+    if kind == "noise":
+        x = rng.standard_normal(n)
+        # crude formant: differentiate (less low end) + 8-tap average (less top)
+        x = np.diff(np.concatenate([[0.0], x]))
+        x = np.convolve(x, np.ones(8) / 8, mode="same")
+        return (0.3 * gate * x / (np.abs(x).max() + 1e-9)).astype(np.float32)
+
+    notes = np.array(SCALE)[rng.integers(0, len(SCALE), int(np.ceil(seconds * 2)) + 1)]
+    f0 = _hz(notes[(t * 2).astype(int)])
+    f0 = f0 * (1 + 0.006 * np.sin(2 * np.pi * 5.5 * t))                 # vibrato
+    phase = 2 * np.pi * np.cumsum(f0) / sr
+
+    x = sum(0.3 / k * np.sin(k * phase) for k in range(1, 5))
+    x = x + 0.01 * rng.standard_normal(n)
+    return (gate * x).astype(np.float32)
+
+
+def music(seconds: float, sr: int = SR) -> np.ndarray:
+    n = int(seconds * sr)
+    t = np.arange(n) / sr
+    rng = _rng(1, int(seconds))
+
+    bar = (t // 2.0).astype(int) % len(CHORDS)
+    pad = np.zeros(n)
+    for voice in range(3):
+        f = _hz(np.array([c[voice] for c in CHORDS]))[bar]
+        pad += 0.08 * np.sin(2 * np.pi * f * t)
+
+    bass = 0.15 * np.sin(2 * np.pi * _hz(np.array([c[0] - 12 for c in CHORDS]))[bar] * t)
+    hat = 0.05 * rng.standard_normal(n) * np.exp(-((t % 0.25) * 60))
+    floor = 0.005 * rng.standard_normal(n)
+
+    left = pad + bass + hat + floor
+    right = pad + bass + np.roll(hat, 200) + floor
+    return np.stack([left, right], axis=1).astype(np.float32)
+
+
+def mix(seconds: float, sr: int = SR) -> np.ndarray:
+    v = vocal(seconds, sr=sr)
+    return np.clip(music(seconds, sr) + 0.8 * v[:, None], -1.0, 1.0)
+
+
+# -------------------------------------------------
+# midi
+# -------------------------------------------------
+def melody_notes(seconds: float, tempo: float = 90):
+    import pretty_midi
+
+    rng = _rng(2, int(seconds))
+    beat = 60 / tempo
+    notes = []
+
+    for i in range(int(seconds / beat)):
+        start = i * beat
+        pitch = int(SCALE[rng.integers(0, len(SCALE))])
+        notes.append(pretty_midi.Note(90, pitch, start, start + 0.9 * beat))
+
+    return notes
+
+
+def melody_midi(path: str, seconds: float, tempo: float = 90, program: int = 73) -> str:
+    import pretty_midi
+
+    pm = pretty_midi.PrettyMIDI(initial_tempo=tempo)
+    inst = pretty_midi.Instrument(program=program)
+    inst.notes.extend(melody_notes(seconds, tempo))
+    pm.instruments.append(inst)
+    pm.write(path)
+    return path
+
+
+def band_midi(path: str, seconds: float, tempo: float = 90, transpose: int = 0) -> str:
+    """
+    Melody + bass + pad. `transpose` gives new content (render cache miss)
+    with identical cost.
+    """
+    import pretty_midi
+
+    pm = pretty_midi.PrettyMIDI(initial_tempo=tempo)
+    bar = 4 * 60 / tempo
+
+    melody = pretty_midi.Instrument(program=73)
+    for n in melody_notes(seconds, tempo):
+        melody.notes.append(pretty_midi.Note(n.velocity, n.pitch + transpose, n.start, n.end))
+
+    bass = pretty_midi.Instrument(program=33)
+    pad = pretty_midi.Instrument(program=89)
+    for i in range(int(seconds / bar)):
+        start, end = i * bar, (i + 1) * bar
+        chord = CHORDS[i % len(CHORDS)]
+        bass.notes.append(pretty_midi.Note(80, chord[0] - 12 + transpose, start, end))
+        for p in chord:
+            pad.notes.append(pretty_midi.Note(60, p + transpose, start, end))
+
+    pm.instruments.extend([melody, bass, pad])
+    pm.write(path)
+    return path
+
+
+# -------------------------------------------------
+# image
+# -------------------------------------------------
+def image(path: str, size=(640, 480)) -> str:
+    from PIL import Image
+
+    w, h = size
+    y, x = np.mgrid[0:h, 0:w]
+    rgb = np.stack([
+        255 * x / w,
+        255 * y / h,
+        127 + 127 * np.sin(x / 40.0) * np.cos(y / 40.0),
+    ], axis=-1).astype(np.uint8)
+
+    Image.fromarray(rgb).save(path)
+    return path
+
+
+# -------------------------------------------------
+# on-disk cache (one directory per suite run)
+# -------------------------------------------------
+class Fixtures:
+
+    def __init__(self, directory: str):
+        self.dir = directory
+        os.makedirs(directory, exist_ok=True)
+
+    def _path(self, name):
+        return os.path.join(self.dir, name)
+
+    def _wav(self, name, make):
+        path = self._path(name)
+        if not os.path.exists(path):
+            sf.write(path, make(), SR, subtype="PCM_16")
+        return path
+
+    def vocal_wav(self, seconds: float, kind: str = "sine") -> str:
+        return self._wav(f"vocal_{kind}_{seconds:g}s.wav", lambda: vocal(seconds, kind))
+
+    def music_wav(self, seconds: float) -> str:
+        return self._wav(f"music_{seconds:g}s.wav", lambda: music(seconds))
+
+    def mix_wav(self, seconds: float) -> str:
+        return self._wav(f"mix_{seconds:g}s.wav", lambda: mix(seconds))
+
+    def melody_midi(self, seconds: float) -> str:
+        path = self._path(f"melody_{seconds:g}s.mid")
+        return path if os.path.exists(path) else melody_midi(path, seconds)
+
+    def band_midi(self, seconds: float, transpose: int = 0) -> str:
+        path = self._path(f"band_{seconds:g}s_{transpose:+d}.mid")
+        return path if os.path.exists(path) else band_midi(path, seconds, transpose=transpose)
+
+    def image(self) -> str:
+        path = self._path("frame.png")
+        return path if os.path.exists(path) else image(path)
+
+    def out(self, name: str) -> str:
+        return self._path(f"out_{name}")
@@ -0,0 +1,237 @@
+# benchmarks/load_test.py
+
+"""
+End-to-end load generator for the music API (API → Celery → gpu worker)
+
+Each job: POST /api/music/generate, then poll /api/music/status/{id}
+until it is done or failed. Pair with the stub backend so no GPU is
+needed:
+
+    MUSICGEN_BACKEND=stub MUSICGEN_STUB_LATENCY=0.5 \\
+        celery -A app.celery_app worker -Q gpu -c 1
+    celery -A app.celery_app worker -Q cpu
+    uvicorn app.main:app
+
+    python -m benchmarks.load_test --jobs 50 --concurrency 8
+    python -m benchmarks.load_test --jobs 200 --rate 2 --duration 10 --json out.json
+
+    closed loop  --concurrency N clients, each submits its next job when
+                 the previous one finished
+    open loop    --rate R jobs/s (Poisson arrivals), whatever the backlog
+
+Reported: submit latency and end-to-end latency percentiles, completed
+jobs per minute (queue throughput), failures, and the deepest gpu queue
+seen on /metrics while the test ran.
+"""
+
+import argparse
+import json
+import os
+import random
+import re
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import httpx
+import numpy as np
+
+
+PROMPTS = [
+    "calm carnatic veena and flute for a temple morning",
+    "energetic bollywood dance track with dhol",
+    "sad piano with soft strings on a rainy evening",
+    "lo-fi chill beats for studying late at night",
+    "epic cinematic orchestra with big drums",
+    "romantic film song instrumental with sitar",
+    "devotional bhajan with harmonium and tabla",
+    "ambient pads for meditation and deep focus",
+]
+MODES = ["cinematic", "classical"]
+TERMINAL = {"done", "error", "FAILURE", "SUCCESS", "REVOKED"}
+
+QUEUE_DEPTH = re.compile(r'^indianode_queue_depth\{queue="(\w+)"\} ([0-9.e+]+)$', re.M)
+
+
+# -------------------------------------------------
+# one job
+# -------------------------------------------------
+def run_job(client: httpx.Client, i: int, args) -> dict:
+    body = {
+        "prompt": f"{PROMPTS[i % len(PROMPTS)]} (take {i})",   # unique → no reuse / pool
+        "duration": args.duration,
+        "mode": MODES[i % len(MODES)] if args.mixed_modes else "cinematic",
+    }
+
+    t0 = time.perf_counter()
+    try:
+        res = client.post("/api/music/generate", json=body)
+        res.raise_for_status()
+        job = res.json()
+    except Exception as e:
+        return {"status": "submit_error", "error": str(e)}
+
+    t_submit = time.perf_counter() - t0
+    status = job.get("status", "queued")
+
+    deadline = t0 + args.timeout
+    while status not in TERMINAL:
+        if time.perf_counter() > deadline:
+            status = "timeout"
+            break
+        time.sleep(args.poll)
+        try:
+            status = client.get(f"/api/music/status/{job['job_id']}").json().get("status")
+        except Exception:
+            continue        # API hiccup → keep polling
+
+    return {
+        "job_id": job.get("job_id"),
+        "status": "done" if status == "done" else status,
+        "submit": t_submit,
+        "e2e": time.perf_counter() - t0,
+        "finished": time.time(),
+    }
+
+
+# -------------------------------------------------
+# queue depth sampler (/metrics)
+# -------------------------------------------------
+class DepthSampler(threading.Thread):
+
+    def __init__(self, client, every=1.0):
+        super().__init__(daemon=True)
+        self.client, self.every = client, every
+        self.max_depth = {}
+        self.stop = threading.Event()
+
+    def run(self):
+        while not self.stop.wait(self.every):
+            try:
+                text = self.client.get("/metrics").text
+            except Exception:
+                continue
+            for queue, value in QUEUE_DEPTH.findall(text):
+                self.max_depth[queue] = max(self.max_depth.get(queue, 0), int(float(value)))
+
+
+# -------------------------------------------------
+# drivers
+# -------------------------------------------------
+def closed_loop(client, args):
+    counter = iter(range(args.jobs))
+    lock = threading.Lock()
+    results = []
+
+    def worker():
+        while True:
+            with lock:
+                i = next(counter, None)
+            if i is None:
+                return
+            r = run_job(client, i, args)
+            with lock:
+                results.append(r)
+
+    threads = [threading.Thread(target=worker) for _ in range(args.concurrency)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    return results
+
+
+def open_loop(client, args):
+    rng = random.Random(0)
+    futures = []
+
+    with ThreadPoolExecutor(max_workers=args.jobs) as pool:
+        for i in range(args.jobs):
+            futures.append(pool.submit(run_job, client, i, args))
+            time.sleep(rng.expovariate(args.rate))
+
+    return [f.result() for f in futures]
+
+
+# -------------------------------------------------
+# report
+# -------------------------------------------------
+def _pct(values, q):
+    return float(np.percentile(values, q)) if values else float("nan")
+
+
+def report(results, wall, depth, args) -> dict:
+    done = [r for r in results if r["status"] == "done"]
+    e2e = [r["e2e"] for r in done]
+    submit = [r["submit"] for r in results if "submit" in r]
+
+    failures = {}
+    for r in results:
+        if r["status"] != "done":
+            failures[r["status"]] = failures.get(r["status"], 0) + 1
+
+    # throughput over the span where jobs were completing (excludes ramp-up)
+    finished = sorted(r["finished"] for r in done)
+    span = finished[-1] - finished[0] if len(finished) > 1 else wall
+
+    summary = {
+        "jobs": len(results),
+        "done": len(done),
+        "failures": failures,
+        "wall_seconds": round(wall, 2),
+        "jobs_per_minute": round(60 * len(done) / wall, 2),
+        "steady_jobs_per_minute": round(60 * (len(done) - 1) / span, 2) if len(done) > 1 and span > 0 else None,
+        "submit_ms": {q: round(1000 * _pct(submit, q), 1) for q in (50, 95, 99)},
+        "e2e_seconds": {q: round(_pct(e2e, q), 2) for q in (50, 90, 95, 99)},
+        "max_queue_depth": depth,
+        "config": {k: v for k, v in vars(args).items() if k != "json"},
+    }
+
+    print(f"\n📊 {summary['done']}/{summary['jobs']} done in {wall:.1f}s"
+          + (f"   failures {failures}" if failures else ""))
+    print(f"   throughput  {summary['jobs_per_minute']} jobs/min "
+          f"(steady {summary['steady_jobs_per_minute']})")
+    print("   submit ms   " + "  ".join(f"p{q} {v}" for q, v in summary["submit_ms"].items()))
+    print("   e2e s       " + "  ".join(f"p{q} {v}" for q, v in summary["e2e_seconds"].items()))
+    if depth:
+        print("   max queue   " + "  ".join(f"{q} {v}" for q, v in sorted(depth.items())))
+
+    return summary
+
+
+def main():
+    ap = argparse.ArgumentParser(prog="python -m benchmarks.load_test")
+    ap.add_argument("--url", default=os.getenv("API_URL", "http://localhost:8000"))
+    ap.add_argument("--jobs", type=int, default=50)
+    ap.add_argument("--concurrency", type=int, default=8, help="closed-loop clients")
+    ap.add_argument("--rate", type=float, default=0, help="open-loop arrivals per second")
+    ap.add_argument("--duration", type=int, default=10, help="seconds of music per job")
+    ap.add_argument("--mixed-modes", action="store_true", help="alternate cinematic / classical")
+    ap.add_argument("--poll", type=float, default=0.5)
+    ap.add_argument("--timeout", type=float, default=1800, help="per job")
+    ap.add_argument("--json", help="write the summary here")
+    args = ap.parse_args()
+
+    limits = httpx.Limits(max_connections=max(args.concurrency, 64))
+    with httpx.Client(base_url=args.url, timeout=60, limits=limits) as client:
+        sampler = DepthSampler(client)
+        sampler.start()
+
+        mode = f"open loop {args.rate:g} jobs/s" if args.rate else f"closed loop x{args.concurrency}"
+        print(f"🚦 {args.jobs} jobs of {args.duration}s → {args.url} ({mode})")
+
+        t0 = time.perf_counter()
+        results = open_loop(client, args) if args.rate else closed_loop(client, args)
+        wall = time.perf_counter() - t0
+
+        sampler.stop.set()
+
+    summary = report(results, wall, sampler.max_depth, args)
+
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(summary, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
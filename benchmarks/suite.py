@@ -0,0 +1,477 @@
+# benchmarks/suite.py
+
+"""
+Benchmark suite: every audio / video hot path on synthetic fixtures
+
+    run       time every case at every fixture length, write JSON
+    compare   current results vs a stored baseline → flags regressions
+    list      cases and whether they can run on this machine
+
+Cases (best of --repeat after one untimed warm-up, inputs from
+benchmarks/fixtures.py):
+
+    enhance_audio                  cinematic master (ffmpeg)
+    classical_polish_audio         classical master (ffmpeg)
+    check_audio_technical_quality  clip / hiss / crackle / DC scan
+    audio_mixer                    karaoke AudioMixer.mix (vocal + bgm)
+    studio_mixer                   karaoke StudioMixer.mix
+    ai_mastering                   AIMastering.mix (Demucs)
+    detect_chords                  AccompanimentGenerator.detect_chords
+    audio_to_midi                  pyin melody → .mid
+    midi_render                    MidiRenderService, 3 tracks, warm synths
+    mp4_title / mp4_image          render_job_mp4 (title frame / uploaded image)
+    mp4_copy                       render_job_mp4 muxing the job's AAC (no re-encode)
+    aac / opus / mp3_encode        delivery formats (audio_delivery)
+    waveform_peaks                 peaks sidecar from the mastered wav
+
+A case whose binary / module / SoundFont is missing is skipped with a
+reason instead of failing the run.
+
+    python -m benchmarks.suite run                      # 10 s + 60 s fixtures
+    python -m benchmarks.suite run --seconds 10 60 600 --save-baseline
+    python -m benchmarks.suite run --only mixer chords --compare
+    python -m benchmarks.suite compare --threshold 0.15 # exit 1 on regression
+"""
+
+import argparse
+import contextlib
+import fnmatch
+import io
+import importlib.util
+import json
+import os
+import platform
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime, timezone
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.fixtures import Fixtures  # noqa: E402
+
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+RESULTS = os.path.join(BENCH_DIR, "results", "latest.json")
+BASELINE = os.path.join(BENCH_DIR, "baselines", "baseline.json")
+
+DEFAULT_SECONDS = [10, 60]
+DEFAULT_REPEAT = 3
+DEFAULT_THRESHOLD = 0.15        # 15 % slower than baseline → regression
+MIN_DELTA = 0.005               # ignore differences below 5 ms (timer noise)
+
+FFMPEG = "/usr/bin/ffmpeg"
+FFPROBE = "/usr/bin/ffprobe"
+
+
+# -------------------------------------------------
+# registry
+# -------------------------------------------------
+CASES = []
+
+
+class SkipCase(Exception):
+    """
+    Raised from a case setup when a requirement only shows up at runtime.
+    """
+
+
+def case(name, needs=(), modules=()):
+    """
+    needs:   binaries / files (absolute path or name on PATH)
+    modules: python modules that must be importable
+
+    The decorated function gets (fixtures, seconds), does its untimed
+    setup and returns run(i) — the call that is timed.
+    """
+    def wrap(fn):
+        CASES.append({"name": name, "setup": fn, "needs": needs, "modules": modules})
+        return fn
+    return wrap
+
+
+def skip_reason(c) -> str | None:
+    for m in c["modules"]:
+        if importlib.util.find_spec(m) is None:
+            return f"python module '{m}' missing"
+
+    for n in c["needs"]:
+        found = os.path.exists(n) if os.path.isabs(n) else shutil.which(n)
+        if not found:
+            return f"'{n}' missing"
+
+    return None
+
+
+def _soundfont():
+    from app.services.midi_render_service import SOUNDFONT
+    return SOUNDFONT
+
+
+def _fluidsynth_available():
+    from app.services import midi_render_service as mrs
+    return mrs.fluidsynth is not None or os.path.exists(mrs.FLUIDSYNTH_BIN)
+
+
+# -------------------------------------------------
+# cases
+# -------------------------------------------------
+@case("enhance_audio", needs=(FFMPEG, FFPROBE))
+def _enhance(fx, seconds):
+    from app.services.audio_postprocess_service import enhance_audio
+
+    src, out = fx.mix_wav(seconds), fx.out("enhanced.wav")
+    return lambda i: enhance_audio(src, out)
+
+
+@case("classical_polish_audio", needs=(FFMPEG, FFPROBE))
+def _classical(fx, seconds):
+    from app.services.classical_postprocess_service import classical_polish_audio
+
+    src, out = fx.mix_wav(seconds), fx.out("classical.wav")
+    return lambda i: classical_polish_audio(src, out)
+
+
+@case("check_audio_technical_quality")
+def _technical_qa(fx, seconds):
+    from app.services.audio_technical_qa import check_audio_technical_quality
+
+    src = fx.mix_wav(seconds)
+    return lambda i: check_audio_technical_quality(src)
+
+
+@case("audio_mixer")
+def _audio_mixer(fx, seconds):
+    from app.services.karaoke_ai.audio_mixer import AudioMixer
+
+    vocal, music, out = fx.vocal_wav(seconds), fx.music_wav(seconds), fx.out("karaoke.wav")
+    mixer = AudioMixer()
+    return lambda i: mixer.mix(vocal, music, out)
+
+
+@case("studio_mixer", needs=("ffmpeg",))
+def _studio_mixer(fx, seconds):
+    from app.services.karaoke_ai.studio_mixer import StudioMixer
+
+    vocal, music, out = fx.vocal_wav(seconds, "noise"), fx.music_wav(seconds), fx.out("studio.wav")
+    mixer = StudioMixer()
+    return lambda i: mixer.mix(vocal, music, out)
+
+
+@case("ai_mastering", modules=("torch", "demucs"))
+def _ai_mastering(fx, seconds):
+    from app.services.karaoke_ai.ai_mastering import AIMastering
+
+    src, out = fx.mix_wav(seconds), fx.out("mastered.wav")
+    mastering = AIMastering()
+    return lambda i: mastering.mix(src, out)
+
+
+@case("detect_chords", modules=("pretty_midi",))
+def _detect_chords(fx, seconds):
+    from app.services.karaoke_ai.accompaniment_generator import AccompanimentGenerator
+    from benchmarks.fixtures import melody_notes
+
+    notes = melody_notes(seconds)
+    gen = AccompanimentGenerator()
+    return lambda i: gen.detect_chords(notes, 90, seconds)
+
+
+@case("audio_to_midi", modules=("librosa", "pretty_midi"))
+def _audio_to_midi(fx, seconds):
+    from app.services.audio_to_midi import audio_to_midi
+
+    src, out = fx.vocal_wav(seconds), fx.out("melody.mid")
+    return lambda i: audio_to_midi(src, out, backend="pyin")
+
+
+@case("midi_render", modules=("pretty_midi",))
+def _midi_render(fx, seconds):
+    from app.services.midi_render_service import MidiRenderService
+
+    if not os.path.exists(_soundfont()):
+        raise SkipCase(f"'{_soundfont()}' missing")
+    if not _fluidsynth_available():
+        raise SkipCase("fluidsynth (module or CLI) missing")
+
+    # private cache dir + new content every call → always a real render
+    service = MidiRenderService(cache_dir=fx.out("render_cache"))
+    service.warmup()
+    midis = [fx.band_midi(seconds, transpose=t) for t in range(-1, 12)]
+    out = fx.out("render.wav")
+    return lambda i: service.render(midis[(i + 1) % len(midis)], out)
+
+
+@case("mp4_title", needs=(FFMPEG,))
+def _mp4_title(fx, seconds):
+    from app.utils.mp4_generator import render_job_mp4
+
+    src, out = fx.mix_wav(seconds), fx.out("title.mp4")
+    return lambda i: render_job_mp4(src, out, seconds, work_dir=fx.dir)
+
+
+@case("mp4_image", needs=(FFMPEG,), modules=("PIL",))
+def _mp4_image(fx, seconds):
+    from app.utils.mp4_generator import render_job_mp4
+
+    src, img, out = fx.mix_wav(seconds), fx.image(), fx.out("image.mp4")
+    return lambda i: render_job_mp4(src, out, seconds, img, work_dir=fx.dir)
+
+
+@case("mp4_copy", needs=(FFMPEG,))
+def _mp4_copy(fx, seconds):
+    from app.services.audio_delivery import encode_aac
+    from app.utils.mp4_generator import render_job_mp4
+
+    src, out = fx.mix_wav(seconds), fx.out("copy.mp4")
+    aac = encode_aac(src, fx.out(f"{seconds:g}s.m4a"))
+    return lambda i: render_job_mp4(src, out, seconds, work_dir=fx.dir, aac_path=aac)
+
+
+@case("aac_encode", needs=(FFMPEG,))
+def _aac(fx, seconds):
+    from app.services.audio_delivery import encode_aac
+
+    src, out = fx.mix_wav(seconds), fx.out("bench.m4a")
+    return lambda i: encode_aac(src, out)
+
+
+@case("opus_encode", needs=(FFMPEG,))
+def _opus(fx, seconds):
+    from app.services.audio_delivery import encode_opus
+
+    src, out = fx.mix_wav(seconds), fx.out("bench.opus")
+    return lambda i: encode_opus(src, out)
+
+
+@case("mp3_encode", modules=("lameenc",))
+def _mp3(fx, seconds):
+    from app.services.audio_delivery import encode_mp3
+
+    src, out = fx.mix_wav(seconds), fx.out("bench.mp3")
+    return lambda i: encode_mp3(src, out)
+
+
+@case("waveform_peaks")
+def _peaks(fx, seconds):
+    from app.services.waveform_peaks import from_wav
+
+    src, out = fx.mix_wav(seconds), fx.out("bench.peaks")
+    return lambda i: from_wav(src, out)
+
+
+# -------------------------------------------------
+# run
+# -------------------------------------------------
+def machine_info() -> dict:
+    try:
+        commit = subprocess.check_output(
+            ["git", "rev-parse", "--short", "HEAD"], cwd=BENCH_DIR,
+            stderr=subprocess.DEVNULL, text=True,
+        ).strip()
+    except Exception:
+        commit = None
+
+    return {
+        "host": platform.node(),
+        "platform": platform.platform(),
+        "machine": platform.machine(),
+        "cpus": os.cpu_count(),
+        "python": platform.python_version(),
+        "numpy": np.__version__,
+        "commit": commit,
+    }
+
+
+def _selected(names, only):
+    if not only:
+        return names
+    return [n for n in names if any(fnmatch.fnmatch(n, f"*{p}*") for p in only)]
+
+
+def time_case(run, repeat: int, warmup: int = 1) -> list:
+    for i in range(warmup):
+        run(-1 - i)
+
+    runs = []
+    for i in range(repeat):
+        t0 = time.perf_counter()
+        run(i)
+        runs.append(time.perf_counter() - t0)
+    return runs
+
+
+def run_suite(seconds_list, repeat=DEFAULT_REPEAT, only=None, quiet=True) -> dict:
+    results, skipped = {}, {}
+    names = _selected([c["name"] for c in CASES], only)
+
+    with tempfile.TemporaryDirectory(prefix="indianode-bench-") as d:
+        fx = Fixtures(d)
+
+        for c in CASES:
+            if c["name"] not in names:
+                continue
+
+            reason = skip_reason(c)
+            if reason:
+                skipped[c["name"]] = reason
+                print(f"⏭  {c['name']:<36} skipped: {reason}")
+                continue
+
+            for seconds in seconds_list:
+                key = f"{c['name']}@{seconds:g}s"
+                try:
+                    run = c["setup"](fx, seconds)
+                    runs = _quiet(time_case, run, repeat) if quiet else time_case(run, repeat)
+                except SkipCase as e:
+                    skipped[c["name"]] = str(e)
+                    print(f"⏭  {c['name']:<36} skipped: {e}")
+                    break
+                except Exception as e:
+                    results[key] = {"error": f"{type(e).__name__}: {e}"}
+                    print(f"❌ {key:<36} {type(e).__name__}: {e}")
+                    continue
+
+                best = min(runs)
+                results[key] = {
+                    "audio_seconds": seconds,
+                    "best": round(best, 6),
+                    "median": round(float(np.median(runs)), 6),
+                    "runs": [round(x, 6) for x in runs],
+                    "rtf": round(best / seconds, 6),
+                }
+                print(f"⏱  {key:<36} best {best:8.3f}s   median {np.median(runs):8.3f}s   rtf {best / seconds:.4f}")
+
+    return {
+        "created": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "machine": machine_info(),
+        "repeat": repeat,
+        "results": results,
+        "skipped": skipped,
+    }
+
+
+def _quiet(fn, *args):
+    """
+    Services print every ffmpeg command / stage → keep the table readable.
+    """
+    with contextlib.redirect_stdout(io.StringIO()):
+        return fn(*args)
+
+
+# -------------------------------------------------
+# compare
+# -------------------------------------------------
+def compare(current: dict, baseline: dict, threshold=DEFAULT_THRESHOLD, min_delta=MIN_DELTA) -> list:
+    """
+    Returns the regressed case keys (best time vs baseline best time).
+    """
+    regressions = []
+
+    cm, bm = current.get("machine", {}), baseline.get("machine", {})
+    if (cm.get("host"), cm.get("cpus")) != (bm.get("host"), bm.get("cpus")):
+        print(f"⚠️ baseline from {bm.get('host')} ({bm.get('cpus')} cpus), "
+              f"current from {cm.get('host')} ({cm.get('cpus')} cpus) → timings may not be comparable")
+
+    print(f"{'case':<38} {'baseline':>9} {'current':>9} {'change':>8}")
+
+    for key in sorted(set(baseline["results"]) | set(current["results"])):
+        base, cur = baseline["results"].get(key), current["results"].get(key)
+
+        if not cur or "best" not in cur:
+            status = (cur or {}).get("error", "not run")
+            print(f"{key:<38} {'':>9} {'':>9} {'':>8}  ⏭  {status}")
+            continue
+        if not base or "best" not in base:
+            print(f"{key:<38} {'':>9} {cur['best']:9.3f} {'':>8}  🆕")
+            continue
+
+        change = cur["best"] / base["best"] - 1
+        delta = cur["best"] - base["best"]
+
+        if change > threshold and delta > min_delta:
+            verdict = "❌ regression"
+            regressions.append(key)
+        elif change < -threshold and -delta > min_delta:
+            verdict = "✅ faster"
+        else:
+            verdict = ""
+
+        print(f"{key:<38} {base['best']:9.3f} {cur['best']:9.3f} {change:+8.1%}  {verdict}")
+
+    return regressions
+
+
+# -------------------------------------------------
+# CLI
+# -------------------------------------------------
+def _load(path):
+    with open(path) as f:
+        return json.load(f)
+
+
+def _save(data, path):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, "w") as f:
+        json.dump(data, f, indent=2)
+    print(f"💾 {os.path.relpath(path)}")
+
+
+def main():
+    ap = argparse.ArgumentParser(prog="python -m benchmarks.suite")
+    sub = ap.add_subparsers(dest="cmd", required=True)
+
+    p = sub.add_parser("run")
+    p.add_argument("--seconds", type=float, nargs="+", default=DEFAULT_SECONDS)
+    p.add_argument("--repeat", type=int, default=DEFAULT_REPEAT)
+    p.add_argument("--only", nargs="+", help="case name substrings")
+    p.add_argument("--out", default=RESULTS)
+    p.add_argument("--save-baseline", action="store_true")
+    p.add_argument("--compare", action="store_true", help="compare against the baseline afterwards")
+    p.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD)
+    p.add_argument("--verbose", action="store_true", help="keep service output")
+
+    p = sub.add_parser("compare")
+    p.add_argument("current", nargs="?", default=RESULTS)
+    p.add_argument("--baseline", default=BASELINE)
+    p.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD)
+
+    sub.add_parser("list")
+
+    args = ap.parse_args()
+
+    if args.cmd == "list":
+        for c in CASES:
+            reason = skip_reason(c)
+            print(f"{'⏭ ' if reason else '✅'} {c['name']:<36} {reason or ''}")
+        return
+
+    if args.cmd == "run":
+        current = run_suite(args.seconds, args.repeat, args.only, quiet=not args.verbose)
+        _save(current, args.out)
+        if args.save_baseline:
+            _save(current, BASELINE)
+        if not args.compare:
+            return
+        baseline_path, threshold = BASELINE, args.threshold
+    else:
+        current = _load(args.current)
+        baseline_path, threshold = args.baseline, args.threshold
+
+    if not os.path.exists(baseline_path):
+        print(f"⚠️ no baseline at {baseline_path} (run with --save-baseline first)")
+        sys.exit(2)
+
+    regressions = compare(current, _load(baseline_path), threshold)
+    if regressions:
+        print(f"❌ {len(regressions)} regression(s) over {threshold:.0%}: {', '.join(regressions)}")
+        sys.exit(1)
+    print("✅ no regressions")
+
+
+if __name__ == "__main__":
+    main()
@@ -7,6 +7,8 @@ import librosa
 import pretty_midi
 from openai import OpenAI
 
+from app.services.midi_render_service import render_midi_file
+
 # =====================================================
 # CONFIG
 # =====================================================
@@ -231,7 +233,7 @@ pm.write("accompaniment.mid")
 # -----------------------------------------------------
 
 print("\n🔊 Rendering instruments...")
-run(f'fluidsynth -ni {SF2} accompaniment.mid -F bgm.wav -r {SR}')
+render_midi_file("accompaniment.mid", "bgm.wav", bank=SF2, sample_rate=SR)
 
 
 # -----------------------------------------------------
@@ -3,7 +3,10 @@ import numpy as np
 import pretty_midi
 import subprocess
 import soundfile as sf
-import crepe
+
+from app.services.melody_transcription import transcribe_notes, notes_to_instrument
+from app.services.pitch_tracking_service import track_pitch
+from app.services.midi_render_service import render_midi_file
 
 INPUT = "vocal.wav"
 SF2 = "FluidR3_GM.sf2"
@@ -24,44 +27,23 @@ print("Tempo:", tempo)
 # -------------------------------------------------
 print("Extracting melody with CREPE...")
 
-time, freq, conf, _ = crepe.predict(
-    y,
-    sr,
-    step_size=20,
-    viterbi=True
-)
+time, freq, conf = track_pitch(y, sr, hop_seconds=0.02)
 
-# convert freq → midi
-midi_notes = librosa.hz_to_midi(freq)
-midi_notes[conf < 0.6] = 0
+notes = transcribe_notes(freq, conf, times=time)
 
 # -------------------------------------------------
 # Step 3 — create MIDI
 # -------------------------------------------------
 pm = pretty_midi.PrettyMIDI(initial_tempo=tempo)
 
-melody_inst = pretty_midi.Instrument(program=pretty_midi.instrument_name_to_program("Flute"))
+melody_inst = notes_to_instrument(
+    notes,
+    program=pretty_midi.instrument_name_to_program("Flute"),
+    velocity=90
+)
 bass_inst = pretty_midi.Instrument(program=pretty_midi.instrument_name_to_program("Acoustic Bass"))
 pad_inst = pretty_midi.Instrument(program=pretty_midi.instrument_name_to_program("String Ensemble 1"))
 
-step = 0.02  # 20ms
-
-last_pitch = None
-start = 0
-
-for i, pitch in enumerate(midi_notes):
-    t = i * step
-
-    if pitch > 0:
-        if last_pitch is None:
-            start = t
-            last_pitch = pitch
-    else:
-        if last_pitch is not None:
-            note = pretty_midi.Note(velocity=90, pitch=int(last_pitch), start=start, end=t)
-            melody_inst.notes.append(note)
-            last_pitch = None
-
 # -------------------------------------------------
 # Step 4 — simple accompaniment logic
 # -------------------------------------------------
@@ -98,10 +80,7 @@ pm.write("accompaniment.mid")
 # Step 5 — render with fluidsynth
 # -------------------------------------------------
 print("Rendering audio...")
-subprocess.run(
-    f"fluidsynth -ni {SF2} accompaniment.mid -F bgm.wav -r 32000",
-    shell=True
-)
+render_midi_file("accompaniment.mid", "bgm.wav", bank=SF2, sample_rate=32000)
 
 # -------------------------------------------------
 # Step 6 — mix
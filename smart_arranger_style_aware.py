@@ -8,6 +8,8 @@ import librosa
 import pretty_midi
 from openai import OpenAI
 
+from app.services.midi_render_service import render_midi_file
+
 # =====================================================
 # CONFIG
 # =====================================================
@@ -247,7 +249,7 @@ chords, beat_times = detect_chords(y, sr)
 print("🔊 Rendering accompaniment...")
 build_midi(chords, beat_times, tempo, style, duration)
 
-run(f'fluidsynth -ni {SF2} accompaniment.mid -F bgm.wav -r {SR}')
+render_midi_file("accompaniment.mid", "bgm.wav", bank=SF2, sample_rate=SR)
 
 print("🎚 Mixing + mastering...")
 run(
@@ -8,6 +8,8 @@ import librosa
 import pretty_midi
 from openai import OpenAI
 
+from app.services.midi_render_service import render_midi_file
+
 SR = 32000
 SF2 = "FluidR3_GM.sf2"
 
@@ -216,7 +218,7 @@ duration = len(y)/sr
 build_midi(chords, beat_times, tempo, style, duration)
 
 print("🔊 Rendering...")
-run(f'fluidsynth -ni {SF2} accompaniment.mid -F bgm.wav -r {SR}')
+render_midi_file("accompaniment.mid", "bgm.wav", bank=SF2, sample_rate=SR)
 
 print("🎚 Mixing (smooth + loud master)...")
 
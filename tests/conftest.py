@@ -0,0 +1,29 @@
+# tests/conftest.py
+
+import pytest
+
+from app.services import artifact_store
+
+
+@pytest.fixture
+def store(tmp_path, monkeypatch):
+    """
+    Local artifact store under tmp_path, installed as the configured one.
+    """
+    s = artifact_store.LocalStore(tmp_path / "store")
+    monkeypatch.setattr(artifact_store, "ARTIFACT_STORE", "local")
+    monkeypatch.setattr(artifact_store, "_store", s)
+    return s
+
+
+@pytest.fixture
+def no_store(monkeypatch):
+    monkeypatch.setattr(artifact_store, "ARTIFACT_STORE", "")
+    monkeypatch.setattr(artifact_store, "_store", None)
+
+
+@pytest.fixture
+def output_dir(tmp_path):
+    path = tmp_path / "outputs"
+    path.mkdir()
+    return str(path)
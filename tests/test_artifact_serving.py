@@ -0,0 +1,173 @@
+# tests/test_artifact_serving.py
+
+import os
+import time
+
+import pytest
+from fastapi import FastAPI, Request
+from fastapi.testclient import TestClient
+
+from app.services import artifact_serving
+from app.services.artifact_serving import content_hash, serve_artifact, serve_job_artifact
+
+
+DATA = bytes(range(256)) * 64          # 16 KiB
+
+
+def _settle(path):
+    old = time.time() - 3600
+    os.utime(path, (old, old))
+
+
+@pytest.fixture
+def artifact(tmp_path):
+    path = tmp_path / "job.mp4"
+    path.write_bytes(DATA)
+    _settle(path)
+    return str(path)
+
+
+@pytest.fixture
+def client(artifact, tmp_path):
+    app = FastAPI()
+
+    @app.get("/file")
+    def file(request: Request):
+        return serve_artifact(request, artifact, "video/mp4", "job.mp4")
+
+    @app.get("/job/{job_id}")
+    def job(request: Request, job_id: str):
+        return serve_job_artifact(request, job_id, ".mp4", str(tmp_path), "video/mp4") \
+            or {"missing": job_id}
+
+    return TestClient(app)
+
+
+# -------------------------------------------------
+# 200 / headers
+# -------------------------------------------------
+def test_full_response(client, artifact):
+    res = client.get("/file")
+
+    assert res.status_code == 200
+    assert res.content == DATA
+    assert res.headers["etag"] == f'"{content_hash(artifact)}"'
+    assert res.headers["accept-ranges"] == "bytes"
+    assert res.headers["cache-control"] == artifact_serving.CACHE_CONTROL
+    assert 'filename="job.mp4"' in res.headers["content-disposition"]
+
+
+def test_fresh_file_not_cached(client, artifact):
+    os.utime(artifact)          # just written → maybe still growing
+    assert client.get("/file").headers["cache-control"] == "no-cache"
+
+
+def test_etag_follows_content(client, artifact):
+    before = client.get("/file").headers["etag"]
+
+    with open(artifact, "wb") as f:
+        f.write(DATA[::-1])
+    _settle(artifact)
+
+    after = client.get("/file").headers["etag"]
+    assert after != before
+    assert after == f'"{content_hash(artifact)}"'
+
+
+# -------------------------------------------------
+# Range
+# -------------------------------------------------
+def test_range(client):
+    res = client.get("/file", headers={"Range": "bytes=100-199"})
+
+    assert res.status_code == 206
+    assert res.content == DATA[100:200]
+    assert res.headers["content-range"] == f"bytes 100-199/{len(DATA)}"
+
+
+def test_suffix_range(client):
+    res = client.get("/file", headers={"Range": "bytes=-10"})
+
+    assert res.status_code == 206
+    assert res.content == DATA[-10:]
+
+
+def test_unsatisfiable_range(client):
+    res = client.get("/file", headers={"Range": f"bytes={len(DATA) + 10}-"})
+    assert res.status_code == 416
+
+
+def test_if_range(client):
+    etag = client.get("/file").headers["etag"]
+
+    res = client.get("/file", headers={"Range": "bytes=0-9", "If-Range": etag})
+    assert res.status_code == 206 and res.content == DATA[:10]
+
+    # stale validator → whole (new) file
+    res = client.get("/file", headers={"Range": "bytes=0-9", "If-Range": '"stale"'})
+    assert res.status_code == 200 and res.content == DATA
+
+
+# -------------------------------------------------
+# 304
+# -------------------------------------------------
+def test_not_modified(client):
+    etag = client.get("/file").headers["etag"]
+
+    res = client.get("/file", headers={"If-None-Match": etag})
+    assert res.status_code == 304
+    assert res.content == b""
+    assert res.headers["etag"] == etag
+    assert "content-disposition" not in res.headers
+
+
+@pytest.mark.parametrize("header", ['"other", {etag}', "W/{etag}", "*"])
+def test_not_modified_variants(client, header):
+    etag = client.get("/file").headers["etag"]
+    res = client.get("/file", headers={"If-None-Match": header.format(etag=etag)})
+    assert res.status_code == 304
+
+
+def test_modified(client):
+    res = client.get("/file", headers={"If-None-Match": '"other"'})
+    assert res.status_code == 200 and res.content == DATA
+
+
+# -------------------------------------------------
+# proxy handoff
+# -------------------------------------------------
+def test_accel_redirect(client, artifact, tmp_path, monkeypatch):
+    monkeypatch.setattr(artifact_serving, "SENDFILE", "accel")
+    monkeypatch.setattr(artifact_serving, "ACCEL_ROOT", tmp_path.resolve())
+
+    res = client.get("/file")
+    assert res.status_code == 200
+    assert res.content == b""
+    assert res.headers["x-accel-redirect"] == "/_artifacts/job.mp4"
+    assert res.headers["etag"] == f'"{content_hash(artifact)}"'
+
+
+def test_accel_outside_root(client, tmp_path, monkeypatch):
+    monkeypatch.setattr(artifact_serving, "SENDFILE", "accel")
+    monkeypatch.setattr(artifact_serving, "ACCEL_ROOT", (tmp_path / "elsewhere").resolve())
+
+    res = client.get("/file")
+    assert "x-accel-redirect" not in res.headers
+    assert res.content == DATA
+
+
+# -------------------------------------------------
+# job artifacts (this node / shared store)
+# -------------------------------------------------
+def test_job_artifact_local(client, no_store):
+    res = client.get("/job/job", headers={"Range": "bytes=0-3"})
+    assert res.status_code == 206 and res.content == DATA[:4]
+
+    assert client.get("/job/other").json() == {"missing": "other"}
+
+
+def test_job_artifact_from_store(client, store, artifact):
+    store.put("remote", ".mp4", artifact)
+
+    res = client.get("/job/remote", headers={"Range": "bytes=10-19"})
+    assert res.status_code == 206 and res.content == DATA[10:20]
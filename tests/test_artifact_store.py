@@ -0,0 +1,146 @@
+# tests/test_artifact_store.py
+
+import os
+
+from app.services import artifact_store
+from app.services.artifact_store import LocalStore
+
+
+def _write(path, data=b"RIFFdata"):
+    with open(path, "wb") as f:
+        f.write(data)
+    return str(path)
+
+
+# -------------------------------------------------
+# LocalStore
+# -------------------------------------------------
+def test_local_store_roundtrip(tmp_path):
+    store = LocalStore(tmp_path / "store")
+    src = _write(tmp_path / "a.wav", b"abc" * 1000)
+
+    assert not store.exists("job1", ".wav")
+    assert store.local_path("job1", ".wav") is None
+
+    store.put("job1", ".wav", src)
+    assert store.exists("job1", ".wav")
+    # sharded key, nothing left behind from the temp write
+    key = store.key("job1", ".wav")
+    assert key.endswith("job1.wav") and key.count("/") == 2
+    assert [p.name for p in (tmp_path / "store").rglob("*") if p.is_file()] == ["job1.wav"]
+
+    dst = tmp_path / "fetched" / "job1.wav"
+    assert store.get("job1", ".wav", str(dst))
+    assert dst.read_bytes() == b"abc" * 1000
+
+    obj = store.open("job1", ".wav")
+    try:
+        assert obj["size"] == 3000
+        assert b"".join(obj["chunks"]) == b"abc" * 1000
+    finally:
+        obj["close"]()
+
+
+def test_local_store_missing(tmp_path):
+    store = LocalStore(tmp_path / "store")
+
+    assert not store.get("nope", ".wav", str(tmp_path / "x.wav"))
+    assert not os.path.exists(tmp_path / "x.wav")
+    assert store.open("nope", ".wav") is None
+    store.delete("nope", ".wav")
+
+
+def test_local_store_copy_and_delete(tmp_path):
+    store = LocalStore(tmp_path / "store")
+    store.put("a", ".mp4", _write(tmp_path / "a.mp4"))
+
+    store.copy("a", "b", ".mp4")
+    store.delete("a", ".mp4")
+
+    assert not store.exists("a", ".mp4")
+    assert open(store.local_path("b", ".mp4"), "rb").read() == b"RIFFdata"
+
+
+# -------------------------------------------------
+# OUTPUT_DIR ↔ store helpers
+# -------------------------------------------------
+def test_publish_without_store(no_store, output_dir):
+    _write(os.path.join(output_dir, "job.wav"))
+    assert artifact_store.publish("job", ".wav", output_dir=output_dir) is False
+
+
+def test_publish_missing_file(store, output_dir):
+    assert artifact_store.publish("job", ".wav", output_dir=output_dir) is False
+    assert not store.exists("job", ".wav")
+
+
+def test_publish_explicit_path(store, tmp_path, output_dir):
+    src = _write(tmp_path / "job.part.wav")
+    assert artifact_store.publish("job", ".wav", src, output_dir=output_dir)
+    assert store.exists("job", ".wav")
+
+
+def test_fetch_pulls_from_store_once(store, tmp_path, output_dir):
+    store.put("job", ".wav", _write(tmp_path / "src.wav"))
+
+    path = artifact_store.fetch("job", ".wav", output_dir)
+    assert path == os.path.join(output_dir, "job.wav")
+    assert open(path, "rb").read() == b"RIFFdata"
+
+    # local copy is the cache from now on
+    store.delete("job", ".wav")
+    assert artifact_store.fetch("job", ".wav", output_dir) == path
+    assert artifact_store.fetch("other", ".wav", output_dir) is None
+
+
+def test_exists_here_or_in_store(store, tmp_path, output_dir):
+    _write(os.path.join(output_dir, "here.wav"))
+    store.put("there", ".wav", _write(tmp_path / "src.wav"))
+
+    assert artifact_store.exists("here", ".wav", output_dir)
+    assert artifact_store.exists("there", ".wav", output_dir)
+    assert not artifact_store.exists("nowhere", ".wav", output_dir)
+
+
+def test_move_renames_everywhere(store, tmp_path, output_dir):
+    _write(os.path.join(output_dir, "src.wav"))
+    store.put("src", ".wav", _write(tmp_path / "up.wav"))
+
+    assert artifact_store.move("src", "dst", ".wav", output_dir)
+
+    assert not os.path.exists(os.path.join(output_dir, "src.wav"))
+    assert os.path.exists(os.path.join(output_dir, "dst.wav"))
+    assert not store.exists("src", ".wav")
+    assert store.exists("dst", ".wav")
+
+
+def test_link_keeps_source(store, tmp_path, output_dir):
+    src = _write(os.path.join(output_dir, "src.wav"))
+    store.put("src", ".wav", _write(tmp_path / "up.wav"))
+
+    assert artifact_store.link("src", "dst", ".wav", output_dir)
+
+    dst = os.path.join(output_dir, "dst.wav")
+    assert os.path.exists(src) and os.path.samefile(src, dst)
+    assert store.exists("src", ".wav") and store.exists("dst", ".wav")
+
+
+def test_move_store_only(store, tmp_path, output_dir):
+    # variant rendered on another node: only the store has it
+    store.put("src", ".mp4", _write(tmp_path / "up.mp4"))
+
+    assert artifact_store.move("src", "dst", ".mp4", output_dir)
+    assert not os.path.exists(os.path.join(output_dir, "dst.mp4"))
+    assert store.exists("dst", ".mp4") and not store.exists("src", ".mp4")
+
+
+def test_relocate_missing(store, output_dir):
+    assert not artifact_store.move("nope", "dst", ".wav", output_dir)
+    assert not artifact_store.link("nope", "dst", ".wav", output_dir)
+
+
+def test_relocate_without_store(no_store, output_dir):
+    _write(os.path.join(output_dir, "src.wav"))
+
+    assert artifact_store.move("src", "dst", ".wav", output_dir)
+    assert os.path.exists(os.path.join(output_dir, "dst.wav"))
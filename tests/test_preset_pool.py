@@ -0,0 +1,167 @@
+# tests/test_preset_pool.py
+
+import os
+import time
+
+import pytest
+
+fakeredis = pytest.importorskip("fakeredis")
+
+from app.services import preset_pool as pool  # noqa: E402
+
+
+KEY = "Lo-Fi Chill|cinematic|20"
+OTHER = "Devotional Bhajan|classical|10"
+
+
+@pytest.fixture
+def fills(monkeypatch):
+    """
+    Fake redis + gpu queue; returns the list of pooled ids queued per key.
+    """
+    monkeypatch.setattr(pool, "r", fakeredis.FakeRedis(decode_responses=True))
+    monkeypatch.setattr(pool, "POOL_LOW", 2)
+    monkeypatch.setattr(pool, "POOL_HIGH", 4)
+    monkeypatch.setattr(pool, "POOL_MAX_INFLIGHT", 1)
+    monkeypatch.setattr(pool, "_gpu_queue_empty", lambda: True)
+
+    queued = []
+
+    def enqueue(key):
+        pooled_id = f"pool-{len(queued)}"
+        pool.r.zadd(pool._inflight(key), {pooled_id: time.time()})
+        queued.append((key, pooled_id))
+
+    monkeypatch.setattr(pool, "_enqueue_fill", enqueue)
+    return queued
+
+
+def _finish(fills, output_dir):
+    """
+    The gpu worker completes the last queued fill.
+    """
+    key, pooled_id = fills[-1]
+    for ext in pool.EXTENSIONS:
+        with open(os.path.join(output_dir, f"{pooled_id}{ext}"), "wb") as f:
+            f.write(pooled_id.encode())
+    pool.add(key, pooled_id)
+
+
+def _level(key):
+    return pool.r.llen(pool._variants(key))
+
+
+def test_pool_key():
+    assert pool.pool_key("Lo-Fi Chill", "cinematic", 20) == KEY
+    assert pool.pool_key("Lo-Fi Chill", "cinematic", 25) is None
+    assert pool.pool_key("Lo-Fi Chill", "bollywood", 20) is None
+    assert pool.pool_key("Not A Preset", "cinematic", 20) is None
+
+
+def test_no_demand_no_fill(fills):
+    assert pool.refill() == []
+    assert fills == []
+
+
+# -------------------------------------------------
+# watermarks
+# -------------------------------------------------
+def test_watermarks(fills, no_store, output_dir):
+    assert not pool.take(KEY, "user-0", output_dir)
+
+    # fill one at a time (POOL_MAX_INFLIGHT) up to POOL_HIGH
+    for level in range(4):
+        assert pool.refill() == [KEY]
+        assert pool.refill() == []          # previous fill still in flight
+        _finish(fills, output_dir)
+        assert _level(KEY) == level + 1
+
+    assert pool.refill() == []
+    assert len(fills) == 4
+
+    # 4 → 3 → 2: between the watermarks, not refilling
+    for i in (1, 2):
+        assert pool.take(KEY, f"user-{i}", output_dir)
+        assert pool.refill() == []
+
+    # below POOL_LOW → refill again, all the way up
+    assert pool.take(KEY, "user-3", output_dir)
+    assert _level(KEY) == 1
+    while pool.refill():
+        _finish(fills, output_dir)
+    assert _level(KEY) == 4
+
+
+def test_take_moves_files(fills, no_store, output_dir):
+    pool.take(KEY, "first", output_dir)
+    pool.refill()
+    _finish(fills, output_dir)
+    _, pooled_id = fills[-1]
+
+    assert pool.take(KEY, "job", output_dir)
+    for ext in pool.EXTENSIONS:
+        assert open(os.path.join(output_dir, f"job{ext}"), "rb").read() == pooled_id.encode()
+        assert not os.path.exists(os.path.join(output_dir, f"{pooled_id}{ext}"))
+
+    stats = pool.stats()
+    assert stats["hits"] == 1 and stats["misses"] == 1
+
+
+def test_take_skips_vanished_variant(fills, no_store, output_dir):
+    pool.r.rpush(pool._variants(KEY), "pool-gone")
+    assert not pool.take(KEY, "job", output_dir)
+    assert _level(KEY) == 0
+
+
+def test_take_from_store(fills, store, tmp_path, output_dir):
+    # filled on another gpu node: only the shared store has the files
+    src = tmp_path / "remote"
+    src.write_bytes(b"remote")
+    for ext in pool.EXTENSIONS:
+        store.put("pool-remote", ext, str(src))
+    pool.r.rpush(pool._variants(KEY), "pool-remote")
+
+    assert pool.take(KEY, "job", output_dir)
+    assert store.exists("job", ".wav") and not store.exists("pool-remote", ".wav")
+
+
+# -------------------------------------------------
+# scheduling
+# -------------------------------------------------
+def test_gpu_busy(fills, no_store, output_dir, monkeypatch):
+    pool.take(KEY, "user", output_dir)
+    monkeypatch.setattr(pool, "_gpu_queue_empty", lambda: False)
+    assert pool.refill() == []
+
+
+def test_emptiest_first(fills, no_store, output_dir, monkeypatch):
+    monkeypatch.setattr(pool, "POOL_MAX_INFLIGHT", 2)
+    for _ in range(3):
+        pool.take(KEY, "user", output_dir)
+    pool.take(OTHER, "user", output_dir)
+    pool.r.rpush(pool._variants(KEY), "pool-a")
+
+    # KEY is requested more, OTHER is emptier
+    assert pool.refill() == [OTHER, KEY]
+
+
+def test_fill_failed_frees_slot(fills, no_store, output_dir):
+    pool.take(KEY, "user", output_dir)
+    assert pool.refill() == [KEY]
+
+    key, pooled_id = fills[-1]
+    pool.fill_failed(key, pooled_id)
+
+    assert pool.refill() == [KEY]
+    assert pool.stats()["fills_failed"] == 1
+
+
+def test_lost_fill_expires(fills, no_store, output_dir):
+    pool.take(KEY, "user", output_dir)
+    pool.refill()
+
+    # worker died: in-flight entry older than FILL_TIMEOUT
+    _, pooled_id = fills[-1]
+    pool.r.zadd(pool._inflight(KEY), {pooled_id: time.time() - pool.FILL_TIMEOUT - 1})
+
+    assert pool.refill() == [KEY]
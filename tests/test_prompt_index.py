@@ -0,0 +1,160 @@
+# tests/test_prompt_index.py
+
+import numpy as np
+import pytest
+
+from app.services import prompt_index
+from app.services.prompt_index import PromptIndex, append_log, quantize
+
+
+def _vectors(n, seed=0):
+    v = np.random.default_rng(seed).normal(size=(n, prompt_index.DIM)).astype(np.float32)
+    return v / np.linalg.norm(v, axis=1, keepdims=True)
+
+
+def _metas(ids):
+    return [{"job_id": f"job{i}"} for i in ids]
+
+
+def _query(index, row):
+    # the stored int8 vector itself → exact match
+    return index.vectors[row].astype(np.float32) / 127
+
+
+@pytest.fixture
+def directory(tmp_path):
+    return tmp_path / "index"
+
+
+def test_quantize():
+    q = quantize(np.array([[1.0, -1.0, 0.5, 2.0]]))
+    assert q.dtype == np.int8
+    assert q.tolist() == [[127, -127, 64, 127]]
+
+
+def test_empty(directory):
+    index = PromptIndex(directory)
+    assert index.n == 0
+    assert index.search(_vectors(1)[0]) == []
+
+
+# -------------------------------------------------
+# log → sync
+# -------------------------------------------------
+def test_sync_picks_up_appends(directory):
+    index = PromptIndex(directory)
+    append_log(quantize(_vectors(3)), _metas(range(3)), directory)
+
+    index.sync()
+    assert index.n == 3 and index.log_lines == 3
+
+    # only the new lines are read on the next sync
+    append_log(quantize(_vectors(2, seed=1)), _metas(range(3, 5)), directory)
+    index.sync()
+    index.sync()
+    assert index.n == 5
+    assert [m["job_id"] for m in index.meta] == [f"job{i}" for i in range(5)]
+
+    (score, meta), *_ = index.search(_query(index, 4), k=3)
+    assert meta["job_id"] == "job4"
+    assert score == pytest.approx(1.0, abs=0.02)
+
+
+def test_sync_skips_partial_line(directory):
+    append_log(quantize(_vectors(1)), _metas([0]), directory)
+    log = prompt_index._log_path(directory)
+    whole = log.read_bytes()
+
+    # a writer caught mid-line
+    log.write_bytes(whole + whole[:20])
+    index = PromptIndex(directory)
+    assert index.n == 1
+
+    log.write_bytes(whole + whole)
+    index.sync()
+    assert index.n == 2
+
+
+def test_search_ranks_best_first(directory):
+    vectors = _vectors(50)
+    append_log(quantize(vectors), _metas(range(50)), directory)
+    index = PromptIndex(directory)
+
+    results = index.search(vectors[7] + 0.3 * vectors[9], k=5)
+    assert len(results) == 5
+    assert [m["job_id"] for _, m in results[:2]] == ["job7", "job9"]
+    scores = [s for s, _ in results]
+    assert scores == sorted(scores, reverse=True)
+
+
+# -------------------------------------------------
+# compact
+# -------------------------------------------------
+def test_compact_folds_log_into_snapshot(directory):
+    append_log(quantize(_vectors(10)), _metas(range(10)), directory)
+    index = PromptIndex(directory)
+    index.compact()
+
+    assert prompt_index._snapshot_path(directory).exists()
+    assert prompt_index._log_path(directory).read_bytes() == b""
+    assert index.n == 10 and index.log_offset == 0
+
+    # appended after compaction → log again
+    append_log(quantize(_vectors(1, seed=1)), _metas([10]), directory)
+
+    fresh = PromptIndex(directory)
+    assert fresh.n == 11
+    assert fresh.meta == index.meta + _metas([10])
+    assert np.array_equal(fresh.vectors[:10], index.vectors[:10])
+
+
+def test_other_process_compacted(directory):
+    append_log(quantize(_vectors(5)), _metas(range(5)), directory)
+    reader = PromptIndex(directory)
+
+    # another process folds the log (plus one entry the reader never saw)
+    append_log(quantize(_vectors(1, seed=1)), _metas([5]), directory)
+    PromptIndex(directory).compact()
+    append_log(quantize(_vectors(1, seed=2)), _metas([6]), directory)
+
+    reader.sync()
+    # reloaded from the snapshot, nothing read twice
+    assert reader.n == 7
+    assert [m["job_id"] for m in reader.meta] == [f"job{i}" for i in range(7)]
+
+
+def test_trained_lists(directory, monkeypatch):
+    monkeypatch.setattr(prompt_index, "TRAIN_MIN", 256)
+
+    append_log(quantize(_vectors(300)), _metas(range(300)), directory)
+    index = PromptIndex(directory)
+
+    assert index.centroids is not None and index.trained_at == 300
+    assert sum(len(rows) for rows in index.lists) == 300
+
+    for row in (0, 123, 299):
+        (score, meta), = index.search(_query(index, row), k=1)
+        assert meta["job_id"] == f"job{row}"
+
+    # lists survive a snapshot round trip; no retrain below ×4 growth
+    append_log(quantize(_vectors(10, seed=1)), _metas(range(300, 310)), directory)
+    index.compact()
+    assert index.trained_at == 300
+
+    loaded = PromptIndex(directory)
+    assert loaded.n == 310 and loaded.trained_at == 300
+    assert [list(a) for a in loaded.lists] == [list(a) for a in index.lists]
+    (_, meta), = loaded.search(_query(loaded, 305), k=1)
+    assert meta["job_id"] == "job305"
+
+
+def test_compact_retrains_after_growth(directory, monkeypatch):
+    monkeypatch.setattr(prompt_index, "TRAIN_MIN", 64)
+
+    append_log(quantize(_vectors(64)), _metas(range(64)), directory)
+    index = PromptIndex(directory)
+    assert index.trained_at == 64
+
+    append_log(quantize(_vectors(200, seed=1)), _metas(range(64, 264)), directory)
+    index.compact()
+    assert index.trained_at == 264
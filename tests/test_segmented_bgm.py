@@ -0,0 +1,131 @@
+# tests/test_segmented_bgm.py
+
+import sys
+import types
+
+import numpy as np
+import pytest
+import soundfile as sf
+
+from app.bgm import segmented_bgm
+from app.bgm.segmented_bgm import crossfade_join, plan_segments
+
+
+def _covers(segments, duration):
+    assert segments[0][0] == 0.0
+    assert segments[-1][1] == pytest.approx(duration)
+    for (_, a_end), (b_start, _) in zip(segments[:-1], segments[1:]):
+        assert a_end == b_start
+
+
+# -------------------------------------------------
+# plan_segments
+# -------------------------------------------------
+def test_short_video_single_segment():
+    assert plan_segments(25, [5, 12]) == [(0.0, 25.0)]
+
+
+def test_segments_follow_cuts():
+    segments = plan_segments(60, [20, 41])
+    assert segments == [(0.0, 20.0), (20.0, 41.0), (41.0, 60.0)]
+
+
+def test_short_scenes_merged():
+    segments = plan_segments(60, [3, 20, 23, 55], min_len=8)
+    _covers(segments, 60)
+    # 3 (first piece), 23 (3 s after 20) and 55 (5 s before the end) dropped,
+    # the 40 s left after 20 is then split in two
+    assert [a for a, _ in segments] == [0.0, 20.0, 40.0]
+
+
+def test_long_scenes_split():
+    segments = plan_segments(100, [], max_len=30)
+    _covers(segments, 100)
+    assert len(segments) == 4
+    assert all(b - a <= 30 for a, b in segments)
+
+
+def test_cuts_outside_video_ignored():
+    segments = plan_segments(50, [-1, 0, 25, 50, 70])
+    assert segments == [(0.0, 25.0), (25.0, 50.0)]
+
+
+# -------------------------------------------------
+# fan-out
+# -------------------------------------------------
+@pytest.fixture
+def queued(monkeypatch):
+    """
+    Payloads sent to musicgen.generate (celery task replaced in sys.modules).
+    """
+    payloads = []
+    task = types.SimpleNamespace(delay=lambda job_id, payload: payloads.append(payload))
+    module = types.ModuleType("app.tasks.musicgen_task")
+    module.generate_music_task = task
+
+    monkeypatch.setitem(sys.modules, "app.tasks.musicgen_task", module)
+    monkeypatch.setattr(segmented_bgm, "_wait_for", lambda tasks: list(tasks))
+    monkeypatch.setattr(segmented_bgm, "crossfade_join", lambda paths, segments, out: out)
+    return payloads
+
+
+@pytest.mark.parametrize("duration, cuts", [
+    (60, []),
+    (61, [30]),
+    (95, [10, 40, 41.5, 70]),
+    (300, [29.5, 59, 88.5, 120]),
+])
+def test_segments_fit_context_window(queued, duration, cuts):
+    segmented_bgm.generate_scored_bgm("calm veena", duration, cuts, "out.wav")
+
+    assert queued
+    # crossfade tail included: no segment takes musicgen's extend path
+    assert all(p["duration"] <= segmented_bgm.MAX_SEGMENT for p in queued)
+    assert all(p["audio_only"] for p in queued)
+    # non-final segments still overlap the next one
+    assert sum(p["duration"] for p in queued) >= duration
+
+
+# -------------------------------------------------
+# crossfade_join
+# -------------------------------------------------
+SR = 8000
+
+
+def _tone(path, seconds, value, channels=1):
+    audio = np.full((int(seconds * SR), channels), value, dtype=np.float32)
+    sf.write(path, audio, SR, subtype="PCM_16")
+    return str(path)
+
+
+def test_crossfade_join(tmp_path):
+    segments = [(0.0, 4.0), (4.0, 8.0)]
+    # first segment generated `fade` longer (+ ceil rounding overhang)
+    paths = [_tone(tmp_path / "a.wav", 6.0, 0.5), _tone(tmp_path / "b.wav", 4.0, 0.25)]
+
+    out = crossfade_join(paths, segments, str(tmp_path / "out.wav"), fade=1.0)
+    audio, sr = sf.read(out, dtype="float32", always_2d=True)
+
+    assert sr == SR
+    assert len(audio) == 8 * SR
+    assert audio[2 * SR, 0] == pytest.approx(0.5, abs=1e-3)
+    assert audio[6 * SR, 0] == pytest.approx(0.25, abs=1e-3)
+
+    # boundary starts on segment a, ends on segment b; overhang past the fade dropped
+    fade = audio[4 * SR:5 * SR, 0]
+    assert fade[0] == pytest.approx(0.5, abs=1e-3)
+    assert fade[-1] == pytest.approx(0.25, abs=1e-2)
+    # equal power: no dip below the quieter segment
+    assert fade.min() >= 0.25 - 1e-2
+
+
+def test_crossfade_join_mixed_channels(tmp_path):
+    segments = [(0.0, 3.0), (3.0, 6.0)]
+    paths = [_tone(tmp_path / "a.wav", 4.0, 0.5, channels=2), _tone(tmp_path / "b.wav", 3.0, 0.5)]
+
+    out = crossfade_join(paths, segments, str(tmp_path / "out.wav"), fade=1.0)
+    audio, _ = sf.read(out, dtype="float32", always_2d=True)
+
+    assert audio.shape == (6 * SR, 2)
+    # mono segment upmixed to both channels
+    assert np.allclose(audio[5 * SR], [0.5, 0.5], atol=1e-3)
@@ -0,0 +1,30 @@
+# tests/test_tracing.py
+
+import types
+
+from app.services import tracing
+
+
+def _task(task_id):
+    return types.SimpleNamespace(request=types.SimpleNamespace(id=task_id))
+
+
+def test_task_job_id():
+    assert tracing.task_job_id(("job1", {"prompt": "x"}), _task("t1")) == "job1"
+    # bgm.generate(video_path, out_path, prompt): queued with the API job id as task id
+    assert tracing.task_job_id(("in.mp4", "out.mp4", ""), _task("api-job")) == "api-job"
+    assert tracing.task_job_id(("in.mp4", "out.mp4", "")) is None
+
+
+def test_exemplar_in_openmetrics(monkeypatch):
+    monkeypatch.delenv("PROMETHEUS_MULTIPROC_DIR", raising=False)
+    tracing.record("test_stage", 0.2, job_id="abc123")
+
+    body, content_type = tracing.metrics_payload("application/openmetrics-text; version=1.0.0")
+    assert content_type.startswith("application/openmetrics-text")
+    assert b'indianode_stage_seconds_bucket{le="0.25",stage="test_stage"} 1.0 # {job_id="abc123"} 0.2' in body
+
+    # plain Prometheus text has no exemplars
+    body, content_type = tracing.metrics_payload("text/plain")
+    assert content_type.startswith("text/plain")
+    assert b"job_id" not in body
@@ -0,0 +1,92 @@
+# tests/test_waveform_peaks.py
+
+import os
+
+import numpy as np
+import pytest
+
+from app.services import waveform_peaks as wp
+
+
+def test_compute_levels():
+    sr = 32000
+    t = np.arange(sr * 60) / sr
+    audio = 0.5 * np.sin(2 * np.pi * 220 * t)
+
+    levels = wp.compute(audio)
+
+    # finest level within MAX_POINTS, each next one halves the resolution
+    spp, data = levels[0]
+    assert len(data) <= wp.MAX_POINTS and spp >= wp.MIN_SAMPLES_PER_PIXEL
+    for (a, da), (b, db) in zip(levels[:-1], levels[1:]):
+        assert b == 2 * a
+        assert len(db) == -(-len(da) // 2)
+    assert len(levels[-1][1]) <= wp.MIN_POINTS
+
+    for _, data in levels:
+        assert data.dtype == np.int8 and data.shape[1] == 2
+        assert np.all(data[:, 0] <= data[:, 1])
+        assert data[:, 0].min() == pytest.approx(-64, abs=1)
+        assert data[:, 1].max() == pytest.approx(64, abs=1)
+
+
+def test_compute_stereo_and_clipping():
+    audio = np.zeros((1000, 2), dtype=np.float32)
+    audio[10, 0] = 2.0          # clipped, left only
+    audio[500, 1] = -0.25
+
+    (spp, data), = wp.compute(audio)
+
+    assert spp == wp.MIN_SAMPLES_PER_PIXEL
+    assert len(data) == -(-1000 // spp)
+    assert tuple(data[0]) == (0, 127)
+    assert tuple(data[500 // spp]) == (-32, 0)
+
+
+def test_compute_edge_padding():
+    # last pixel padded with the final value, not with silence
+    audio = np.full(wp.MIN_SAMPLES_PER_PIXEL + 1, 0.5)
+    (_, data), = wp.compute(audio)
+    assert tuple(data[-1]) == (64, 64)
+
+
+def test_compute_empty():
+    (_, data), = wp.compute(np.zeros(0))
+    assert data.shape == (1, 2)
+
+
+def test_write_read_roundtrip(tmp_path):
+    levels = wp.compute(np.sin(np.linspace(0, 400, 200000)))
+    path = str(tmp_path / "job.peaks")
+
+    wp.write(path, levels, 32000, 200000)
+    assert os.listdir(tmp_path) == ["job.peaks"]
+
+    peaks = wp.read(path)
+    assert peaks["sample_rate"] == 32000 and peaks["samples"] == 200000
+    assert [s for s, _ in peaks["levels"]] == [s for s, _ in levels]
+    for (_, a), (_, b) in zip(peaks["levels"], levels):
+        assert np.array_equal(a, b)
+
+
+def test_read_rejects_other_files(tmp_path):
+    path = tmp_path / "job.peaks"
+    path.write_bytes(b"RIFF" + bytes(32))
+    with pytest.raises(ValueError):
+        wp.read(str(path))
+
+
+def test_level_for_width():
+    levels = wp.compute(np.zeros(32000 * 60))
+    peaks = {"sample_rate": 32000, "samples": 32000 * 60, "levels": levels}
+
+    assert wp.level_for_width(peaks, None) is levels[0]
+    spp, data = wp.level_for_width(peaks, 1000)
+    assert len(data) >= 1000 and spp * 2 not in [s for s, d in levels if len(d) >= 1000]
+    # wider than the finest level → finest
+    assert wp.level_for_width(peaks, 10 ** 6) is levels[0]
+
+    view = wp.to_json(peaks, 1000)
+    assert view["duration"] == 60.0
+    assert view["samples_per_pixel"] == spp
+    assert len(view["data"]) == 2 * view["length"]